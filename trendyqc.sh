@@ -6,6 +6,11 @@ set -me
 # collect static command
 python trendyqc/manage.py collectstatic --no-input
 
+# directory shared by the gunicorn workers for the Prometheus metrics, it
+# needs to be emptied at every start
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/trendyqc_prometheus}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+
 # Start the primary process and put it in the background
 gunicorn -n trendyqc -c ./config/gunicorn/conf.py --bind :8006 --chdir /app/trendyqc trendyqc.wsgi:application &
 
@@ -1 +1,116 @@
+import json
+
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+
+from .models.profiling import Request_profile
+
+
+@admin.register(Request_profile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Read only view of the profiles of the requests profiled by staff
+    users, with the pstats file available for download
+    """
+
+    list_display = [
+        "created",
+        "user",
+        "view",
+        "wall_time",
+        "sql_queries",
+        "sql_time",
+    ]
+    list_filter = ["view", "user"]
+    search_fields = ["path"]
+    fields = [
+        "created",
+        "user",
+        "view",
+        "method",
+        "path",
+        "wall_time",
+        "sql_queries",
+        "sql_time",
+        "download",
+        "formatted_stats",
+        "formatted_queries",
+    ]
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                "<int:profile_id>/download/",
+                self.admin_site.admin_view(self.download_view),
+                name="trend_monitoring_request_profile_download",
+            ),
+            *super().get_urls(),
+        ]
+
+    def download_view(self, request, profile_id):
+        """Download the pstats file of the profile
+
+        Args:
+            request (HttpRequest): Request handled
+            profile_id (int): Id of the profile
+
+        Returns:
+            HttpResponse: Response with the profile as attachment
+        """
+
+        request_profile = get_object_or_404(Request_profile, id=profile_id)
+
+        if not self.has_view_permission(request, request_profile):
+            raise PermissionDenied
+
+        return HttpResponse(
+            bytes(request_profile.profile),
+            content_type="application/octet-stream",
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="request_profile_{profile_id}.prof"'
+                )
+            },
+        )
+
+    @admin.display(description="Profile file")
+    def download(self, obj):
+        return format_html(
+            '<a href="{}">Download</a> (open with pstats or snakeviz)',
+            reverse(
+                "admin:trend_monitoring_request_profile_download",
+                args=[obj.id],
+            ),
+        )
+
+    @admin.display(description="Cumulative time per function")
+    def formatted_stats(self, obj):
+        return format_html("<pre>{}</pre>", obj.stats)
+
+    @admin.display(description="Slowest SQL queries")
+    def formatted_queries(self, obj):
+        return format_html(
+            "<table>{}</table>",
+            format_html_join(
+                "",
+                "<tr><td>{}ms</td><td><code>{}</code><br>{}</td></tr>",
+                (
+                    (
+                        f"{query['time'] * 1000:.1f}",
+                        query["sql"],
+                        query["params"],
+                    )
+                    for query in json.loads(obj.queries)
+                ),
+            ),
+        )
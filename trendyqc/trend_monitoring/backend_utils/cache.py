@@ -0,0 +1,187 @@
+import datetime
+import hashlib
+import json
+import time
+from typing import Dict
+
+from dateutil.relativedelta import relativedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+
+from trend_monitoring.forms import FilterForm
+from trend_monitoring.models.metadata import Report
+
+# alias of the cache defined in the CACHES setting
+PLOT_CACHE_ALIAS = "plot"
+GENERATION_KEY = "plot_generation"
+
+# subset keys for which the order of the values doesn't change the plot
+UNORDERED_KEYS = ["assay_select", "run_select", "sequencer_select"]
+
+
+def get_plot_cache():
+    """Get the cache backend used for storing the plot payloads
+
+    Returns:
+        BaseCache: Django cache backend
+    """
+
+    return caches[PLOT_CACHE_ALIAS]
+
+
+def canonicalise_form(form: Dict) -> Dict:
+    """Get the canonical form of the form data so that equivalent filters
+    give the same dict. Only the fields of the filter form are kept i.e.
+    other query parameters like cache busters don't change the plot, values
+    are converted to lists of strings, empty values are removed, the order of
+    the subset values is ignored and the keys are sorted. The days back
+    option is kept as is.
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        dict: Dict of canonical form data
+    """
+
+    canonical = {}
+
+    for key, value in sorted(form.items()):
+        if key not in FilterForm.base_fields:
+            continue
+
+        values = value if isinstance(value, list) else [value]
+        values = [str(v) for v in values if v not in [None, ""]]
+
+        if not values:
+            continue
+
+        if key in UNORDERED_KEYS:
+            values = sorted(set(values))
+
+        canonical[key] = values
+
+    # the automatic bucket size is the default
+    if canonical.get("bucket") == ["auto"]:
+        canonical.pop("bucket")
+
+    return canonical
+
+
+def normalise_form(form: Dict) -> Dict:
+    """Normalise the form data so that equivalent filters give the same dict,
+    see canonicalise_form. The relative days back option is resolved to
+    concrete dates in the same way as get_subset_filter.
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        dict: Dict of normalised form data
+    """
+
+    normalised = canonicalise_form(form)
+    days_back = normalised.pop("days_back", None)
+
+    if days_back:
+        today = datetime.date.today()
+        normalised["date_start"] = [
+            str(today + relativedelta(days=-int(days_back[0])))
+        ]
+        normalised["date_end"] = [str(today)]
+
+    # the date range is only used for filtering if both dates are present
+    elif not ("date_start" in normalised and "date_end" in normalised):
+        normalised.pop("date_start", None)
+        normalised.pop("date_end", None)
+
+    return normalised
+
+
+def get_form_hash(form: Dict) -> str:
+    """Get a hash of the normalised form data
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        str: SHA256 hex digest of the normalised form data
+    """
+
+    canonical_form = json.dumps(normalise_form(form), sort_keys=True)
+    return hashlib.sha256(canonical_form.encode()).hexdigest()
+
+
+def get_generation() -> int:
+    """Get the generation of the plot cache. A missing generation (first use
+    or culled by the backend) is initialised with a timestamp so that a
+    previous generation is never reused.
+
+    Returns:
+        int: Generation number
+    """
+
+    cache = get_plot_cache()
+    generation = cache.get(GENERATION_KEY)
+
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY, time.time_ns())
+
+    return generation
+
+
+def bump_generation() -> int:
+    """Invalidate every cached plot by incrementing the cache generation
+
+    Returns:
+        int: New generation number
+    """
+
+    cache = get_plot_cache()
+
+    try:
+        return cache.incr(GENERATION_KEY)
+    except ValueError:
+        # the generation is missing from the cache
+        generation = time.time_ns()
+        cache.set(GENERATION_KEY, generation, timeout=None)
+        return generation
+
+
+def get_cache_key(form: Dict) -> str:
+    """Get the key of the plot payload in the cache
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        str: Cache key
+    """
+
+    return (
+        f"plot:{settings.PLOT_ENCODING}:{get_generation()}:"
+        f"{get_form_hash(form)}"
+    )
+
+
+def get_plot_etag(form: Dict) -> str:
+    """Get the entity tag of the plot data for the given form data. The tag
+    changes when the filter, the latest imported report or the cache
+    generation change.
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        str: Unquoted strong entity tag
+    """
+
+    latest_report_id = Report.objects.aggregate(latest=Max("id"))["latest"]
+    etag_data = (
+        f"{settings.PLOT_ENCODING}:{get_form_hash(form)}:{latest_report_id}:"
+        f"{get_generation()}"
+    )
+    return hashlib.sha256(etag_data.encode()).hexdigest()
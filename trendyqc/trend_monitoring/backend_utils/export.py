@@ -0,0 +1,250 @@
+import csv
+import importlib.util
+import io
+from itertools import islice
+from typing import Dict, Iterator
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from .plot import get_sample_values_queryset
+
+# content types of the export formats
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# report sample lookups of the metadata columns of the exports
+EXPORT_METADATA = {
+    "sample_id": "sample__sample_id",
+    "date": "report__date",
+    "project_name": "report__project_name",
+    "assay": "assay",
+    "sequencer_id": "report__sequencer_id",
+}
+
+
+class StreamBuffer(io.RawIOBase):
+    """Write only file object keeping the bytes written until they are
+    popped. The position is the number of bytes written since the creation
+    of the buffer, as expected by the Parquet writer for the offsets of the
+    row groups.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def pop(self) -> bytes:
+        """Get the bytes written since the last call and empty the buffer
+
+        Returns:
+            bytes: Bytes written
+        """
+
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def is_export_format_available(export_format: str) -> bool:
+    """Check if the export format is known and its dependencies installed.
+    pyarrow is only needed for the Parquet exports.
+
+    Args:
+        export_format (str): Export format
+
+    Returns:
+        bool: True if the data can be exported in that format
+    """
+
+    if export_format == "parquet":
+        return importlib.util.find_spec("pyarrow") is not None
+
+    return export_format in EXPORT_FORMATS
+
+
+def get_export_metrics(form: Dict) -> list:
+    """Get the metrics exported for the plot form i.e. the Y-axis metrics
+    and the optional X-axis metric
+
+    Args:
+        form (dict): Cleaned data of the plot form
+
+    Returns:
+        list: Metrics in the model|field format, without duplicates
+    """
+
+    return list(
+        dict.fromkeys([*form.get("metrics_y", []), *form.get("metrics_x", [])])
+    )
+
+
+def get_export_rows(
+    report_sample_queryset: QuerySet, metrics: list, chunk_size: int = None
+) -> Iterator[tuple]:
+    """Iterate over the samples of the queryset ordered by run date using a
+    server side cursor, i.e. only chunk_size rows are held in memory
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metrics (list): Metrics in the model|field format, without duplicates
+        chunk_size (int, optional): Number of rows fetched per round trip.
+        Defaults to EXPORT_CHUNK_SIZE.
+
+    Yields:
+        tuple: Values of the metadata columns and of the metrics of a sample
+    """
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    lookups = [
+        *EXPORT_METADATA.values(),
+        *[f"value_{i}" for i in range(len(metrics))],
+    ]
+    queryset = get_sample_values_queryset(
+        report_sample_queryset, metrics
+    ).order_by("report__date", "report__project_name", "id")
+
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield tuple(row[lookup] for lookup in lookups)
+
+
+def get_batches(rows: Iterator[tuple], batch_size: int) -> Iterator[list]:
+    """Group the rows in lists of batch_size rows
+
+    Args:
+        rows (Iterator): Rows
+        batch_size (int): Number of rows per batch
+
+    Yields:
+        list: Batch of rows
+    """
+
+    rows = iter(rows)
+
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def stream_csv(
+    report_sample_queryset: QuerySet, metrics: list, chunk_size: int = None
+) -> Iterator[str]:
+    """Stream the export of the samples of the queryset as CSV, one string
+    per chunk of rows
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metrics (list): Metrics in the model|field format, without duplicates
+        chunk_size (int, optional): Number of rows per chunk. Defaults to
+        EXPORT_CHUNK_SIZE.
+
+    Yields:
+        str: CSV lines, the header first
+    """
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([*EXPORT_METADATA, *metrics])
+
+    for batch in get_batches(
+        get_export_rows(report_sample_queryset, metrics, chunk_size),
+        chunk_size,
+    ):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # header of an empty export
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_parquet(
+    report_sample_queryset: QuerySet, metrics: list, chunk_size: int = None
+) -> Iterator[bytes]:
+    """Stream the export of the samples of the queryset as a Parquet file
+    with one row group per chunk of rows. Needs pyarrow.
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metrics (list): Metrics in the model|field format, without duplicates
+        chunk_size (int, optional): Number of rows per row group. Defaults to
+        EXPORT_CHUNK_SIZE.
+
+    Yields:
+        bytes: Parts of the Parquet file, the footer last
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    schema = pa.schema(
+        [
+            ("sample_id", pa.string()),
+            ("date", pa.date32()),
+            ("project_name", pa.string()),
+            ("assay", pa.string()),
+            ("sequencer_id", pa.string()),
+            *[(metric, pa.float64()) for metric in metrics],
+        ]
+    )
+    buffer = StreamBuffer()
+
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for batch in get_batches(
+            get_export_rows(report_sample_queryset, metrics, chunk_size),
+            chunk_size,
+        ):
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(column, type=field.type)
+                        for column, field in zip(zip(*batch), schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield buffer.pop()
+
+    yield buffer.pop()
+
+
+def stream_export(
+    report_sample_queryset: QuerySet,
+    metrics: list,
+    export_format: str,
+    chunk_size: int = None,
+) -> Iterator:
+    """Stream the export of the samples of the queryset in the given format
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metrics (list): Metrics in the model|field format, without duplicates
+        export_format (str): Format of the export, see EXPORT_FORMATS
+        chunk_size (int, optional): Number of rows per chunk. Defaults to
+        EXPORT_CHUNK_SIZE.
+
+    Returns:
+        Iterator: Iterator of the parts of the export, strings for CSV and
+        bytes for Parquet
+    """
+
+    if export_format == "parquet":
+        return stream_parquet(report_sample_queryset, metrics, chunk_size)
+
+    return stream_csv(report_sample_queryset, metrics, chunk_size)
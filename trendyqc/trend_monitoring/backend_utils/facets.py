@@ -0,0 +1,116 @@
+from functools import cache
+from typing import Dict
+
+from django.conf import settings
+
+from trend_monitoring.models import bam_qc, fastq_qc, vcf_qc
+from trend_monitoring.models.metadata import Report, Report_Sample
+from .cache import get_generation, get_plot_cache
+
+FACETS_KEY = "dashboard_facets"
+
+
+def get_module_plotable_metrics(module) -> Dict:
+    """Gather all the plotable metrics by model in a dict
+
+    Args:
+        module (module): Module containing the definition of models
+
+    Returns:
+        dict: Dict with the name of the model as key and the name of the
+        field as value
+    """
+
+    plotable_metrics = {}
+
+    # loop through the modules' classes and get their name and object into
+    # a dict
+    module_dict = dict(
+        [
+            (name, cls)
+            for name, cls in module.__dict__.items()
+            if isinstance(cls, type)
+        ]
+    )
+
+    for model_name, model in module_dict.items():
+        if model_name in settings.DISPLAY_DATA_JSON:
+            display_name = settings.DISPLAY_DATA_JSON[model_name]
+            plotable_metrics.setdefault(display_name, [])
+
+            for field in model._meta.fields:
+                # get the type of the field
+                field_type = field.get_internal_type()
+
+                # only get fields with those type for plotability
+                if field_type in ["FloatField", "IntegerField"]:
+                    plotable_metrics[display_name].append(field.name)
+
+            plotable_metrics[display_name].sort()
+
+    return plotable_metrics
+
+
+@cache
+def get_plotable_metrics() -> Dict:
+    """Get the plotable metrics of the QC models. The models don't change
+    while the app is running so the introspection is only done once per
+    process.
+
+    Returns:
+        dict: Dict with the display name of the model as key and the sorted
+        list of its plotable fields as value, sorted by display name
+    """
+
+    plotable_metrics = {
+        **get_module_plotable_metrics(bam_qc),
+        **get_module_plotable_metrics(fastq_qc),
+        **get_module_plotable_metrics(vcf_qc),
+    }
+    return dict(sorted(plotable_metrics.items()))
+
+
+def query_facets() -> Dict:
+    """Query the distinct values used to populate the dashboard dropdowns
+
+    Returns:
+        dict: Dict with the sorted assays, sequencer ids and project names
+    """
+
+    return {
+        "assays": list(
+            Report_Sample.objects.order_by("assay")
+            .values_list("assay", flat=True)
+            .distinct()
+        ),
+        "sequencer_ids": list(
+            Report.objects.order_by("sequencer_id")
+            .values_list("sequencer_id", flat=True)
+            .distinct()
+        ),
+        "project_names": list(
+            Report.objects.order_by("project_name")
+            .values_list("project_name", flat=True)
+            .distinct()
+        ),
+    }
+
+
+def get_dashboard_facets() -> Dict:
+    """Get the values used to populate the dashboard dropdowns from the cache
+    or query them. The entry is stored under the plot cache generation so it
+    is invalidated when new reports are imported.
+
+    Returns:
+        dict: Dict with the sorted assays, sequencer ids and project names
+    """
+
+    plot_cache = get_plot_cache()
+    cache_key = f"{FACETS_KEY}:{get_generation()}"
+    facets = plot_cache.get(cache_key)
+
+    if facets is None:
+        facets = query_facets()
+        plot_cache.set(cache_key, facets)
+
+    return facets
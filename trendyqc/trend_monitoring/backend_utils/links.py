@@ -0,0 +1,67 @@
+import logging
+from typing import Dict
+from urllib.parse import urlencode
+
+from django.core import signing
+from django.urls import reverse
+
+from .cache import canonicalise_form
+
+logger = logging.getLogger("basic")
+
+# salt of the signatures of the plot tokens so that they can't be used in
+# place of other values signed by the app
+PLOT_TOKEN_SALT = "trend_monitoring.plot"
+
+
+def get_plot_token(form: Dict) -> str:
+    """Get the compact signed token of the form data used in the plot URLs.
+    The form data is canonicalised i.e. equivalent filters give the same
+    token and the days back option stays relative to the current date.
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        str: URL safe signed token
+    """
+
+    return signing.dumps(
+        canonicalise_form(form), salt=PLOT_TOKEN_SALT, compress=True
+    )
+
+
+def get_plot_form(token: str) -> Dict:
+    """Get the form data of a plot token
+
+    Args:
+        token (str): Token returned by get_plot_token
+
+    Returns:
+        dict: Dict of the form data, None if the token is missing or its
+        signature is invalid
+    """
+
+    if not token:
+        return None
+
+    try:
+        return signing.loads(token, salt=PLOT_TOKEN_SALT)
+    except signing.BadSignature:
+        logger.warning(f"Invalid plot token: {token}")
+        return None
+
+
+def get_plot_url(form: Dict) -> str:
+    """Get the URL of the plot page of the form data
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        str: Path of the plot page with the plot token
+    """
+
+    # the separators of the signed token are valid in the query string
+    query = urlencode({"f": get_plot_token(form)}, safe=":")
+    return f"{reverse('Plot')}?{query}"
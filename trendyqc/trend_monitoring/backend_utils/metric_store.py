@@ -0,0 +1,149 @@
+import math
+from typing import Dict, List
+
+from django.db import transaction
+
+from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.metric_store import Metric, Metric_value
+from .plot import get_metric_filter, get_metric_queryset, is_lane_metric
+from .summary import get_summary_metrics
+
+
+def get_metric_ids(metrics: Dict) -> Dict:
+    """Get the ids of the given metrics in the metric dictionary. Metrics
+    that are not in the dictionary are added.
+
+    Args:
+        metrics (dict): Dict with the lowercase model name as key and the list
+        of its fields as value, see get_summary_metrics
+
+    Returns:
+        dict: Dict with a (model, field) tuple as key and the metric id as
+        value
+    """
+
+    Metric.objects.bulk_create(
+        [
+            Metric(model=model_name, field=field)
+            for model_name, fields in metrics.items()
+            for field in fields
+        ],
+        ignore_conflicts=True,
+    )
+
+    return {
+        (metric.model, metric.field): metric.id
+        for metric in Metric.objects.all()
+    }
+
+
+def get_report_metric_values(report: Report) -> List:
+    """Get the numerical metrics of the samples of the given report from the
+    tables of the tools
+
+    Args:
+        report (Report): Report object
+
+    Returns:
+        list: List of (report sample id, model name, field, lane, read, value)
+        tuples, the lane and read are empty for the metrics not stored per
+        lane
+    """
+
+    report_samples = Report_Sample.objects.filter(report=report)
+    metric_values = []
+
+    for model_name, fields in get_summary_metrics().items():
+        metric_filters = {
+            field: get_metric_filter(model_name, field) for field in fields
+        }
+        # lane metrics share the same lane columns so remove duplicates
+        columns = list(
+            dict.fromkeys(
+                column
+                for metric_filter in metric_filters.values()
+                for column in metric_filter
+            )
+        )
+
+        rows = get_metric_queryset(report_samples, model_name).values(
+            "id", *columns
+        )
+
+        for row in rows:
+            for field, metric_filter in metric_filters.items():
+                value = row[metric_filter[-1]]
+
+                if value is None or math.isnan(value):
+                    continue
+
+                if is_lane_metric(metric_filter):
+                    lane, read = row[metric_filter[0]], row[metric_filter[1]]
+                else:
+                    lane, read = "", ""
+
+                metric_values.append(
+                    (
+                        row["id"],
+                        model_name,
+                        field,
+                        lane or "",
+                        read or "",
+                        value,
+                    )
+                )
+
+    return metric_values
+
+
+def compute_metric_values(report: Report) -> List:
+    """Copy the numerical metrics of the samples of the given report in the
+    long format used by the metric value table
+
+    Args:
+        report (Report): Report object
+
+    Returns:
+        list: List of unsaved Metric_value objects
+    """
+
+    metric_ids = get_metric_ids(get_summary_metrics())
+    metric_values = {}
+
+    for (
+        report_sample_id,
+        model_name,
+        field,
+        lane,
+        read,
+        value,
+    ) in get_report_metric_values(report):
+        metric_id = metric_ids[(model_name, field)]
+        # the key of the unique constraint of the table
+        key = (report_sample_id, metric_id, lane, read)
+        metric_values[key] = Metric_value(
+            report_sample_id=report_sample_id,
+            metric_id=metric_id,
+            lane=lane,
+            sample_read=read,
+            value=value,
+        )
+
+    return list(metric_values.values())
+
+
+@transaction.atomic
+def update_metric_values(report: Report) -> int:
+    """Replace the metric values stored for the samples of the given report
+
+    Args:
+        report (Report): Report object
+
+    Returns:
+        int: Number of metric values created
+    """
+
+    metric_values = compute_metric_values(report)
+    Metric_value.objects.filter(report_sample__report=report).delete()
+    Metric_value.objects.bulk_create(metric_values, batch_size=1000)
+    return len(metric_values)
@@ -0,0 +1,155 @@
+import os
+from typing import Dict
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Max
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+from trend_monitoring.models.metadata import Report
+
+# the metrics of the gunicorn workers are shared through files written in
+# this directory, it needs to be set before the app starts
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUEST_LATENCY = Histogram(
+    "trendyqc_request_duration_seconds",
+    "Time spent handling the requests",
+    ["view", "method", "action"],
+)
+REQUEST_SQL_QUERIES = Counter(
+    "trendyqc_request_sql_queries",
+    "Number of SQL queries run by the requests",
+    ["view", "method", "action"],
+)
+REQUEST_SQL_TIME = Counter(
+    "trendyqc_request_sql_seconds",
+    "Time spent in SQL queries by the requests",
+    ["view", "method", "action"],
+)
+PLOT_PAYLOAD_SIZE = Histogram(
+    "trendyqc_plot_payload_characters",
+    "Number of characters of the traces of the plot payloads built",
+    buckets=[10**power for power in range(3, 9)],
+)
+PLOT_CACHE_REQUESTS = Counter(
+    "trendyqc_plot_cache_requests",
+    "Lookups of plot payloads in the plot cache",
+    ["result"],
+)
+
+
+def observe_request(
+    view: str, method: str, action: str, wall_time: float, timings: Dict
+):
+    """Add a request to the Prometheus metrics
+
+    Args:
+        view (str): Name of the view
+        method (str): HTTP method
+        action (str): Form action of POST requests, empty string otherwise
+        wall_time (float): Time in seconds spent handling the request
+        timings (dict): Timings of the request, see new_request_timings
+    """
+
+    labels = (view, method, action)
+    REQUEST_LATENCY.labels(*labels).observe(wall_time)
+    REQUEST_SQL_QUERIES.labels(*labels).inc(timings["sql_queries"])
+    REQUEST_SQL_TIME.labels(*labels).inc(timings["sql_time"])
+
+
+def get_table_row_counts() -> Dict:
+    """Get the number of rows of the tables of the app. PostgreSQL statistics
+    are used in order to not count the rows of every table at every scrape.
+
+    Returns:
+        dict: Dict with the table name as key and the number of rows as value
+    """
+
+    models = apps.get_app_config("trend_monitoring").get_models()
+
+    if connection.vendor != "postgresql":
+        return {
+            model._meta.db_table: model.objects.count() for model in models
+        }
+
+    tables = [model._meta.db_table for model in models]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, n_live_tup FROM pg_stat_user_tables "
+            "WHERE relname = ANY(%s)",
+            [tables],
+        )
+        return dict(cursor.fetchall())
+
+
+def get_last_import_time() -> float:
+    """Get the time of the latest import of new reports from the import date
+    of the reports
+
+    Returns:
+        float: Unix timestamp, None if no report has an import date
+    """
+
+    last_import_date = Report.objects.aggregate(
+        latest=Max("import_date")
+    )["latest"]
+
+    if last_import_date is None:
+        return None
+
+    return last_import_date.timestamp()
+
+
+class DatabaseCollector:
+    """Collect the metrics read from the database when the metrics are
+    scraped
+    """
+
+    def collect(self):
+        rows = GaugeMetricFamily(
+            "trendyqc_table_rows", "Number of rows per table", labels=["table"]
+        )
+
+        for table, nb_rows in sorted(get_table_row_counts().items()):
+            rows.add_metric([table], nb_rows)
+
+        yield rows
+
+        last_import_time = get_last_import_time()
+
+        if last_import_time is not None:
+            yield GaugeMetricFamily(
+                "trendyqc_last_import_timestamp_seconds",
+                "Time of the latest import of new reports",
+                value=last_import_time,
+            )
+
+
+def get_metrics_registry() -> CollectorRegistry:
+    """Get the registry of the metrics exposed to Prometheus. With multiple
+    gunicorn workers, the metrics of every worker are read from the
+    multiprocess directory.
+
+    Returns:
+        CollectorRegistry: Registry of the metrics of the app
+    """
+
+    registry = CollectorRegistry()
+
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+
+    registry.register(DatabaseCollector())
+    return registry
@@ -0,0 +1,290 @@
+import json
+import logging
+from typing import Dict
+
+import pandas as pd
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+
+from .cache import get_cache_key, get_plot_cache
+from .monitoring import PLOT_CACHE_REQUESTS, PLOT_PAYLOAD_SIZE
+from .plot import (
+    get_subset_queryset,
+    get_subset_runs,
+    get_bucket_size,
+    get_data_for_plotting,
+    get_scatter_data,
+    downsample_scatter,
+    format_buckets_for_plotly_js,
+    format_data_for_plotly_js,
+    format_scatter_for_plotly_js,
+    format_summary_for_plotly_js,
+)
+from .spc import (
+    get_control_chart_data,
+    get_control_limits,
+    get_run_violations,
+)
+from .summary import get_run_summary_data
+from .timing import timed
+
+logger = logging.getLogger("basic")
+
+
+def build_plot_payload(form: Dict) -> Dict:
+    """Run the queryset -> dataframe -> traces pipeline for the given form
+    data
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        dict: Dict containing a status ("ok", "no_data" or "error") and for
+        the "ok" status, the data needed to render the plot and the size of
+        the time buckets if the samples are aggregated or the number of
+        points if a metric is selected for the X-axis
+    """
+
+    payload = {
+        "status": "ok",
+        "plot": None,
+        "is_grouped": None,
+        "skipped_projects": {},
+        "skipped_samples": {},
+        "nb_summary_runs": None,
+        "bucket_size": None,
+        "is_scatter": False,
+        "nb_points": None,
+        "nb_displayed_points": None,
+        "control_limits": [],
+        "spc_violations": {},
+        "warning": None,
+        "error": None,
+    }
+
+    # get queryset of report_sample filtered using the "subset" options
+    # selected by the user and passed through the form
+    subset_queryset = get_subset_queryset(form)
+    runs = get_subset_runs(subset_queryset)
+
+    if runs.empty:
+        payload["status"] = "no_data"
+        return payload
+
+    if form.get("metrics_x"):
+        return build_scatter_payload(form, subset_queryset, payload)
+
+    # the samples of long time windows are aggregated in time buckets
+    bucket_size = get_bucket_size(
+        runs["date"], form.get("bucket", ["auto"])[0]
+    )
+
+    # long time windows displayed run by run are plotted using the
+    # precomputed run summaries instead of the values of every sample, in
+    # the automatic mode between SUMMARY_PLOT_RUN_THRESHOLD and
+    # BUCKET_PLOT_RUN_THRESHOLD runs
+    if bucket_size is None and len(form["metrics_y"]) == 1:
+        with timed("pandas"):
+            summary_data = get_run_summary_data(form, form["metrics_y"][0])
+            nb_runs = summary_data["project_name"].nunique()
+
+        if nb_runs > settings.SUMMARY_PLOT_RUN_THRESHOLD:
+            with timed("traces"):
+                data = format_summary_for_plotly_js(summary_data)
+
+            if len(data) != 2:
+                payload["status"] = "error"
+                payload["error"] = data
+                return payload
+
+            payload["plot"], payload["is_grouped"] = data
+            payload["nb_summary_runs"] = nb_runs
+            add_control_chart(payload, form, runs)
+            return payload
+
+    with timed("pandas"):
+        (data_dfs, projects_no_metric, samples_no_metric) = (
+            get_data_for_plotting(subset_queryset, form["metrics_y"])
+        )
+
+    if len(data_dfs) != 1:
+        payload["warning"] = (
+            "An error occurred using the following filtering data: "
+            f"{form}"
+        )
+
+    with timed("traces"):
+        if bucket_size:
+            data = format_buckets_for_plotly_js(data_dfs[0], bucket_size)
+            payload["bucket_size"] = bucket_size
+        else:
+            data = format_data_for_plotly_js(
+                data_dfs[0], settings.PLOT_ENCODING
+            )
+
+    if len(data) != 2:
+        payload["status"] = "error"
+        payload["error"] = data
+        return payload
+
+    payload["plot"], payload["is_grouped"] = data
+    # sets are converted for the payload to be serialisable
+    payload["skipped_projects"] = {
+        metric: sorted(projects)
+        for metric, projects in projects_no_metric.items()
+    }
+    payload["skipped_samples"] = {
+        metric: {
+            project: sorted(samples) for project, samples in projects.items()
+        }
+        for metric, projects in samples_no_metric.items()
+    }
+
+    if len(form["metrics_y"]) == 1:
+        add_control_chart(payload, form, runs)
+
+    return payload
+
+
+def add_control_chart(
+    payload: Dict, form: Dict, runs: pd.DataFrame
+) -> None:
+    """Add the control limits of the runs of the subset and the runs
+    violating the Westgard rules to the payload, both using the baselines of
+    compute_control_chart
+
+    Args:
+        payload (dict): Payload built by build_plot_payload
+        form (dict): Dict of the cleaned form data
+        runs (pd.DataFrame): Runs of the subset, see get_subset_runs
+    """
+
+    metric = form["metrics_y"][0]
+
+    with timed("pandas"):
+        chart_data = get_control_chart_data(form, metric)
+        payload["control_limits"] = get_control_limits(
+            chart_data, runs["project_name"]
+        )
+        payload["spc_violations"] = get_run_violations(
+            chart_data, runs["project_name"]
+        )
+
+
+def build_scatter_payload(
+    form: Dict, subset_queryset: QuerySet, payload: Dict
+) -> Dict:
+    """Add the metric vs metric scatter plot of the samples of the subset to
+    the payload. The points are downsampled above SCATTER_PLOT_MAX_POINTS.
+
+    Args:
+        form (dict): Dict of the cleaned form data
+        subset_queryset (QuerySet): Report sample queryset of the subset
+        payload (dict): Payload initialised by build_plot_payload
+
+    Returns:
+        dict: Plot payload, see build_plot_payload
+    """
+
+    with timed("pandas"):
+        data, projects_no_metric, samples_no_metric = get_scatter_data(
+            subset_queryset, form["metrics_x"][0], form["metrics_y"][0]
+        )
+
+    if data.empty:
+        payload["status"] = "no_data"
+        return payload
+
+    with timed("traces"):
+        displayed_data = downsample_scatter(
+            data, settings.SCATTER_PLOT_MAX_POINTS
+        )
+        plot = format_scatter_for_plotly_js(displayed_data)
+
+    if len(plot) != 2:
+        payload["status"] = "error"
+        payload["error"] = plot
+        return payload
+
+    payload["plot"], payload["is_grouped"] = plot
+    payload["is_scatter"] = True
+    payload["nb_points"] = len(data)
+    payload["nb_displayed_points"] = len(displayed_data)
+    payload["skipped_projects"] = {
+        metric: sorted(projects)
+        for metric, projects in projects_no_metric.items()
+    }
+    payload["skipped_samples"] = {
+        metric: {
+            project: sorted(samples) for project, samples in projects.items()
+        }
+        for metric, projects in samples_no_metric.items()
+    }
+
+    return payload
+
+
+def get_plot_payload(form: Dict) -> Dict:
+    """Get the plot payload for the given form data from the plot cache or
+    build it and store it in the cache
+
+    Args:
+        form (dict): Dict of the cleaned form data
+
+    Returns:
+        dict: Plot payload, see build_plot_payload
+    """
+
+    cache = get_plot_cache()
+    cache_key = get_cache_key(form)
+    payload = cache.get(cache_key)
+
+    if payload is not None:
+        PLOT_CACHE_REQUESTS.labels("hit").inc()
+        return payload
+
+    PLOT_CACHE_REQUESTS.labels("miss").inc()
+    payload = build_plot_payload(form)
+    PLOT_PAYLOAD_SIZE.observe(len(payload["plot"] or ""))
+
+    # errors are not cached in order to be reported every time and big
+    # payloads are not cached to protect the cache size
+    if payload["status"] != "error" and (
+        len(payload["plot"] or "") <= settings.PLOT_CACHE_MAX_PAYLOAD_SIZE
+    ):
+        cache.set(cache_key, payload)
+
+    return payload
+
+
+def dump_plot_payload(payload: Dict) -> str:
+    """Serialise the plot payload for the API. The plot and grouping are
+    already JSON strings so they are inserted as is instead of being
+    decoded and encoded again.
+
+    Args:
+        payload (dict): Plot payload with the "ok" status
+
+    Returns:
+        str: JSON string of the payload
+    """
+
+    other_data = json.dumps(
+        {
+            "skipped_projects": payload["skipped_projects"],
+            "skipped_samples": payload["skipped_samples"],
+            "nb_summary_runs": payload["nb_summary_runs"],
+            "bucket_size": payload.get("bucket_size"),
+            "is_scatter": payload.get("is_scatter", False),
+            "nb_points": payload.get("nb_points"),
+            "nb_displayed_points": payload.get("nb_displayed_points"),
+            "control_limits": payload.get("control_limits", []),
+            "spc_violations": payload.get("spc_violations", {}),
+        }
+    )
+
+    return (
+        f'{{"plot": {payload["plot"]}, "is_grouped": {payload["is_grouped"]}, '
+        f"{other_data[1:]}"
+    )
@@ -1,3 +1,4 @@
+import base64
 import calendar
 from copy import deepcopy
 import datetime
@@ -6,14 +7,74 @@ import re
 from typing import Dict
 
 from dateutil.relativedelta import relativedelta
+import numpy as np
 import pandas as pd
 
 from django.apps import apps
 from django.conf import settings
 from django.core.exceptions import FieldError
+from django.db.models import Avg, FilteredRelation, Q
 from django.db.models.query import QuerySet
 from django.core.exceptions import ImproperlyConfigured
 from trend_monitoring.models.metadata import Report_Sample
+from trend_monitoring.models.metric_store import Metric_value
+from trend_monitoring.models.vcf_qc import Happy_metrics
+
+# models storing data per lane and read, linked to report_sample in a long
+# format i.e. one row per lane and read
+LANE_MODELS = ["read_data", "base_distribution_by_cycle_metrics"]
+
+# models of the forms for the hap.py data, the data is stored in the
+# happy_metrics table using the variant type and filter of the model
+HAPPY_MODELS = {
+    "happy_snp_all": ("snp", "ALL"),
+    "happy_snp_pass": ("snp", "PASS"),
+    "happy_indel_all": ("indel", "ALL"),
+    "happy_indel_pass": ("indel", "PASS"),
+}
+
+# colors of the lane traces, the first 2 lanes keep their historical colors
+LANE_COLORS = [
+    "AED6F1",
+    "F1948A",
+    "A9DFBF",
+    "F9E79F",
+    "D7BDE2",
+    "FAD7A0",
+    "A3E4D7",
+    "D5DBDB",
+]
+
+# report sample lookups of the columns of METADATA_COLUMNS
+REPORT_SAMPLE_METADATA = [
+    "sample__sample_id",
+    "report__date",
+    "report__project_name",
+    "assay",
+    "report__sequencer_id",
+    "report__display_month",
+]
+
+# pandas period frequencies of the time buckets used to aggregate the samples
+# of long date ranges, from the smallest to the biggest
+BUCKET_FREQUENCIES = {"week": "W", "month": "M", "quarter": "Q"}
+
+# regex to match most dates of the project names in the YYMMDD format, it
+# also matches dates that don't exist i.e. months 00 and 13 to 19
+PROJECT_DATE_REGEX = r"[0-9]{2}[0-1][0-9][0-3][0-9]"
+
+# number of cells per axis of the grid used to downsample the scatter plots
+SCATTER_GRID_SIZE = 100
+
+# columns of the plotting dataframe which are not metric values
+METADATA_COLUMNS = [
+    "sample_id",
+    "date",
+    "project_name",
+    "assay",
+    "sequencer_id",
+    "display_month",
+]
 
 
 def get_subset_queryset(data: Dict) -> QuerySet:
@@ -28,6 +89,24 @@ def get_subset_queryset(data: Dict) -> QuerySet:
         after filtering using the data inputted by the user
     """
 
+    # combine all the data passed through the form to build the final queryset
+    return Report_Sample.objects.filter(
+        **get_subset_filter(data)
+    ).prefetch_related()
+
+
+def get_subset_filter(data: Dict) -> Dict:
+    """Build the filter dict for the subset that the user inputted. The keys
+    are relative to a model with an assay field and a report foreign key i.e.
+    Report_Sample or Run_metric_summary
+
+    Args:
+        data (dict): Dict of data from the subset part of the form
+
+    Returns:
+        dict: Dict of Django lookups to pass to a filter call
+    """
+
     filter_dict = {}
 
     assays = data.get("assay_select", [])
@@ -69,8 +148,7 @@ def get_subset_queryset(data: Dict) -> QuerySet:
 
             filter_dict["report__date__range"] = (date_start, date_end)
 
-    # combine all the data passed through the form to build the final queryset
-    return Report_Sample.objects.filter(**filter_dict).prefetch_related()
+    return filter_dict
 
 
 def get_data_for_plotting(
@@ -128,25 +206,26 @@ def get_data_for_plotting(
         # get the filter string needed to get the metric data from the queryset
         metric_filter = get_metric_filter(model, form_metric)
 
-        df = pd.DataFrame(
-            report_sample_queryset.values(
-                "sample__sample_id",
-                "report__date",
-                "report__project_name",
-                "assay",
-                "report__sequencer_id",
-                *metric_filter,
+        if settings.PLOTTING_BACKEND == "metric_value":
+            df = get_metric_value_data(
+                report_sample_queryset, model, form_metric, metric_filter
+            )
+        else:
+            df = pd.DataFrame(
+                get_metric_queryset(report_sample_queryset, model).values(
+                    *REPORT_SAMPLE_METADATA, *metric_filter
+                )
             )
-        )
 
-        df.columns = [
-            "sample_id",
-            "date",
-            "project_name",
-            "assay",
-            "sequencer_id",
-            *metric_filter,
-        ]
+            df.columns = [*METADATA_COLUMNS, *metric_filter]
+
+        if is_lane_metric(metric_filter):
+            df = pivot_lane_data(df, metric_filter)
+            metric_filter = [
+                column
+                for column in df.columns
+                if column not in METADATA_COLUMNS
+            ]
 
         for project_name in df["project_name"].unique():
             # get subdataframe for a single run
@@ -182,6 +261,168 @@ def get_data_for_plotting(
     return list_df, projects_no_metrics, samples_no_metric
 
 
+def get_metric_value_data(
+    report_sample_queryset: QuerySet,
+    form_model: str,
+    form_metric: str,
+    metric_filter: list,
+) -> pd.DataFrame:
+    """Get the data of the metric from the metric value table. The values are
+    found using the (metric, report_sample) index and merged with the
+    metadata of the report samples.
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        form_model (str): Model name from the form
+        form_metric (str): Metric name from the form
+        metric_filter (list): Metric filter returned by get_metric_filter,
+        used to name the columns in the same way as the other backend
+
+    Returns:
+        pd.DataFrame: Dataframe with the metadata columns and the columns of
+        the metric filter, samples without values have empty values
+    """
+
+    metadata = pd.DataFrame(
+        report_sample_queryset.values("id", *REPORT_SAMPLE_METADATA)
+    )
+    metadata.columns = ["id", *METADATA_COLUMNS]
+
+    metric_values = pd.DataFrame(
+        Metric_value.objects.filter(
+            metric__model=form_model,
+            metric__field=form_metric,
+            report_sample__in=report_sample_queryset.values("id"),
+        ).values("report_sample_id", "lane", "sample_read", "value"),
+        columns=["report_sample_id", "lane", "sample_read", "value"],
+    )
+
+    if is_lane_metric(metric_filter):
+        value_columns = {
+            "lane": metric_filter[0],
+            "sample_read": metric_filter[1],
+            "value": metric_filter[2],
+        }
+    else:
+        value_columns = {"value": metric_filter[0]}
+
+    data = metadata.merge(
+        metric_values.rename(columns=value_columns),
+        how="left",
+        left_on="id",
+        right_on="report_sample_id",
+    )
+
+    return data[[*METADATA_COLUMNS, *metric_filter]]
+
+
+def get_metric_queryset(
+    report_sample_queryset: QuerySet, form_model: str
+) -> QuerySet:
+    """Add the relations needed by the metric filter of the given model to
+    the queryset. The hap.py models are a join on the happy metrics rows of
+    their variant type and filter, named using the model name.
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        form_model (str): Model name from the form
+
+    Returns:
+        QuerySet: Report sample queryset that can be used with the metric
+        filter returned by get_metric_filter
+    """
+
+    if form_model not in HAPPY_MODELS:
+        return report_sample_queryset
+
+    variant_type, happy_filter = HAPPY_MODELS[form_model]
+
+    return report_sample_queryset.annotate(
+        **{
+            form_model: FilteredRelation(
+                "happy_metrics",
+                condition=Q(
+                    happy_metrics__variant_type=variant_type,
+                    happy_metrics__filter=happy_filter,
+                ),
+            )
+        }
+    )
+
+
+def is_lane_metric(metric_filter: list) -> bool:
+    """Check if the metric filter returned by get_metric_filter is for data
+    stored per lane and read
+
+    Args:
+        metric_filter (list): Metric filter returned by get_metric_filter
+
+    Returns:
+        bool: True if the rows returned with this filter are per lane and read
+    """
+
+    return metric_filter[0].split("__")[0] in LANE_MODELS
+
+
+def pivot_lane_data(data: pd.DataFrame, metric_filter: list) -> pd.DataFrame:
+    """Pivot the rows per sample, lane and read into one row per sample. The
+    lanes of a sample are numbered in order i.e. L005 and L006 are the first
+    and second lanes.
+
+    Args:
+        data (pd.DataFrame): Dataframe with the metadata columns and the lane,
+        read and value columns of the metric filter
+        metric_filter (list): Metric filter returned by get_metric_filter
+
+    Returns:
+        pd.DataFrame: Dataframe with the metadata columns, one lane name
+        column per lane and one value column per lane and read:
+            +-----+--------+--------+---------------+---------------+-----+
+            | ... | lane_1 | lane_2 | metric_L1_R1  | metric_L1_R2  | ... |
+            +-----+--------+--------+---------------+---------------+-----+
+    """
+
+    lane_column, read_column, value_column = metric_filter
+    field_name = value_column.split("__")[-1]
+    # a sample can be present in multiple runs
+    sample_keys = ["sample_id", "project_name"]
+
+    lanes = (
+        data[[*sample_keys, lane_column]]
+        .dropna()
+        .drop_duplicates()
+        .sort_values(lane_column)
+    )
+    lanes["lane_nb"] = lanes.groupby(sample_keys).cumcount() + 1
+    data = data.merge(lanes, on=[*sample_keys, lane_column], how="left")
+    # samples without lane data keep one lane of empty values
+    nb_lanes = max(int(lanes["lane_nb"].max()) if not lanes.empty else 0, 1)
+
+    pivoted_data = data[METADATA_COLUMNS].drop_duplicates(sample_keys)
+    pivoted_data = pivoted_data.set_index(sample_keys, drop=False)
+    value_columns = []
+
+    for lane_nb in range(1, nb_lanes + 1):
+        lane_data = data[data["lane_nb"] == lane_nb]
+        pivoted_data[f"lane_{lane_nb}"] = lane_data.drop_duplicates(
+            sample_keys
+        ).set_index(sample_keys)[lane_column]
+
+        for read in ["R1", "R2"]:
+            read_data = lane_data[lane_data[read_column] == read]
+            column = f"{field_name}_L{lane_nb}_{read}"
+            pivoted_data[column] = read_data.drop_duplicates(
+                sample_keys
+            ).set_index(sample_keys)[value_column]
+            value_columns.append(column)
+
+    lane_columns = [f"lane_{lane_nb}" for lane_nb in range(1, nb_lanes + 1)]
+
+    return pivoted_data.reset_index(drop=True)[
+        [*METADATA_COLUMNS, *lane_columns, *value_columns]
+    ]
+
+
 def get_metric_filter(form_model: str, form_metric: str) -> str:
     """Get the metric filter needed to extract the metric data from the
     queryset
@@ -197,6 +438,22 @@ def get_metric_filter(form_model: str, form_metric: str) -> str:
 
     metric_filter_dict = {}
 
+    # the hap.py data is queried through the relation added by
+    # get_metric_queryset, the field names of the happy metrics table don't
+    # have the variant type suffix of the form metric i.e. metric_recall_snp
+    if form_model in HAPPY_MODELS:
+        variant_type, _ = HAPPY_MODELS[form_model]
+        field_name = form_metric.removesuffix(f"_{variant_type}")
+        happy_fields = [
+            field.name for field in Happy_metrics._meta.get_fields()
+        ]
+
+        assert (
+            field_name in happy_fields
+        ), f"{form_metric} does not exist in any model"
+
+        return [f"{form_model}__{field_name}"]
+
     # loop through the models and their fields to find in which model the
     # metric comes from
     for model in apps.get_models():
@@ -213,47 +470,25 @@ def get_metric_filter(form_model: str, form_metric: str) -> str:
 
     original_metric_filter = list(metric_filter_dict.values())[0]
 
-    # for fastqc and picard base distribution, build the metric filter directly
-    # to take into account the lanes
-    if "read_data" in original_metric_filter:
-        metric_filter = [
-            f"fastqc__{lane_read}__{original_metric_filter.split('__')[-1]}"
-            for lane_read in [
-                "read_data_1st_lane_R1",
-                "read_data_1st_lane_R2",
-                "read_data_2nd_lane_R1",
-                "read_data_2nd_lane_R2",
-            ]
+    # for fastqc and picard base distribution, get the lane and read with the
+    # metric using the long format link between the lane data and
+    # report_sample. The returned rows are per lane and read and are pivoted
+    # by get_data_for_plotting
+    model_name, field_name = original_metric_filter.split("__")
+
+    if model_name in LANE_MODELS:
+        return [
+            f"{model_name}__lane",
+            f"{model_name}__sample_read",
+            f"{model_name}__{field_name}",
         ]
-        metric_filter.insert(0, "fastqc__read_data_2nd_lane_R1__lane")
-        metric_filter.insert(0, "fastqc__read_data_1st_lane_R1__lane")
-        return metric_filter
-
-    elif "base_distribution" in original_metric_filter:
-        metric_filter = [
-            f"picard__{lane_read}__{original_metric_filter.split('__')[-1]}"
-            for lane_read in [
-                "base_distribution_by_cycle_metrics_1st_lane_R1",
-                "base_distribution_by_cycle_metrics_1st_lane_R2",
-                "base_distribution_by_cycle_metrics_2nd_lane_R1",
-                "base_distribution_by_cycle_metrics_2nd_lane_R2",
-            ]
-        ]
-        metric_filter.insert(
-            0, "picard__base_distribution_by_cycle_metrics_2nd_lane_R1__lane"
-        )
-        metric_filter.insert(
-            0, "picard__base_distribution_by_cycle_metrics_1st_lane_R1__lane"
-        )
-        return metric_filter
 
     # handle cases where there is an intermediary table between Report sample
     # and the table containing the metric field:
     # The list represent the cases we want to test. "" is testing if the field
-    # is in a table directly linked to report_sample. Fastqc, picard and happy
-    # are the intermediate tables that could separate the field to
-    # report_sample
-    for intermediate_table in ["", "picard", "happy"]:
+    # is in a table directly linked to report_sample. Picard is the
+    # intermediate table that could separate the field to report_sample
+    for intermediate_table in ["", "picard"]:
         if intermediate_table != "":
             # add the intermediary table in the filter string
             metric_filter = f"{intermediate_table}__{original_metric_filter}"
@@ -272,11 +507,16 @@ def get_metric_filter(form_model: str, form_metric: str) -> str:
     return None
 
 
-def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
+def format_data_for_plotly_js(
+    plot_data: pd.DataFrame, encoding: str = "full"
+) -> tuple:
     """Format the dataframe data for Plotly JS.
 
     Args:
         plot_data (pd.DataFrame): Pandas Dataframe containing the data to plot
+        encoding (str, optional): "full" for traces directly usable by Plotly
+        or "compact" for traces needing to be expanded by the frontend, see
+        create_trace. Defaults to "full".
 
     Example format:
     For tools with no lane data, the dataframe should only be 4 columns:
@@ -303,54 +543,23 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
         list: List of lists of the traces that need to be plotted
     """
 
-    try:
-        colors = settings.PLOTTING_COLORS
-    except AttributeError:
-        raise ImproperlyConfigured(
-            "PLOTTING_COLORS setting is missing. Please define it in your settings file."
-        )
-
-    if not isinstance(colors, dict):
-        raise ImproperlyConfigured(
-            "PLOTTING_COLORS must be a dictionary mapping assay names to colour lists."
-        )
-
+    colors = get_plotting_colors()
     colors_copy = deepcopy(colors)
 
-    # args dict for configuring the traces for combined, first, second lane
-    args = {
-        "Combined": {
-            "lane": None,
-            "visible": True,
-            "boxplot_color": None,
-            "boxplot_line_color": None,
-        },
-        "First lane": {
-            "lane": None,
-            "visible": "legendonly",
-            "boxplot_color": "AED6F1",
-            "boxplot_line_color": "000000",
-            "name": "First lane",
-            "offsetgroup": "First lane",
-            "legendgroup": "First lane",
-        },
-        "Second lane": {
-            "lane": None,
-            "visible": "legendonly",
-            "boxplot_color": "F1948A",
-            "boxplot_line_color": "000000",
-            "name": "Second lane",
-            "offsetgroup": "Second lane",
-            "legendgroup": "Second lane",
-        },
-    }
-
     # Bool to indicate whether legend needs to be displayed
     shown_legend = True
 
-    # get the column names for the metrics: either 6 columns when there is data
-    # for lanes or 1 column if the data is not separated by lane
-    metrics = plot_data.columns[5:]
+    # get the column names for the metrics: one lane name column and 2 read
+    # value columns per lane when there is data for lanes (see
+    # pivot_lane_data) or 1 column if the data is not separated by lane
+    metrics = [
+        column
+        for column in plot_data.columns
+        if column not in METADATA_COLUMNS
+    ]
+    nb_lanes = len(metrics) // 3
+    lane_columns = metrics[:nb_lanes]
+    value_columns = metrics[nb_lanes:]
 
     traces = []
 
@@ -362,9 +571,8 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
     if sum([len(v) for v in colors.values()]) < len(groups):
         return f"Not enough colors are possible for the groups: {groups}"
 
-    # first second lane flag to fix duplication in the legend
-    seen_first_lane = False
-    seen_second_lane = False
+    # lanes already displayed to fix duplication in the legend
+    seen_lanes = set()
 
     # for each project name, gather the necessary data to create the individual
     # boxplots
@@ -376,6 +584,13 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
 
         assay_name = data_one_run["assay"].unique()[0]
         sequencer_id = data_one_run["sequencer_id"].unique()[0]
+        # month label stored at import, dataframes built before it was
+        # stored fallback on parsing the project name
+        display_month = (
+            data_one_run["display_month"].iloc[0]
+            if "display_month" in data_one_run
+            else None
+        )
         legend_name = f"{assay_name} - {sequencer_id}"
 
         if legend_name not in seen_groups:
@@ -387,25 +602,38 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
             shown_legend = False
 
         if len(metrics) > 1:
-            # get the lane columns
-            first_lane_column = data_one_run.columns[5]
-            second_lane_column = data_one_run.columns[6]
-            # get the lane names
-            first_lane = list(set(data_one_run[first_lane_column].values))[0]
-            second_lane = list(set(data_one_run[second_lane_column].values))[0]
-
-            args["Combined"]["columns"] = plot_data.columns[7:]
-            args["First lane"]["columns"] = plot_data.columns[7:9]
-            args["Second lane"]["columns"] = plot_data.columns[9:11]
-
-            args["Combined"]["boxplot_color"] = seen_groups[legend_name]
-            args["Combined"]["boxplot_line_color"] = seen_groups[legend_name]
-            args["Combined"]["name"] = legend_name
-            args["Combined"]["offsetgroup"] = legend_name
-            args["Combined"]["legendgroup"] = legend_name
-
-            args["First lane"]["lane"] = first_lane
-            args["Second lane"]["lane"] = second_lane
+            # args dict for configuring the traces for combined and each lane
+            args = {
+                "Combined": {
+                    "lane": None,
+                    "visible": True,
+                    "boxplot_color": seen_groups[legend_name],
+                    "boxplot_line_color": seen_groups[legend_name],
+                    "name": legend_name,
+                    "offsetgroup": legend_name,
+                    "legendgroup": legend_name,
+                    "columns": value_columns,
+                },
+            }
+
+            for i, lane_column in enumerate(lane_columns):
+                lane_name = get_lane_trace_name(i)
+                lanes = data_one_run[lane_column].dropna().unique()
+
+                # this run has less lanes than other runs of the plot
+                if len(lanes) == 0:
+                    continue
+
+                args[lane_name] = {
+                    "lane": lanes[0],
+                    "visible": "legendonly",
+                    "boxplot_color": LANE_COLORS[i % len(LANE_COLORS)],
+                    "boxplot_line_color": "000000",
+                    "name": lane_name,
+                    "offsetgroup": lane_name,
+                    "legendgroup": lane_name,
+                    "columns": value_columns[i * 2 : i * 2 + 2],
+                }
 
             for name, sub_dict in args.items():
                 # calculate mean across appropriate columns
@@ -413,16 +641,14 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
                     :, sub_dict["columns"]
                 ].mean(axis=1)
 
-                if name == "First lane" and seen_first_lane:
-                    shown_legend = False
-
-                if name == "Second lane" and seen_second_lane:
+                if name in seen_lanes:
                     shown_legend = False
 
                 trace_args = {
                     "data": data_one_run,
                     "data_column": name,
                     "project_name": project_name,
+                    "display_month": display_month,
                     "name": sub_dict["name"],
                     "visible": sub_dict["visible"],
                     "lane": sub_dict["lane"],
@@ -431,20 +657,18 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
                     "offsetgroup": sub_dict["offsetgroup"],
                     "legendgroup": sub_dict["legendgroup"],
                     "showlegend": shown_legend,
+                    "encoding": encoding,
                 }
 
-                if name == "First lane":
-                    seen_first_lane = True
-
-                if name == "Second lane":
-                    seen_second_lane = True
+                if name != "Combined":
+                    seen_lanes.add(name)
 
                 traces.append(create_trace(**trace_args))
 
             is_grouped = True
 
         else:
-            metric_name = data_one_run.columns[-1]
+            metric_name = metrics[0]
 
             legend_args = {
                 "legendgroup": legend_name,
@@ -456,11 +680,13 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
                     "data": data_one_run,
                     "data_column": metric_name,
                     "project_name": project_name,
+                    "display_month": display_month,
                     "lane": None,
                     "offsetgroup": "",
                     "boxplot_color": seen_groups[legend_name],
                     "boxplot_line_color": seen_groups[legend_name],
                     "showlegend": shown_legend,
+                    "encoding": encoding,
                 },
                 **legend_args,
             }
@@ -471,12 +697,653 @@ def format_data_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
     return json.dumps(traces), json.dumps(is_grouped)
 
 
+def format_summary_for_plotly_js(summary_data: pd.DataFrame) -> tuple:
+    """Format the precomputed run summaries for Plotly JS. Each run is
+    displayed as a box using the stored statistics instead of the values of
+    every sample. The summaries of the lanes of lane metrics are displayed as
+    hidden boxes grouped with the box of the combined lanes.
+
+    Args:
+        summary_data (pd.DataFrame): Dataframe returned by
+        get_run_summary_data with one row per run, assay and lane
+
+    Returns:
+        tuple: JSON of the traces and JSON of the boolean indicating whether
+        the boxes are grouped
+    """
+
+    colors = get_plotting_colors()
+    colors_copy = deepcopy(colors)
+
+    groups = build_groups(summary_data)
+
+    if sum([len(v) for v in colors.values()]) < len(groups):
+        return f"Not enough colors are possible for the groups: {groups}"
+
+    if "lane" not in summary_data:
+        summary_data = summary_data.assign(lane="")
+
+    # index of the lane in the lanes of the run, in the same way as the
+    # lane traces built from the values of every sample
+    lane_rows = summary_data["lane"] != ""
+    summary_data = summary_data.assign(
+        lane_index=summary_data[lane_rows]
+        .groupby(["project_name", "assay"])["lane"]
+        .rank(method="dense")
+        .sub(1)
+    )
+    is_grouped = bool(lane_rows.any())
+
+    seen_groups = {}
+    # lanes already displayed to fix duplication in the legend
+    seen_lanes = set()
+    traces = []
+
+    for row in summary_data.sort_values(
+        ["date", "project_name", "lane"]
+    ).itertuples(index=False):
+        legend_name = f"{row.assay} - {row.sequencer_id}"
+
+        if legend_name not in seen_groups:
+            seen_groups[legend_name] = colors_copy[row.assay].pop(0)
+            shown_legend = True
+        else:
+            shown_legend = False
+
+        trace = {
+            "x": [
+                [
+                    getattr(row, "display_month", None)
+                    or get_date_from_project_name(row.project_name)
+                ],
+                [row.project_name],
+            ],
+            "q1": [row.q1],
+            "median": [row.median],
+            "q3": [row.q3],
+            "lowerfence": [row.min],
+            "upperfence": [row.max],
+            "mean": [row.mean],
+            "sd": [0 if pd.isna(row.stdev) else row.stdev],
+            "type": "box",
+            "text": [f"{row.n} samples"],
+        }
+
+        if row.lane:
+            lane_name = get_lane_trace_name(int(row.lane_index))
+            color = LANE_COLORS[int(row.lane_index) % len(LANE_COLORS)]
+            trace.update(
+                {
+                    "name": lane_name,
+                    "text": [f"{row.n} samples - {row.lane}"],
+                    "marker": {"color": color},
+                    "line": {"color": "000000"},
+                    "fillcolor": color + "80",
+                    "offsetgroup": lane_name,
+                    "legendgroup": lane_name,
+                    "legend": lane_name,
+                    "visible": "legendonly",
+                    "showlegend": lane_name not in seen_lanes,
+                }
+            )
+            seen_lanes.add(lane_name)
+        else:
+            color = seen_groups[legend_name]
+            trace.update(
+                {
+                    "name": legend_name,
+                    "marker": {"color": color},
+                    "line": {"color": color},
+                    "fillcolor": color + "80",
+                    "offsetgroup": legend_name if is_grouped else "",
+                    "legendgroup": legend_name,
+                    "legend": legend_name,
+                    "visible": True,
+                    "showlegend": shown_legend,
+                }
+            )
+
+        traces.append(trace)
+
+    return json.dumps(traces), json.dumps(is_grouped)
+
+
+def get_subset_runs(report_sample_queryset: QuerySet) -> pd.DataFrame:
+    """Get the runs of the report samples of the subset
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+
+    Returns:
+        pd.DataFrame: Dataframe with the project name and date of every run
+    """
+
+    runs = report_sample_queryset.values(
+        "report__project_name", "report__date"
+    ).distinct()
+
+    return pd.DataFrame(
+        runs, columns=["report__project_name", "report__date"]
+    ).rename(
+        columns={
+            "report__project_name": "project_name",
+            "report__date": "date",
+        }
+    )
+
+
+def get_bucket_size(run_dates: pd.Series, bucket: str = "auto") -> str:
+    """Get the size of the time buckets used to aggregate the samples. In
+    automatic mode, the runs are displayed individually up to
+    BUCKET_PLOT_RUN_THRESHOLD runs and above that, the smallest bucket size
+    giving at most BUCKET_PLOT_MAX_BOXES buckets is used.
+
+    Args:
+        run_dates (pd.Series): Dates of the runs in the subset, one per run
+        bucket (str, optional): Bucket option of the form, "auto", "run" or
+        one of the BUCKET_FREQUENCIES keys. Defaults to "auto".
+
+    Returns:
+        str: Bucket size i.e. "week", "month" or "quarter", None if every run
+        is displayed
+    """
+
+    if bucket in BUCKET_FREQUENCIES:
+        return bucket
+
+    if bucket == "run" or len(run_dates) <= settings.BUCKET_PLOT_RUN_THRESHOLD:
+        return None
+
+    dates = pd.to_datetime(run_dates)
+
+    for bucket_size, frequency in BUCKET_FREQUENCIES.items():
+        nb_buckets = dates.dt.to_period(frequency).nunique()
+
+        if nb_buckets <= settings.BUCKET_PLOT_MAX_BOXES:
+            return bucket_size
+
+    return bucket_size
+
+
+def get_bucket_labels(dates: pd.Series, bucket_size: str) -> pd.Series:
+    """Get the label of the bucket of every date. Labels sort in the same
+    order as the buckets i.e. 2024-01-29 (week start), 2024-01 or 2024Q1
+
+    Args:
+        dates (pd.Series): Dates to assign to a bucket
+        bucket_size (str): Bucket size i.e. "week", "month" or "quarter"
+
+    Returns:
+        pd.Series: Labels of the buckets
+    """
+
+    periods = pd.to_datetime(dates).dt.to_period(
+        BUCKET_FREQUENCIES[bucket_size]
+    )
+
+    if bucket_size == "week":
+        return periods.dt.start_time.dt.strftime("%Y-%m-%d")
+
+    return periods.astype(str)
+
+
+def get_bucket_range(bucket_label: str, bucket_size: str) -> tuple:
+    """Get the first and last days of a bucket
+
+    Args:
+        bucket_label (str): Label of the bucket, see get_bucket_labels
+        bucket_size (str): Bucket size i.e. "week", "month" or "quarter"
+
+    Returns:
+        tuple: Start and end dates of the bucket as YYYY-MM-DD strings
+    """
+
+    period = pd.Period(bucket_label, freq=BUCKET_FREQUENCIES[bucket_size])
+
+    return (
+        period.start_time.strftime("%Y-%m-%d"),
+        period.end_time.strftime("%Y-%m-%d"),
+    )
+
+
+def get_drill_down_form(
+    form: Dict, bucket_label: str, bucket_size: str
+) -> Dict:
+    """Get the form data displaying every run of the given bucket
+
+    Args:
+        form (dict): Dict of the cleaned form data of the bucketed plot
+        bucket_label (str): Label of the bucket, see get_bucket_labels
+        bucket_size (str): Bucket size i.e. "week", "month" or "quarter"
+
+    Returns:
+        dict: Dict of form data restricted to the dates of the bucket
+    """
+
+    return get_detail_form(
+        form, date_range=get_bucket_range(bucket_label, bucket_size)
+    )
+
+
+def get_detail_form(
+    form: Dict, date_range: tuple = None, runs: list = None
+) -> Dict:
+    """Get the form data displaying every sample of the given dates or runs
+    of an aggregated (bucketed or summary) plot
+
+    Args:
+        form (dict): Dict of the cleaned form data of the aggregated plot
+        date_range (tuple, optional): Start and end dates. Defaults to None.
+        runs (list, optional): List of project names. Defaults to None.
+
+    Returns:
+        dict: Dict of form data restricted to the dates or runs
+    """
+
+    detail_form = {
+        key: value for key, value in form.items() if key != "days_back"
+    }
+
+    if date_range:
+        detail_form["date_start"] = [date_range[0]]
+        detail_form["date_end"] = [date_range[1]]
+
+    if runs:
+        detail_form["run_select"] = sorted(runs)
+
+    detail_form["bucket"] = ["run"]
+    return detail_form
+
+
+def format_buckets_for_plotly_js(
+    plot_data: pd.DataFrame, bucket_size: str
+) -> tuple:
+    """Format the dataframe data for Plotly JS by aggregating the samples of
+    the runs of every time bucket. One trace is created per assay and
+    sequencer group (and lane) with the statistics of all its buckets.
+
+    Args:
+        plot_data (pd.DataFrame): Pandas Dataframe containing the data to
+        plot, see format_data_for_plotly_js
+        bucket_size (str): Bucket size i.e. "week", "month" or "quarter"
+
+    Returns:
+        tuple: JSON of the traces and JSON of the boolean indicating whether
+        the boxes are grouped
+    """
+
+    colors = get_plotting_colors()
+    colors_copy = deepcopy(colors)
+
+    groups = build_groups(plot_data)
+
+    if sum([len(v) for v in colors.values()]) < len(groups):
+        return f"Not enough colors are possible for the groups: {groups}"
+
+    metrics = [
+        column
+        for column in plot_data.columns
+        if column not in METADATA_COLUMNS
+    ]
+    nb_lanes = len(metrics) // 3
+    value_columns = metrics[nb_lanes:]
+
+    # values of the combined and individual lanes are the mean of the reads
+    # in the same way as format_data_for_plotly_js
+    series = {"Combined": value_columns if nb_lanes else metrics}
+
+    for i in range(nb_lanes):
+        series[get_lane_trace_name(i)] = value_columns[i * 2 : i * 2 + 2]
+
+    data = plot_data[["assay", "sequencer_id", "project_name"]].copy()
+    data["bucket"] = get_bucket_labels(plot_data["date"], bucket_size)
+
+    for name, columns in series.items():
+        data[name] = plot_data[columns].mean(axis=1)
+
+    grouped_data = data.groupby(["assay", "sequencer_id", "bucket"])
+    nb_runs = grouped_data["project_name"].nunique()
+    stats_per_series = {
+        name: grouped_data[name].describe() for name in series
+    }
+
+    traces = []
+    # lanes already displayed to fix duplication in the legend
+    seen_lanes = set()
+
+    for assay, sequencer_id in (
+        data[["assay", "sequencer_id"]]
+        .drop_duplicates()
+        .sort_values(["assay", "sequencer_id"])
+        .itertuples(index=False)
+    ):
+        legend_name = f"{assay} - {sequencer_id}"
+        color = colors_copy[assay].pop(0)
+
+        for i, (name, stats) in enumerate(stats_per_series.items()):
+            stats = stats.loc[(assay, sequencer_id)]
+            stats = stats[stats["count"] > 0]
+
+            if stats.empty:
+                continue
+
+            runs = nb_runs.loc[(assay, sequencer_id)].loc[stats.index]
+
+            if name == "Combined":
+                trace_name = legend_name
+                box_color, line_color = color, color
+                visible = True
+                shown_legend = True
+            else:
+                trace_name = name
+                box_color = LANE_COLORS[(i - 1) % len(LANE_COLORS)]
+                line_color = "000000"
+                visible = "legendonly"
+                shown_legend = name not in seen_lanes
+                seen_lanes.add(name)
+
+            traces.append(
+                {
+                    "x": list(stats.index),
+                    "q1": list(stats["25%"]),
+                    "median": list(stats["50%"]),
+                    "q3": list(stats["75%"]),
+                    "lowerfence": list(stats["min"]),
+                    "upperfence": list(stats["max"]),
+                    "mean": list(stats["mean"]),
+                    "sd": list(stats["std"].fillna(0)),
+                    "name": trace_name,
+                    "type": "box",
+                    "text": [
+                        f"{int(n)} samples - {nb} runs"
+                        for n, nb in zip(stats["count"], runs)
+                    ],
+                    "marker": {"color": box_color},
+                    "line": {"color": line_color},
+                    "fillcolor": box_color + "80",
+                    # groups share the same buckets so their boxes need to be
+                    # displayed side by side
+                    "offsetgroup": f"{legend_name} - {trace_name}",
+                    "legendgroup": trace_name,
+                    "legend": trace_name,
+                    "visible": visible,
+                    "showlegend": shown_legend,
+                }
+            )
+
+    return json.dumps(traces), json.dumps(True)
+
+
+def get_sample_values_queryset(
+    report_sample_queryset: QuerySet, metrics: list
+) -> QuerySet:
+    """Get the values queryset of the metrics for every sample of the
+    queryset, joining the tables of the metrics in one query. The values of
+    the metrics stored per lane and read are averaged for every sample.
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metrics (list): Metrics in the model|field format, without duplicates
+
+    Returns:
+        QuerySet: Values queryset with the "id" and REPORT_SAMPLE_METADATA
+        keys and one "value_{i}" key for the metric i of the metrics
+    """
+
+    queryset = report_sample_queryset
+    values = {}
+    joined_models = set()
+
+    for i, metric in enumerate(metrics):
+        model, form_metric = metric.split("|")
+        metric_filter = get_metric_filter(model, form_metric)
+
+        # the hap.py relation of a model can only be added once
+        if model not in joined_models:
+            queryset = get_metric_queryset(queryset, model)
+            joined_models.add(model)
+
+        # the last lookup of the filter is the value for the lane metrics
+        values[f"value_{i}"] = Avg(metric_filter[-1])
+
+    return queryset.values("id", *REPORT_SAMPLE_METADATA).annotate(**values)
+
+
+def get_sample_values(
+    report_sample_queryset: QuerySet, metrics: list
+) -> pd.DataFrame:
+    """Get the values of the metrics for every sample of the queryset, see
+    get_sample_values_queryset
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metrics (list): Metrics in the model|field format
+
+    Returns:
+        pd.DataFrame: Dataframe with the metadata columns and one column per
+        metric named after the metric, empty values for missing metrics
+    """
+
+    metrics = list(dict.fromkeys(metrics))
+    data = pd.DataFrame(
+        get_sample_values_queryset(report_sample_queryset, metrics),
+        columns=[
+            "id",
+            *REPORT_SAMPLE_METADATA,
+            *[f"value_{i}" for i in range(len(metrics))],
+        ],
+    )
+    data.columns = ["id", *METADATA_COLUMNS, *metrics]
+    data[metrics] = data[metrics].astype(float)
+
+    return data
+
+
+def get_scatter_data(
+    report_sample_queryset: QuerySet, metric_x: str, metric_y: str
+) -> tuple:
+    """Get the values of 2 metrics for every sample of the queryset, see
+    get_sample_values
+
+    Args:
+        report_sample_queryset (QuerySet): Report sample queryset
+        metric_x (str): Metric of the X-axis in the model|field format
+        metric_y (str): Metric of the Y-axis in the model|field format
+
+    Returns:
+        pd.DataFrame: Dataframe with the metadata columns and the "x" and "y"
+        columns, samples without a value for one of the metrics are removed
+        dict: Dict containing the projects for which no metric values were
+        found, see get_data_for_plotting
+        dict: Dict containing the samples for which no metric values were
+        found, see get_data_for_plotting
+    """
+
+    data = get_sample_values(report_sample_queryset, [metric_x, metric_y])
+    data = data[["id", *METADATA_COLUMNS]].assign(
+        x=data[metric_x], y=data[metric_y]
+    )
+
+    projects_no_metric = {}
+    samples_no_metric = {}
+
+    for axis, metric in [("x", metric_x), ("y", metric_y)]:
+        missing_values = data[data[axis].isna()]
+
+        for project_name, samples in missing_values.groupby("project_name"):
+            if len(samples) == (data["project_name"] == project_name).sum():
+                projects_no_metric.setdefault(metric, set()).add(project_name)
+            else:
+                samples_no_metric.setdefault(metric, {}).setdefault(
+                    project_name, set()
+                ).update(samples["sample_id"])
+
+    data = data.dropna(subset=["x", "y"]).drop(columns="id")
+
+    return (
+        data.reset_index(drop=True),
+        projects_no_metric,
+        samples_no_metric,
+    )
+
+
+def downsample_scatter(
+    plot_data: pd.DataFrame,
+    max_points: int,
+    grid_size: int = SCATTER_GRID_SIZE,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Downsample the points of a scatter plot while preserving its density.
+    The plot is divided in a grid, every occupied cell keeps at least one
+    point so that the outliers stay visible and the other points are sampled
+    at the same rate in every cell.
+
+    Args:
+        plot_data (pd.DataFrame): Dataframe returned by get_scatter_data
+        max_points (int): Maximum number of points kept, can be exceeded if
+        there are more occupied cells than points allowed
+        grid_size (int, optional): Number of cells per axis. Defaults to
+        SCATTER_GRID_SIZE.
+        seed (int, optional): Seed of the sampling, fixed for the same data
+        to give the same plot. Defaults to 0.
+
+    Returns:
+        pd.DataFrame: Dataframe with the points kept in their original order
+    """
+
+    if len(plot_data) <= max_points:
+        return plot_data
+
+    cells = np.zeros(len(plot_data), dtype=np.int64)
+
+    for axis in ["x", "y"]:
+        values = plot_data[axis].to_numpy(dtype=float)
+        span = values.max() - values.min()
+        bins = (
+            np.floor((values - values.min()) / span * grid_size)
+            if span
+            else np.zeros(len(values))
+        )
+        cells = cells * grid_size + np.clip(bins, 0, grid_size - 1).astype(
+            np.int64
+        )
+
+    counts = pd.Series(cells).value_counts()
+    rate = max(max_points - len(counts), 0) / len(plot_data)
+    points_per_cell = np.maximum(1, np.floor(counts * rate)).astype(int)
+
+    # rank the points of every cell in a random order and keep the first ones
+    order = np.random.default_rng(seed).permutation(len(plot_data))
+    shuffled_cells = pd.Series(cells[order])
+    ranks = shuffled_cells.groupby(shuffled_cells).cumcount().to_numpy()
+    kept = order[ranks < points_per_cell.loc[cells[order]].to_numpy()]
+
+    return plot_data.iloc[np.sort(kept)]
+
+
+def format_scatter_for_plotly_js(plot_data: pd.DataFrame) -> tuple:
+    """Format the scatter data for Plotly JS. One WebGL scatter trace is
+    created per assay and sequencer group.
+
+    Args:
+        plot_data (pd.DataFrame): Dataframe returned by get_scatter_data
+
+    Returns:
+        tuple: JSON of the traces and JSON of the boolean indicating whether
+        the boxes are grouped i.e. always false
+    """
+
+    colors = get_plotting_colors()
+    colors_copy = deepcopy(colors)
+
+    groups = build_groups(plot_data)
+
+    if sum([len(v) for v in colors.values()]) < len(groups):
+        return f"Not enough colors are possible for the groups: {groups}"
+
+    traces = []
+
+    for (assay_name, sequencer_id), data_group in plot_data.groupby(
+        ["assay", "sequencer_id"]
+    ):
+        traces.append(
+            {
+                "x": [float(value) for value in data_group["x"].values],
+                "y": [float(value) for value in data_group["y"].values],
+                "name": f"{assay_name} - {sequencer_id}",
+                "type": "scattergl",
+                "mode": "markers",
+                # text displayed when hovering a point
+                "text": list(
+                    data_group["sample_id"]
+                    + " - "
+                    + data_group["project_name"]
+                ),
+                "marker": {
+                    "color": colors_copy[assay_name].pop(0),
+                    "size": 5,
+                    "opacity": 0.7,
+                },
+            }
+        )
+
+    return json.dumps(traces), json.dumps(False)
+
+
+def get_plotting_colors() -> dict:
+    """Get the colors to use for the assays from the settings
+
+    Raises:
+        ImproperlyConfigured: PLOTTING_COLORS is missing or is not a dict
+
+    Returns:
+        dict: Dict of assay names to list of colors
+    """
+
+    try:
+        colors = settings.PLOTTING_COLORS
+    except AttributeError:
+        raise ImproperlyConfigured(
+            "PLOTTING_COLORS setting is missing. Please define it in your settings file."
+        )
+
+    if not isinstance(colors, dict):
+        raise ImproperlyConfigured(
+            "PLOTTING_COLORS must be a dictionary mapping assay names to colour lists."
+        )
+
+    return colors
+
+
+def get_lane_trace_name(lane_index: int) -> str:
+    """Get the name of the trace of a lane
+
+    Args:
+        lane_index (int): Index of the lane in the lanes of the sample
+
+    Returns:
+        str: Name of the trace, also used as legend group
+    """
+
+    if lane_index == 0:
+        return "First lane"
+
+    if lane_index == 1:
+        return "Second lane"
+
+    return f"Lane {lane_index + 1}"
+
+
 def create_trace(**kwargs):
     """Setup the trace according to given data
 
     Args:
         data (pd.DataFrame): Dataframe containing the data for that boxplot
         data_column (str): Column name in which values are stored
+        display_month (str, optional): Month label stored for the report,
+        parsed from the project name if not given
+        encoding (str, optional): "compact" to send the run once and the
+        values as a typed array. Defaults to "full".
 
     Returns:
         dict: Dict containing the data needed for Plotly
@@ -491,24 +1358,37 @@ def create_trace(**kwargs):
         float(value) for value in sub_df[kwargs["data_column"]].values
     ]
 
-    date = get_date_from_project_name(kwargs["project_name"])
-
-    text_data = []
+    date = kwargs.get("display_month") or get_date_from_project_name(
+        kwargs["project_name"]
+    )
+    sample_ids = list(sub_df["sample_id"].values)
+
+    if kwargs.get("encoding", "full") == "compact":
+        # every value of the box shares the same run so the x values are only
+        # sent once and the values are sent as a typed array. The sample ids
+        # are fetched by the frontend when a point is clicked
+        x_data = [date, kwargs["project_name"]]
+        y_data = encode_typed_array(data_values)
+        text_data = []
+    else:
+        x_data = [
+            [date] * len(data_values),
+            [kwargs["project_name"]] * len(data_values),
+        ]
+        y_data = data_values
+        text_data = []
 
-    # set text displayed when hovering outliers
-    for ele in list(sub_df["sample_id"].values):
-        if kwargs["lane"]:
-            text_data.append(f"{ele} - {kwargs['lane']}")
-        else:
-            text_data.append(ele)
+        # set text displayed when hovering outliers
+        for ele in sample_ids:
+            if kwargs["lane"]:
+                text_data.append(f"{ele} - {kwargs['lane']}")
+            else:
+                text_data.append(ele)
 
     # setup each boxplot with the appropriate annotation and data points
     trace = {
-        "x": [
-            [date] * len(data_values),
-            [kwargs["project_name"]] * len(data_values),
-        ],
-        "y": data_values,
+        "x": x_data,
+        "y": y_data,
         "name": kwargs["name"],
         "type": "box",
         # text associated with every sample value
@@ -532,9 +1412,45 @@ def create_trace(**kwargs):
         "showlegend": kwargs["showlegend"],
     }
 
+    if kwargs.get("encoding", "full") == "compact":
+        trace["compact"] = True
+        # no text entry per sample
+        del trace["text"]
+
+        if kwargs["lane"]:
+            trace["lane"] = kwargs["lane"]
+
     return trace
 
 
+def encode_typed_array(values: list) -> dict:
+    """Encode the values as a base64 typed array in the same format as the
+    Plotly typed array specification. Float32 is used unless the values are
+    too big to be stored without losing integer precision.
+
+    Args:
+        values (list): List of numerical values
+
+    Returns:
+        dict: Dict with the dtype ("f4" or "f8") and the base64 encoded
+        little endian data
+    """
+
+    array = np.asarray(values, dtype="<f8")
+    finite_values = np.abs(array[np.isfinite(array)])
+
+    if finite_values.size == 0 or finite_values.max() < 2**24:
+        array = array.astype("<f4")
+        dtype = "f4"
+    else:
+        dtype = "f8"
+
+    return {
+        "dtype": dtype,
+        "bdata": base64.b64encode(array.tobytes()).decode("ascii"),
+    }
+
+
 def get_date_from_project_name(project_name):
     """Get a date formatted for reading i.e. 2405 -> May 2024
 
@@ -546,7 +1462,7 @@ def get_date_from_project_name(project_name):
     """
 
     # regex to match most dates in the following format YYMMDD
-    matches = re.findall(r"[0-9]{2}[0-1][0-9][0-3][0-9]", project_name)
+    matches = re.findall(PROJECT_DATE_REGEX, project_name)
 
     assert matches, f"Couldn't find a date in {project_name}"
 
@@ -573,6 +1489,30 @@ def get_date_from_project_name(project_name):
     return f"{month_abbr}. 20{matches[0][0:2]}"
 
 
+def get_display_month(project_name: str, date: datetime.date) -> str:
+    """Get the month label stored for a report at import time. The label is
+    parsed from the project name like the plots always did and falls back on
+    the date of the run if the project name doesn't contain a usable date.
+
+    Args:
+        project_name (str): Project name
+        date (datetime.date): Date of the run
+
+    Returns:
+        str: String containing the abbreviated name of the month and the year
+    """
+
+    matches = re.findall(PROJECT_DATE_REGEX, project_name)
+
+    try:
+        # the date of the label needs to exist, the regex of the project
+        # dates also matches months 00 and 13 to 19
+        datetime.datetime.strptime(matches[0], "%y%m%d")
+        return get_date_from_project_name(project_name)
+    except (AssertionError, IndexError, ValueError):
+        return f"{calendar.month_abbr[date.month]}. {date.year}"
+
+
 def build_groups(df):
     """Get the groups of assay and sequencer id combinaisons for the grouping
     of traces
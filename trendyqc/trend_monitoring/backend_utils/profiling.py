@@ -0,0 +1,108 @@
+from contextlib import ExitStack
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from trend_monitoring.models.profiling import Request_profile
+
+# views which can be profiled and ways of requesting a profile
+PROFILED_VIEWS = ["Dashboard", "Plot"]
+PROFILE_PARAMETER = "profile"
+PROFILE_HEADER = "X-Profile"
+# header of the response containing the id of the stored profile
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def is_profile_requested(request) -> bool:
+    """Check if the request asks to be profiled i.e. has the ?profile=1
+    query parameter or the X-Profile: 1 header. Only staff users can profile
+    requests.
+
+    Args:
+        request (HttpRequest): Request handled
+
+    Returns:
+        bool: True if the request should be profiled
+    """
+
+    requested = "1" in [
+        request.GET.get(PROFILE_PARAMETER),
+        request.headers.get(PROFILE_HEADER),
+    ]
+    return requested and request.user.is_staff
+
+
+def profile_view(request, view_func, view_args, view_kwargs, label: str):
+    """Run the view under cProfile, recording every SQL query, and store the
+    profile in the database
+
+    Args:
+        request (HttpRequest): Request handled
+        view_func (callable): View of the request
+        view_args (list): Positional arguments of the view
+        view_kwargs (dict): Keyword arguments of the view
+        label (str): View name and action of the request
+
+    Returns:
+        HttpResponse: Response of the view
+        Request_profile: Profile stored
+    """
+
+    queries = []
+
+    def record_query(execute, sql, params, many, context):
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            queries.append(
+                {
+                    "sql": sql,
+                    "params": repr(params),
+                    "time": time.perf_counter() - start,
+                }
+            )
+
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(record_query))
+
+        response = profiler.runcall(
+            view_func, request, *view_args, **view_kwargs
+        )
+
+    wall_time = time.perf_counter() - start
+
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats("cumulative").print_stats(settings.PROFILE_STATS_LINES)
+
+    request_profile = Request_profile.objects.create(
+        user=request.user.username,
+        view=label,
+        method=request.method,
+        path=request.get_full_path(),
+        wall_time=wall_time,
+        sql_queries=len(queries),
+        sql_time=sum(query["time"] for query in queries),
+        # same format as the files written by pstats.Stats.dump_stats
+        profile=marshal.dumps(stats.stats),
+        stats=stream.getvalue(),
+        queries=json.dumps(
+            sorted(queries, key=lambda query: query["time"], reverse=True)[
+                : settings.PROFILE_MAX_QUERIES
+            ]
+        ),
+    )
+
+    return response, request_profile
@@ -0,0 +1,168 @@
+from typing import Dict
+
+import pandas as pd
+
+from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.metric_store import Metric_value
+from .metric_store import get_report_metric_values
+from .plot import METADATA_COLUMNS, get_data_for_plotting
+from .summary import get_summary_metrics
+
+
+def is_valid_metric(metric: str) -> bool:
+    """Check if the metric is a plotable metric in the format of the metrics
+    of the plotting form i.e. "model|field" in lowercase
+
+    Args:
+        metric (str): Metric to check
+
+    Returns:
+        bool: True if the metric can be plotted
+    """
+
+    model_name, _, field = metric.partition("|")
+    return field in get_summary_metrics().get(model_name, [])
+
+
+def get_sample_values(data: pd.DataFrame, lane: str = None) -> pd.Series:
+    """Get the value of every sample in the same way as the traces of
+    format_data_for_plotly_js i.e. the mean of the reads of the lane or of
+    every lane and read for the combined traces
+
+    Args:
+        data (pd.DataFrame): Dataframe returned by get_data_for_plotting
+        lane (str, optional): Name of the lane of the trace. Defaults to None.
+
+    Returns:
+        pd.Series: Value of every sample of the dataframe, empty if the lane
+        is not found
+    """
+
+    metrics = [
+        column for column in data.columns if column not in METADATA_COLUMNS
+    ]
+
+    if len(metrics) == 1:
+        return data[metrics[0]]
+
+    nb_lanes = len(metrics) // 3
+    lane_columns = metrics[:nb_lanes]
+    value_columns = metrics[nb_lanes:]
+
+    if lane is None:
+        return data[value_columns].mean(axis=1)
+
+    # the lane trace uses the column of the lane for every sample of the run
+    for i, lane_column in enumerate(lane_columns):
+        if (data[lane_column] == lane).any():
+            return data[value_columns[i * 2 : i * 2 + 2]].mean(axis=1)
+
+    return pd.Series(dtype=float)
+
+
+def get_other_metrics(project_name: str) -> Dict:
+    """Get the values of every metric of the samples of the run from the
+    metric value table. The metric value table is only filled for the reports
+    imported since it was added or backfilled with the build_metric_values
+    command, so the metrics of the other reports are read from the tables of
+    the tools.
+
+    Args:
+        project_name (str): Project name of the run
+
+    Returns:
+        dict: Dict with the sample id as key and a dict of metric name to
+        value as value. The lane and read are appended to the name of the
+        metrics stored per lane.
+    """
+
+    other_metrics = {}
+    metric_values = []
+
+    for report in Report.objects.filter(project_name=project_name):
+        report_metric_values = list(
+            Metric_value.objects.filter(
+                report_sample__report=report
+            ).values_list(
+                "report_sample__sample__sample_id",
+                "metric__model",
+                "metric__field",
+                "lane",
+                "sample_read",
+                "value",
+            )
+        )
+
+        if not report_metric_values:
+            sample_ids = dict(
+                Report_Sample.objects.filter(report=report).values_list(
+                    "id", "sample__sample_id"
+                )
+            )
+            report_metric_values = [
+                (sample_ids[report_sample_id], *metric_value)
+                for report_sample_id, *metric_value in (
+                    get_report_metric_values(report)
+                )
+            ]
+
+        metric_values.extend(report_metric_values)
+
+    # sorted by model, field, lane and read
+    for sample_id, model, field, lane, read, value in sorted(
+        metric_values, key=lambda metric_value: metric_value[1:5]
+    ):
+        name = " ".join(filter(None, [f"{model}|{field}", lane, read]))
+        other_metrics.setdefault(sample_id, {})[name] = value
+
+    return other_metrics
+
+
+def get_run_sample_data(
+    project_name: str, metric: str, lane: str = None
+) -> Dict:
+    """Get the records of the samples of one box of the plot
+
+    Args:
+        project_name (str): Project name of the run
+        metric (str): Metric of the plot, see is_valid_metric
+        lane (str, optional): Name of the lane of the trace, None for the
+        combined traces. Defaults to None.
+
+    Returns:
+        dict: Dict with the run, metric and lane and the list of samples
+        sorted by value. Every sample has its id, assay, value and the values
+        of the other metrics.
+    """
+
+    queryset = Report_Sample.objects.filter(
+        report__project_name=project_name
+    )
+    samples = []
+
+    # the dataframe of an empty queryset has no columns
+    if queryset.exists():
+        data = get_data_for_plotting(queryset, [metric])[0][0]
+        data = data.assign(value=get_sample_values(data, lane)).dropna(
+            subset=["value"]
+        )
+        other_metrics = get_other_metrics(project_name)
+
+        for row in data.sort_values(["value", "sample_id"]).itertuples(
+            index=False
+        ):
+            samples.append(
+                {
+                    "sample_id": row.sample_id,
+                    "assay": row.assay,
+                    "value": float(row.value),
+                    "metrics": other_metrics.get(row.sample_id, {}),
+                }
+            )
+
+    return {
+        "project_name": project_name,
+        "metric": metric,
+        "lane": lane,
+        "samples": samples,
+    }
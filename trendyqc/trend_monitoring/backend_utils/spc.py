@@ -0,0 +1,659 @@
+import math
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.summary import Metric_baseline, Run_metric_summary
+from .plot import get_sample_values
+
+# columns identifying the series of runs of a control chart
+SERIES_COLUMNS = ["assay", "sequencer_id"]
+
+# column of the run summaries used as run value by the baseline methods
+BASELINE_METHODS = {"mean_sd": "mean", "median_mad": "median"}
+
+# scale of the median absolute deviation to estimate the standard deviation
+# of normally distributed values
+MAD_SCALE = 1.4826
+
+# maximum number of values of the windows stacked at once by get_rolling_mad,
+# the windows of every previous run are as wide as the longest series
+MAD_MAX_WINDOW_VALUES = 1_000_000
+
+# Westgard rules evaluated on the run values, see compute_control_chart
+WESTGARD_RULES = {
+    "1_3s": "1-3s: run more than 3 SD away from the baseline",
+    "2_2s": (
+        "2-2s: 2 consecutive runs more than 2 SD away from the baseline on "
+        "the same side"
+    ),
+    "R_4s": (
+        "R-4s: 2 consecutive runs more than 2 SD away from the baseline on "
+        "opposite sides"
+    ),
+    "10_x": "10-x: 10 consecutive runs on the same side of the baseline",
+}
+
+# fields of the baselines storing the moments of the run and sample values
+BASELINE_FIELDS = [
+    "nb_runs",
+    "run_mean",
+    "run_m2",
+    "nb_samples",
+    "sample_mean",
+    "sample_m2",
+]
+
+
+def combine_moments(
+    n_a: int, mean_a: float, m2_a: float, n_b: int, mean_b: float, m2_b: float
+) -> tuple:
+    """Combine the number of values, mean and sum of squared differences to
+    the mean of 2 sets of values (Chan et al.), i.e. a Welford update when the
+    second set is a single value
+
+    Args:
+        n_a (int): Number of values of the first set
+        mean_a (float): Mean of the first set
+        m2_a (float): Sum of squared differences of the first set
+        n_b (int): Number of values of the second set
+        mean_b (float): Mean of the second set
+        m2_b (float): Sum of squared differences of the second set
+
+    Returns:
+        tuple: Number of values, mean and sum of squared differences of the
+        union of the sets
+    """
+
+    n = n_a + n_b
+
+    if n == 0:
+        return 0, 0.0, 0.0
+
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / n
+    m2 = m2_a + m2_b + delta**2 * n_a * n_b / n
+    return n, mean, m2
+
+
+def remove_moments(
+    n: int, mean: float, m2: float, n_b: int, mean_b: float, m2_b: float
+) -> tuple:
+    """Remove a set of values from the moments returned by combine_moments
+
+    Args:
+        n (int): Number of values of the union
+        mean (float): Mean of the union
+        m2 (float): Sum of squared differences of the union
+        n_b (int): Number of values of the set removed
+        mean_b (float): Mean of the set removed
+        m2_b (float): Sum of squared differences of the set removed
+
+    Returns:
+        tuple: Number of values, mean and sum of squared differences of the
+        remaining values
+    """
+
+    n_a = n - n_b
+
+    if n_a <= 0:
+        return 0, 0.0, 0.0
+
+    mean_a = (n * mean - n_b * mean_b) / n_a
+    delta = mean_b - mean_a
+    m2_a = m2 - m2_b - delta**2 * n_a * n_b / n
+    # rounding errors can give a slightly negative sum
+    return n_a, mean_a, max(m2_a, 0.0)
+
+
+def get_stdev(n: int, m2: float) -> float:
+    """Get the sample standard deviation from the moments
+
+    Args:
+        n (int): Number of values
+        m2 (float): Sum of squared differences to the mean
+
+    Returns:
+        float: Standard deviation, None for less than 2 values
+    """
+
+    if n < 2:
+        return None
+
+    return math.sqrt(m2 / (n - 1))
+
+
+def get_summary_moments(summary: Run_metric_summary) -> tuple:
+    """Get the moments of the run value and of the sample values of a run
+    summary
+
+    Args:
+        summary (Run_metric_summary): Run summary
+
+    Returns:
+        tuple: Moments of the run mean and moments of the sample values
+    """
+
+    sample_m2 = (summary.stdev or 0.0) ** 2 * (summary.n - 1)
+    return (1, summary.mean, 0.0), (summary.n, summary.mean, sample_m2)
+
+
+def update_metric_baselines(
+    old_summaries: Iterable[Run_metric_summary],
+    new_summaries: Iterable[Run_metric_summary],
+) -> int:
+    """Replace the contribution of the old summaries of a run to the
+    baselines by the one of its new summaries. Only the baselines of the
+    summaries are updated i.e. the cost doesn't depend on the history. The
+    baselines cover every run of their series, the rolling baselines of the
+    control charts are computed by compute_control_chart.
+
+    Args:
+        old_summaries (Iterable): Summaries replaced, already included in the
+        baselines
+        new_summaries (Iterable): Summaries added to the baselines
+
+    Returns:
+        int: Number of baselines updated or created
+    """
+
+    old_summaries = [s for s in old_summaries if s.mean is not None]
+    new_summaries = [s for s in new_summaries if s.mean is not None]
+    summaries = [*old_summaries, *new_summaries]
+
+    if not summaries:
+        return 0
+
+    # the missing baselines are created empty before locking the baselines,
+    # the insert of a baseline created by a concurrent import waits for its
+    # transaction instead of violating the unique constraint
+    Metric_baseline.objects.bulk_create(
+        [
+            Metric_baseline(
+                metric=metric,
+                assay=assay,
+                sequencer_id=sequencer_id,
+                lane=lane,
+            )
+            for metric, assay, sequencer_id, lane in {
+                (s.metric, s.assay, s.sequencer_id, s.lane) for s in summaries
+            }
+        ],
+        ignore_conflicts=True,
+    )
+
+    # the baselines of the assay, sequencer and metrics are locked to not
+    # lose the updates of concurrent imports
+    baselines = {
+        (b.metric, b.assay, b.sequencer_id, b.lane): b
+        for b in Metric_baseline.objects.select_for_update().filter(
+            metric__in={s.metric for s in summaries},
+            assay__in={s.assay for s in summaries},
+            sequencer_id__in={s.sequencer_id for s in summaries},
+        )
+    }
+    updated_baselines = {}
+
+    for update, run_summaries in [
+        (remove_moments, old_summaries),
+        (combine_moments, new_summaries),
+    ]:
+        for summary in run_summaries:
+            key = (
+                summary.metric,
+                summary.assay,
+                summary.sequencer_id,
+                summary.lane,
+            )
+            baseline = baselines[key]
+            run_moments, sample_moments = get_summary_moments(summary)
+            baseline.nb_runs, baseline.run_mean, baseline.run_m2 = update(
+                baseline.nb_runs,
+                baseline.run_mean,
+                baseline.run_m2,
+                *run_moments,
+            )
+            (
+                baseline.nb_samples,
+                baseline.sample_mean,
+                baseline.sample_m2,
+            ) = update(
+                baseline.nb_samples,
+                baseline.sample_mean,
+                baseline.sample_m2,
+                *sample_moments,
+            )
+            baseline.updated = timezone.now()
+            updated_baselines[key] = baseline
+
+    Metric_baseline.objects.bulk_update(
+        updated_baselines.values(), [*BASELINE_FIELDS, "updated"]
+    )
+
+    return len(updated_baselines)
+
+
+@transaction.atomic
+def rebuild_metric_baselines() -> int:
+    """Rebuild every baseline from the run summaries
+
+    Returns:
+        int: Number of baselines created
+    """
+
+    columns = ["metric", "assay", "sequencer_id", "lane", "n", "mean", "stdev"]
+    keys = ["metric", "assay", "sequencer_id", "lane"]
+    data = pd.DataFrame(
+        Run_metric_summary.objects.exclude(mean=None).values(*columns),
+        columns=columns,
+    )
+    data["stdev"] = data["stdev"].fillna(0.0)
+    data["weighted_mean"] = data["n"] * data["mean"]
+    data["m2"] = (data["n"] - 1) * data["stdev"] ** 2
+
+    grouped = data.groupby(keys)
+    baselines = grouped.agg(
+        nb_runs=("mean", "count"),
+        run_mean=("mean", "mean"),
+        nb_samples=("n", "sum"),
+        weighted_mean=("weighted_mean", "sum"),
+        m2=("m2", "sum"),
+    )
+    baselines["run_m2"] = grouped["mean"].var(ddof=0) * baselines["nb_runs"]
+    baselines["sample_mean"] = (
+        baselines["weighted_mean"] / baselines["nb_samples"]
+    )
+
+    # squared differences of the run means to the mean of every sample
+    data = data.join(baselines["sample_mean"], on=keys)
+    data["between_m2"] = data["n"] * (data["mean"] - data["sample_mean"]) ** 2
+    baselines["sample_m2"] = (
+        baselines["m2"] + data.groupby(keys)["between_m2"].sum()
+    )
+
+    Metric_baseline.objects.all().delete()
+    Metric_baseline.objects.bulk_create(
+        [
+            Metric_baseline(
+                metric=metric,
+                assay=assay,
+                sequencer_id=sequencer_id,
+                lane=lane,
+                **{field: row[field] for field in BASELINE_FIELDS},
+            )
+            for (metric, assay, sequencer_id, lane), row in (
+                baselines.iterrows()
+            )
+        ]
+    )
+
+    return len(baselines)
+
+
+def get_rolling_mad(
+    values: pd.Series, groups: List, window: int, min_periods: int
+) -> pd.Series:
+    """Get the median absolute deviation of the rolling windows of the values
+    of every group. The windows of the runs are stacked in arrays with a row
+    per run, of at most MAD_MAX_WINDOW_VALUES values, so that the medians are
+    computed in a few passes instead of a Python call per window.
+
+    Args:
+        values (pd.Series): Values ordered by date
+        groups (list): Series of the groups of the values
+        window (int): Number of values of the windows, 0 for every previous
+        value of the group
+        min_periods (int): Minimum number of values to compute the median
+        absolute deviation
+
+    Returns:
+        pd.Series: Median absolute deviation of the window ending at every
+        value, NaN if the window has less than min_periods values
+    """
+
+    mad = np.full(len(values), np.nan)
+
+    if values.empty:
+        return pd.Series(mad, index=values.index)
+
+    # the values of every group are made contiguous, keeping the dates order
+    grouped = values.groupby(groups)
+    order = np.argsort(grouped.ngroup().to_numpy(), kind="stable")
+    positions = grouped.cumcount().to_numpy()[order]
+    width = window or int(positions.max()) + 1
+    padded = np.concatenate(
+        [np.full(width - 1, np.nan), values.to_numpy(dtype=float)[order]]
+    )
+    windows = np.lib.stride_tricks.sliding_window_view(padded, width)
+    chunk_size = max(MAD_MAX_WINDOW_VALUES // width, 1)
+
+    # the rows are processed by chunks to bound the size of the copies, the
+    # expanding windows only keep the columns reached by their longest row
+    for start in range(0, len(order), chunk_size):
+        chunk_positions = positions[start:start + chunk_size]
+        chunk_width = window or int(chunk_positions.max()) + 1
+        # row i holds the values i - width + 1 to i, the values of the other
+        # groups are masked using the position of the value in its group
+        chunk = np.where(
+            chunk_positions[:, None] + np.arange(1 - chunk_width, 1) < 0,
+            np.nan,
+            windows[start:start + chunk_size, width - chunk_width:],
+        )
+
+        valid = (~np.isnan(chunk)).sum(axis=1) >= max(min_periods, 1)
+        chunk = chunk[valid]
+
+        if not len(chunk):
+            continue
+
+        medians = np.nanmedian(chunk, axis=1, keepdims=True)
+        mad[order[start:start + chunk_size][valid]] = np.nanmedian(
+            np.abs(chunk - medians), axis=1
+        )
+
+    return pd.Series(mad, index=values.index)
+
+
+def compute_control_chart(
+    data: pd.DataFrame,
+    method: str = "mean_sd",
+    window: int = 20,
+    min_runs: int = 5,
+) -> pd.DataFrame:
+    """Compute the baseline of every run from the previous runs of its assay
+    and sequencer and evaluate the Westgard rules. Every series of runs is
+    processed at once using grouped operations.
+
+    Args:
+        data (pd.DataFrame): Run summaries with the date, assay, sequencer_id
+        and the value column of the method
+        method (str, optional): "mean_sd" or "median_mad". Defaults to
+        "mean_sd".
+        window (int, optional): Number of previous runs of the baseline, 0
+        for every previous run. Defaults to 20.
+        min_runs (int, optional): Minimum number of previous runs to compute
+        a baseline. Defaults to 5.
+
+    Returns:
+        pd.DataFrame: Runs ordered by date with the value, center, spread and
+        z-score columns and a boolean column per Westgard rule
+    """
+
+    data = data.sort_values("date", kind="stable").reset_index(drop=True)
+    groups = [data[column] for column in SERIES_COLUMNS]
+    values = data[BASELINE_METHODS[method]].astype(float)
+
+    def ungroup(series):
+        # grouped rolling operations prepend the groups to the index
+        return series.droplevel(list(range(len(groups)))).sort_index()
+
+    # the baseline of a run only uses the previous runs
+    previous_values = values.groupby(groups).shift(1)
+    min_periods = min(min_runs, window) if window else min_runs
+
+    if window:
+        windows = previous_values.groupby(groups).rolling(
+            window, min_periods=min_periods
+        )
+    else:
+        windows = previous_values.groupby(groups).expanding(
+            min_periods=min_periods
+        )
+
+    if method == "median_mad":
+        center = ungroup(windows.median())
+        spread = MAD_SCALE * get_rolling_mad(
+            previous_values, groups, window, min_periods
+        )
+    else:
+        center = ungroup(windows.mean())
+        spread = ungroup(windows.std())
+
+    # constant baselines can't be used to compute z-scores
+    spread = spread.where(spread > 0)
+    z_scores = (values - center) / spread
+    previous_z_scores = z_scores.groupby(groups).shift(1)
+    sides = np.sign(values - center)
+
+    data["value"] = values
+    data["center"] = center
+    data["spread"] = spread
+    data["z_score"] = z_scores
+    data["1_3s"] = z_scores.abs() > 3
+    data["2_2s"] = ((z_scores > 2) & (previous_z_scores > 2)) | (
+        (z_scores < -2) & (previous_z_scores < -2)
+    )
+    data["R_4s"] = ((z_scores > 2) & (previous_z_scores < -2)) | (
+        (z_scores < -2) & (previous_z_scores > 2)
+    )
+    data["10_x"] = (
+        ungroup(sides.groupby(groups).rolling(10).sum()).abs() == 10
+    )
+
+    return data
+
+
+def get_control_chart_data(form: Dict, metric: str) -> pd.DataFrame:
+    """Get the control chart of the metric for the assays and sequencers of
+    the form. Every run of the series is used to compute the baselines, not
+    only the runs of the subset.
+
+    Args:
+        form (dict): Dict of the cleaned form data
+        metric (str): Metric in the form format i.e. model|field
+
+    Returns:
+        pd.DataFrame: Dataframe returned by compute_control_chart
+    """
+
+    columns = {
+        "report__date": "date",
+        "report__project_name": "project_name",
+        "assay": "assay",
+        "sequencer_id": "sequencer_id",
+        "mean": "mean",
+        "median": "median",
+    }
+    summaries = Run_metric_summary.objects.filter(metric=metric, lane="")
+
+    if form.get("assay_select"):
+        summaries = summaries.filter(assay__in=form["assay_select"])
+
+    if form.get("sequencer_select"):
+        summaries = summaries.filter(
+            sequencer_id__in=form["sequencer_select"]
+        )
+
+    data = pd.DataFrame(
+        summaries.values(*columns), columns=list(columns)
+    ).rename(columns=columns)
+
+    return compute_control_chart(
+        data,
+        settings.SPC_BASELINE_METHOD,
+        settings.SPC_BASELINE_RUNS,
+        settings.SPC_MIN_BASELINE_RUNS,
+    )
+
+
+def get_run_violations(
+    chart_data: pd.DataFrame, project_names: Iterable[str]
+) -> Dict:
+    """Get the runs of the given projects violating the Westgard rules
+
+    Args:
+        chart_data (pd.DataFrame): Dataframe returned by compute_control_chart
+        project_names (Iterable): Project names of the runs to check
+
+    Returns:
+        dict: Dict with the description of the rule as key and the list of
+        the runs violating it as value
+    """
+
+    chart_data = chart_data[chart_data["project_name"].isin(project_names)]
+    violations = {}
+
+    for rule, description in WESTGARD_RULES.items():
+        runs = chart_data[chart_data[rule]]
+
+        if not runs.empty:
+            violations[description] = [
+                f"{run.project_name} ({run.assay} - {run.sequencer_id})"
+                for run in runs.itertuples()
+            ]
+
+    return violations
+
+
+def get_control_limits(
+    chart_data: pd.DataFrame, project_names: Iterable[str]
+) -> List[Dict]:
+    """Get the baseline of the runs of the given projects per assay and
+    sequencer group, i.e. the same center and spread used to evaluate the
+    Westgard rules of the runs
+
+    Args:
+        chart_data (pd.DataFrame): Dataframe returned by compute_control_chart
+        project_names (Iterable): Project names of the runs to get
+
+    Returns:
+        list: List of dicts with the name of the assay and sequencer group,
+        as used in the legend of the plots, and the project names, centers
+        and spreads of its runs ordered by date. The spread is None for the
+        runs without a baseline spread
+    """
+
+    chart_data = chart_data[
+        chart_data["project_name"].isin(project_names)
+        & chart_data["center"].notna()
+    ]
+    limits = []
+
+    for (assay, sequencer_id), runs in chart_data.groupby(
+        SERIES_COLUMNS, sort=True
+    ):
+        limits.append(
+            {
+                "group": f"{assay} - {sequencer_id}",
+                "project_name": runs["project_name"].tolist(),
+                "center": runs["center"].tolist(),
+                # NaN can't be serialised in the JSON of the payload
+                "spread": [
+                    None if math.isnan(spread) else spread
+                    for spread in runs["spread"]
+                ],
+            }
+        )
+
+    return limits
+
+
+def get_run_outliers(
+    report: Report,
+    metrics: list = None,
+    nb_sd: float = None,
+    min_runs: int = None,
+) -> List[str]:
+    """Compare the run and its samples to the baselines of their assay and
+    sequencer, without the contribution of the run. Only the summaries, the
+    baselines and the samples of the run are queried i.e. the cost doesn't
+    depend on the history.
+
+    Args:
+        report (Report): Report of the run, with its summaries built
+        metrics (list, optional): Metrics checked in the model|field format.
+        Defaults to QC_CHECK_METRICS.
+        nb_sd (float, optional): Number of standard deviations from the
+        baseline mean above which a value is flagged. Defaults to
+        QC_CHECK_NB_SD.
+        min_runs (int, optional): Minimum number of previous runs of the
+        baseline. Defaults to SPC_MIN_BASELINE_RUNS.
+
+    Returns:
+        list: List of messages describing the run means and sample values
+        outside of the limits
+    """
+
+    metrics = metrics or settings.QC_CHECK_METRICS
+    nb_sd = nb_sd or settings.QC_CHECK_NB_SD
+
+    if min_runs is None:
+        min_runs = settings.SPC_MIN_BASELINE_RUNS
+
+    summaries = (
+        Run_metric_summary.objects.filter(
+            report=report, lane="", metric__in=metrics
+        )
+        .exclude(mean=None)
+        .order_by("assay", "metric")
+    )
+    baselines = {
+        (baseline.metric, baseline.assay): baseline
+        for baseline in Metric_baseline.objects.filter(
+            sequencer_id=report.sequencer_id, lane="", metric__in=metrics
+        )
+    }
+    sample_values = get_sample_values(
+        Report_Sample.objects.filter(report=report), metrics
+    )
+    messages = []
+
+    for summary in summaries:
+        baseline = baselines.get((summary.metric, summary.assay))
+
+        if baseline is None:
+            continue
+
+        # the baselines are updated with the summaries at import
+        run_moments, sample_moments = get_summary_moments(summary)
+        nb_runs, run_mean, run_m2 = remove_moments(
+            baseline.nb_runs, baseline.run_mean, baseline.run_m2, *run_moments
+        )
+
+        if nb_runs < min_runs:
+            continue
+
+        run_stdev = get_stdev(nb_runs, run_m2)
+
+        if run_stdev and abs(summary.mean - run_mean) > nb_sd * run_stdev:
+            messages.append(
+                f"{summary.assay} run mean of `{summary.metric}`: "
+                f"{summary.mean:.4g} outside of "
+                f"{run_mean - nb_sd * run_stdev:.4g} - "
+                f"{run_mean + nb_sd * run_stdev:.4g}"
+            )
+
+        nb_samples, sample_mean, sample_m2 = remove_moments(
+            baseline.nb_samples,
+            baseline.sample_mean,
+            baseline.sample_m2,
+            *sample_moments,
+        )
+        sample_stdev = get_stdev(nb_samples, sample_m2)
+
+        if not sample_stdev:
+            continue
+
+        values = sample_values.loc[
+            sample_values["assay"] == summary.assay,
+            ["sample_id", summary.metric],
+        ].dropna()
+        outliers = values[
+            (values[summary.metric] - sample_mean).abs()
+            > nb_sd * sample_stdev
+        ]
+
+        for sample_id, value in outliers.itertuples(index=False):
+            messages.append(
+                f"{sample_id} `{summary.metric}`: {value:.4g} outside of "
+                f"{sample_mean - nb_sd * sample_stdev:.4g} - "
+                f"{sample_mean + nb_sd * sample_stdev:.4g}"
+            )
+
+    return messages
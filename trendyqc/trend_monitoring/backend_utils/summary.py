@@ -0,0 +1,223 @@
+import math
+from typing import Dict, List
+
+import pandas as pd
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+
+from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.summary import Run_metric_summary
+from .plot import (
+    get_metric_filter,
+    get_metric_queryset,
+    get_subset_filter,
+    is_lane_metric,
+)
+from .spc import update_metric_baselines
+
+
+def get_summary_metrics() -> Dict:
+    """Get the metrics for which run summaries are computed i.e. the plotable
+    metrics of the models displayed in the dashboard
+
+    Returns:
+        dict: Dict with the lowercase model name as key and the list of its
+        numerical fields as value. Names are lowercased in the same way as the
+        metrics of the plotting form
+    """
+
+    summary_metrics = {}
+
+    for model in apps.get_models():
+        if model.__name__ not in settings.DISPLAY_DATA_JSON:
+            continue
+
+        fields = [
+            field.name.lower()
+            for field in model._meta.fields
+            if field.get_internal_type() in ["FloatField", "IntegerField"]
+        ]
+
+        if fields:
+            summary_metrics[model.__name__.lower()] = sorted(fields)
+
+    return summary_metrics
+
+
+def describe_values(values: pd.Series) -> Dict:
+    """Compute the distribution statistics stored in the run summary table
+
+    Args:
+        values (pd.Series): Values for the samples of one run
+
+    Returns:
+        dict: Dict of statistics, None if the series has no value
+    """
+
+    values = pd.to_numeric(values, errors="coerce")
+    n = int(values.count())
+
+    if n == 0:
+        return None
+
+    q1, median, q3 = values.quantile([0.25, 0.5, 0.75]).values
+
+    stats = {
+        "n": n,
+        "nb_null": int(len(values) - n),
+        "min": values.min(),
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "max": values.max(),
+        "mean": values.mean(),
+        "stdev": values.std(),
+    }
+
+    # NaN cannot be stored as is, i.e. standard deviation of one sample
+    return {
+        k: (None if isinstance(v, float) and math.isnan(v) else v)
+        for k, v in stats.items()
+    }
+
+
+def compute_run_metric_summaries(report: Report) -> List:
+    """Compute the summary of every metric for the given report
+
+    Args:
+        report (Report): Report object
+
+    Returns:
+        list: List of unsaved Run_metric_summary objects
+    """
+
+    summaries = []
+    report_samples = Report_Sample.objects.filter(report=report)
+
+    for model_name, fields in get_summary_metrics().items():
+        metric_filters = {
+            field: get_metric_filter(model_name, field) for field in fields
+        }
+        # lane metrics share the same lane columns so remove duplicates
+        columns = list(
+            dict.fromkeys(
+                column
+                for metric_filter in metric_filters.values()
+                for column in metric_filter
+            )
+        )
+
+        data = pd.DataFrame(
+            get_metric_queryset(report_samples, model_name).values(
+                "id", "assay", *columns
+            )
+        )
+
+        if data.empty:
+            continue
+
+        for assay, data_one_assay in data.groupby("assay"):
+            for field, metric_filter in metric_filters.items():
+                metric = f"{model_name}|{field}"
+                lane_values = {}
+
+                # lane metrics are returned as one row per sample, lane and
+                # read so the values are averaged per sample
+                if is_lane_metric(metric_filter):
+                    lane_column, _, value_column = metric_filter
+                    values = pd.to_numeric(
+                        data_one_assay[value_column], errors="coerce"
+                    )
+                    lane_values[""] = values.groupby(
+                        data_one_assay["id"]
+                    ).mean()
+
+                    for lane, values_one_lane in (
+                        values.groupby(
+                            [data_one_assay[lane_column], data_one_assay["id"]]
+                        )
+                        .mean()
+                        .groupby(level=0)
+                    ):
+                        lane_values[lane] = values_one_lane
+                else:
+                    lane_values[""] = data_one_assay[metric_filter[0]]
+
+                for lane, values in lane_values.items():
+                    stats = describe_values(values)
+
+                    if not stats:
+                        continue
+
+                    summaries.append(
+                        Run_metric_summary(
+                            report=report,
+                            assay=assay,
+                            sequencer_id=report.sequencer_id,
+                            metric=metric,
+                            lane=lane,
+                            **stats,
+                        )
+                    )
+
+    return summaries
+
+
+@transaction.atomic
+def update_run_metric_summaries(report: Report) -> int:
+    """Replace the summaries stored for the given report and update the
+    metric baselines with them
+
+    Args:
+        report (Report): Report object
+
+    Returns:
+        int: Number of summaries created
+    """
+
+    summaries = compute_run_metric_summaries(report)
+    old_summaries = list(Run_metric_summary.objects.filter(report=report))
+    Run_metric_summary.objects.filter(report=report).delete()
+    Run_metric_summary.objects.bulk_create(summaries)
+    update_metric_baselines(old_summaries, summaries)
+    return len(summaries)
+
+
+def get_run_summary_data(data: Dict, metric: str) -> pd.DataFrame:
+    """Get the summaries of the runs matching the subset inputted by the user
+
+    Args:
+        data (dict): Dict of data from the subset part of the form
+        metric (str): Metric in the form format i.e. model|field
+
+    Returns:
+        pd.DataFrame: Dataframe with one row per run, assay and lane, the
+        lane is empty for the combined lanes and the metrics without lanes
+    """
+
+    columns = {
+        "report__date": "date",
+        "report__project_name": "project_name",
+        "report__display_month": "display_month",
+        "assay": "assay",
+        "sequencer_id": "sequencer_id",
+        "lane": "lane",
+        "n": "n",
+        "min": "min",
+        "q1": "q1",
+        "median": "median",
+        "q3": "q3",
+        "max": "max",
+        "mean": "mean",
+        "stdev": "stdev",
+    }
+
+    summaries = Run_metric_summary.objects.filter(
+        metric=metric, **get_subset_filter(data)
+    ).values(*columns)
+
+    return pd.DataFrame(summaries, columns=list(columns)).rename(
+        columns=columns
+    )
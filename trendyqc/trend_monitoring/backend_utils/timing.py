@@ -0,0 +1,125 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+from typing import Dict
+
+# timings of the request being handled, set by the RequestTimingMiddleware.
+# None outside of requests i.e. in management commands
+REQUEST_TIMINGS = ContextVar("request_timings", default=None)
+
+# sections timed in the plotting pipeline
+TIMED_SECTIONS = ["pandas", "traces"]
+
+_aggregates = {}
+_aggregates_lock = threading.Lock()
+
+
+def new_request_timings() -> Dict:
+    """Get the initial timings of a request
+
+    Returns:
+        dict: Dict of the number of SQL queries and of the time in seconds
+        spent in SQL queries and in the timed sections
+    """
+
+    return {
+        "sql_queries": 0,
+        "sql_time": 0.0,
+        **{section: 0.0 for section in TIMED_SECTIONS},
+    }
+
+
+@contextmanager
+def timed(section: str):
+    """Add the time spent in the block to the given section of the timings
+    of the current request
+
+    Args:
+        section (str): Name of the section, see TIMED_SECTIONS
+    """
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        timings = REQUEST_TIMINGS.get()
+
+        if timings is not None:
+            timings[section] += time.perf_counter() - start
+
+
+def sql_timing_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries and the time spent in
+    them for the current request
+
+    Args:
+        execute (callable): Next execute function of the chain
+        sql (str): SQL query
+        params (list): Query parameters
+        many (bool): Whether executemany is used
+        context (dict): Connection and cursor of the query
+
+    Returns:
+        Result of the execute function
+    """
+
+    start = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings = REQUEST_TIMINGS.get()
+
+        if timings is not None:
+            timings["sql_queries"] += 1
+            timings["sql_time"] += time.perf_counter() - start
+
+
+def record_request_timings(label: str, wall_time: float, timings: Dict):
+    """Add the timings of a request to the aggregates of its view
+
+    Args:
+        label (str): View name and action of the request
+        wall_time (float): Time in seconds spent handling the request
+        timings (dict): Timings of the request, see new_request_timings
+    """
+
+    with _aggregates_lock:
+        aggregate = _aggregates.setdefault(
+            label,
+            {
+                "requests": 0,
+                "wall_time": 0.0,
+                "max_wall_time": 0.0,
+                **new_request_timings(),
+            },
+        )
+        aggregate["requests"] += 1
+        aggregate["wall_time"] += wall_time
+        aggregate["max_wall_time"] = max(aggregate["max_wall_time"], wall_time)
+
+        for key, value in timings.items():
+            aggregate[key] += value
+
+
+def get_request_aggregates() -> Dict:
+    """Get the aggregated timings of the requests handled by this process
+
+    Returns:
+        dict: Dict with the view label as key and the number of requests and
+        the total time in seconds and number of SQL queries as value
+    """
+
+    with _aggregates_lock:
+        return {
+            label: dict(aggregate) for label, aggregate in _aggregates.items()
+        }
+
+
+def reset_request_aggregates():
+    """Clear the aggregated timings"""
+
+    with _aggregates_lock:
+        _aggregates.clear()
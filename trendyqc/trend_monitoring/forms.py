@@ -7,6 +7,7 @@ from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
 
 from trendyqc.settings import DISPLAY_DATA_JSON
+from trend_monitoring.backend_utils.plot import BUCKET_FREQUENCIES
 
 username_validator = UnicodeUsernameValidator()
 
@@ -19,6 +20,7 @@ class FilterForm(forms.Form):
     date_start = forms.DateField(required=False)
     date_end = forms.DateField(required=False)
     days_back = forms.IntegerField(required=False)
+    bucket = forms.CharField(required=False)
     metrics_y = forms.CharField()
 
     @staticmethod
@@ -48,6 +50,8 @@ class FilterForm(forms.Form):
                 new_key = "Selected date end"
             elif key == "days_back":
                 new_key = "Last x days"
+            elif key == "bucket":
+                new_key = "Time bucket"
             elif key == "metrics_x":
                 new_key = "Metric for the X-axis"
             elif key == "metrics_y":
@@ -140,28 +144,69 @@ class FilterForm(forms.Form):
                 cleaned_data["date_start"] = [start_date.strftime("%Y-%m-%d")]
                 cleaned_data["date_end"] = [end_date.strftime("%Y-%m-%d")]
 
+        bucket = cleaned_data.get("bucket", None)
+
+        if bucket and bucket[0] not in ["auto", "run", *BUCKET_FREQUENCIES]:
+            self.add_error(
+                "bucket",
+                ValidationError(f"Unknown time bucket: {bucket[0]}"),
+            )
+
         if not cleaned_data.get("metrics_y", None):
             self.add_error(
                 "metrics_y", ValidationError("No Y-axis metric selected")
             )
         else:
-            metrics = []
-
-            # for each metric passed, replace the display name by the actual
-            # model name
-            for ele in cleaned_data["metrics_y"]:
-                metrics.extend(
-                    [
-                        f"{model_name}|{ele.split('|')[1]}".lower()
-                        for model_name, display_name in DISPLAY_DATA_JSON.items()
-                        if ele.split("|")[0] == display_name
-                    ]
-                )
+            cleaned_data["metrics_y"] = self.get_model_metrics(
+                cleaned_data["metrics_y"]
+            )
 
-            cleaned_data["metrics_y"] = metrics
+        # the X-axis metric is optional, the runs are displayed on the X-axis
+        # if no metric is selected
+        if cleaned_data.get("metrics_x", None):
+            cleaned_data["metrics_x"] = self.get_model_metrics(
+                cleaned_data["metrics_x"]
+            )
+
+            # the scatter plots display one metric against another
+            if len(cleaned_data.get("metrics_y", [])) > 1:
+                self.add_error(
+                    "metrics_y",
+                    ValidationError(
+                        "Only one Y-axis metric can be plotted against an "
+                        "X-axis metric"
+                    ),
+                )
 
         return cleaned_data
 
+    @staticmethod
+    def get_model_metrics(metrics: list) -> list:
+        """Replace the display name of the metrics of the metric selects by
+        the model name
+
+        Args:
+            metrics (list): List of metrics in the display_name|field format
+
+        Returns:
+            list: List of metrics in the model|field format
+        """
+
+        model_metrics = []
+
+        # for each metric passed, replace the display name by the actual
+        # model name
+        for ele in metrics:
+            model_metrics.extend(
+                [
+                    f"{model_name}|{ele.split('|')[1]}".lower()
+                    for model_name, display_name in DISPLAY_DATA_JSON.items()
+                    if ele.split("|")[0] == display_name
+                ]
+            )
+
+        return model_metrics
+
 
 class LoginForm(forms.Form):
     username = forms.CharField(
@@ -8,9 +8,14 @@ from django.core.management.base import BaseCommand
 
 import regex
 
+from trend_monitoring.backend_utils.cache import bump_generation
 from .utils._notifications import slack_notify, build_report_for_slack
 from .utils._dnanexus_utils import login_to_dnanexus, get_002_projects
-from .utils._report import setup_report_object, import_multiqc_report
+from .utils._report import (
+    check_multiqc_report,
+    import_multiqc_report,
+    setup_report_object,
+)
 
 logger = logging.getLogger("basic")
 storing_logger = logging.getLogger("storing")
@@ -116,6 +121,7 @@ class Command(BaseCommand):
                 raise AssertionError(msg)
 
             imported_reports = []
+            qc_outliers = {}
             project2reports = {}
             all_reports = []
 
@@ -131,6 +137,10 @@ class Command(BaseCommand):
 
                         if has_been_imported:
                             imported_reports.append(report.multiqc_json_id)
+                            outliers = check_multiqc_report(report)
+
+                            if outliers:
+                                qc_outliers[report.multiqc_json_id] = outliers
 
             header_msg += (
                 f"\n\nDetected {len(project_ids)} projects with "
@@ -158,10 +168,18 @@ class Command(BaseCommand):
             now = datetime.datetime.now().strftime("%y%m%d | %H:%M:%S")
 
             if imported_reports:
+                # the cached plots don't include the new reports
+                bump_generation()
                 final_msg = (
                     f"Finished update at {now}, {len(imported_reports)} new "
                     "reports have been imported\n"
                 )
+
+                if qc_outliers:
+                    final_msg += (
+                        f"{len(qc_outliers)} reports have QC metrics outside "
+                        "of the historical limits\n"
+                    )
             else:
                 final_msg = f"Finished update at {now}, no new projects added"
 
@@ -173,7 +191,7 @@ class Command(BaseCommand):
                 all_issues.setdefault(k, []).extend(v)
 
             summary_report = build_report_for_slack(
-                header_msg, final_msg, all_issues
+                header_msg, final_msg, all_issues, qc_outliers
             )
 
             if errors:
@@ -189,7 +207,7 @@ class Command(BaseCommand):
                         logger.warning(msg)
 
             if is_automated_update:
-                if errors:
+                if errors or qc_outliers:
                     channel = settings.SLACK_ALERT_CHANNEL
                 else:
                     channel = settings.SLACK_LOG_CHANNEL
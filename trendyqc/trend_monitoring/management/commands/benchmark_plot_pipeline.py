@@ -0,0 +1,316 @@
+import datetime
+import json
+import logging
+import subprocess
+import time
+from typing import Dict
+
+from dateutil.relativedelta import relativedelta
+import numpy as np
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max
+
+from trend_monitoring.backend_utils.plot import (
+    format_data_for_plotly_js,
+    get_data_for_plotting,
+    get_subset_queryset,
+)
+from trend_monitoring.backend_utils.timing import (
+    REQUEST_TIMINGS,
+    new_request_timings,
+    sql_timing_wrapper,
+)
+from trend_monitoring.models.metadata import Report, Report_Sample
+
+logger = logging.getLogger("basic")
+
+PERCENTILES = [50, 90, 95, 99]
+# stages of the pipeline timed for every filter
+STAGES = ["data", "traces", "total"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the plot pipeline (get_subset_queryset -> get_data_for_plotting "
+        "-> format_data_for_plotly_js) on a matrix of representative filters "
+        "and output the results as JSON. Use a database populated with "
+        "generate_synthetic_qc to compare the results across commits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=10,
+            help="Number of runs of the pipeline per filter",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            help="Path of the JSON output, printed if not given",
+        )
+        parser.add_argument(
+            "-f",
+            "--filters",
+            nargs="+",
+            help="Names of the filters to run, defaults to every filter",
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        filters = get_benchmark_filters()
+
+        if not filters:
+            raise CommandError(
+                "No report in the database, use generate_synthetic_qc to add "
+                "synthetic runs"
+            )
+
+        if options["filters"]:
+            unknown_filters = set(options["filters"]) - set(filters)
+
+            if unknown_filters:
+                raise CommandError(
+                    f"Unknown filters: {sorted(unknown_filters)}, available "
+                    f"filters: {sorted(filters)}"
+                )
+
+            filters = {name: filters[name] for name in options["filters"]}
+
+        results = {
+            "commit": get_git_commit(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "database": {
+                "vendor": connection.vendor,
+                "reports": Report.objects.count(),
+                "report_samples": Report_Sample.objects.count(),
+            },
+            "settings": {
+                "plotting_backend": settings.PLOTTING_BACKEND,
+                "plot_encoding": settings.PLOT_ENCODING,
+            },
+            "repeat": options["repeat"],
+            "filters": {},
+        }
+
+        for name, form in filters.items():
+            results["filters"][name] = benchmark_form(form, options["repeat"])
+            logger.debug(
+                f"Benchmarked {name}: "
+                f"{results['filters'][name]['latency']['total']}"
+            )
+
+        output = json.dumps(results, indent=2, default=str)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(output)
+
+            msg = f"Benchmark results written to {options['output']}"
+        else:
+            self.stdout.write(output)
+            msg = "Benchmark finished"
+
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
+
+
+def get_git_commit() -> str:
+    """Get the commit of the code being benchmarked
+
+    Returns:
+        str: Hash of the commit, None if git is not available
+    """
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_most_common_assay(queryset) -> str:
+    """Get the assay with the most report samples in the queryset
+
+    Args:
+        queryset (QuerySet): Report sample queryset
+
+    Returns:
+        str: Assay name, None if the queryset is empty
+    """
+
+    assays = (
+        queryset.values("assay").annotate(nb=Count("id")).order_by("-nb")[:1]
+    )
+    return assays[0]["assay"] if assays else None
+
+
+def get_benchmark_filters() -> Dict:
+    """Build the matrix of filters benchmarked, relative to the latest run
+    and most common assay of the database
+
+    Returns:
+        dict: Dict of filter name to form data, empty if there is no report
+    """
+
+    latest_date = Report.objects.aggregate(latest=Max("date"))["latest"]
+
+    if latest_date is None:
+        return {}
+
+    def get_date_range(months):
+        return {
+            "date_start": [str(latest_date + relativedelta(months=-months))],
+            "date_end": [str(latest_date)],
+        }
+
+    # assay with the hs metrics and insert size metrics of the filters
+    assay = get_most_common_assay(
+        Report_Sample.objects.exclude(picard__hs_metrics=None)
+    ) or get_most_common_assay(Report_Sample.objects.all())
+    happy_assay = get_most_common_assay(
+        Report_Sample.objects.exclude(happy=None)
+    )
+
+    return {
+        "single_assay_6_months": {
+            "assay_select": [assay],
+            **get_date_range(6),
+            "metrics_y": ["hs_metrics|fold_enrichment"],
+        },
+        "all_assays_2_years": {
+            **get_date_range(24),
+            "metrics_y": ["hs_metrics|fold_enrichment"],
+        },
+        "fastqc_lanes": {
+            "assay_select": [assay],
+            **get_date_range(6),
+            "metrics_y": ["read_data|total_sequences"],
+        },
+        "happy": {
+            "assay_select": [happy_assay or assay],
+            **get_date_range(24),
+            "metrics_y": ["happy_snp_all|metric_recall_snp"],
+        },
+        "multi_metric": {
+            "assay_select": [assay],
+            **get_date_range(6),
+            "metrics_y": [
+                "hs_metrics|fold_enrichment",
+                "insert_size_metrics|median_insert_size",
+                "read_data|total_sequences",
+            ],
+        },
+    }
+
+
+def run_pipeline(form: Dict) -> Dict:
+    """Run the plot pipeline once for the given form, formatting the traces
+    of every metric
+
+    Args:
+        form (dict): Form data with the subset and the metrics_y
+
+    Returns:
+        dict: Time in seconds spent in every stage, number of SQL queries,
+        memory used by the dataframes, size of the traces and error returned
+        by format_data_for_plotly_js if any
+    """
+
+    timings = new_request_timings()
+    token = REQUEST_TIMINGS.set(timings)
+    start = time.perf_counter()
+
+    try:
+        with connection.execute_wrapper(sql_timing_wrapper):
+            queryset = get_subset_queryset(form)
+            data_dfs, _, _ = get_data_for_plotting(queryset, form["metrics_y"])
+            data_time = time.perf_counter()
+            traces = [
+                format_data_for_plotly_js(df, settings.PLOT_ENCODING)
+                for df in data_dfs
+                if not df.empty
+            ]
+    finally:
+        REQUEST_TIMINGS.reset(token)
+
+    end = time.perf_counter()
+
+    return {
+        "data": data_time - start,
+        "traces": end - data_time,
+        "total": end - start,
+        "sql_queries": timings["sql_queries"],
+        "sql_time": timings["sql_time"],
+        "rows": sum(len(df) for df in data_dfs),
+        "dataframe_bytes": int(
+            sum(df.memory_usage(deep=True).sum() for df in data_dfs)
+        ),
+        # the formatting returns an error message instead of the traces and
+        # grouping when it fails
+        "payload_bytes": sum(
+            len("".join(trace).encode()) for trace in traces if len(trace) == 2
+        ),
+        "errors": [trace for trace in traces if len(trace) != 2]
+        + [
+            f"No data for {metric}"
+            for metric, df in zip(form["metrics_y"], data_dfs)
+            if df.empty
+        ],
+    }
+
+
+def benchmark_form(form: Dict, repeat: int) -> Dict:
+    """Run the plot pipeline several times for the given form
+
+    Args:
+        form (dict): Form data with the subset and the metrics_y
+        repeat (int): Number of runs of the pipeline
+
+    Returns:
+        dict: Form, latency percentiles in milliseconds of every stage and
+        the number of queries, rows, memory and payload size of the last run
+    """
+
+    # the first run warms up the database and Django caches
+    run_pipeline(form)
+    runs = [run_pipeline(form) for _ in range(repeat)]
+    last_run = runs[-1]
+
+    return {
+        "form": form,
+        "latency": {
+            stage: {
+                f"p{percentile}": round(value * 1000, 3)
+                for percentile, value in zip(
+                    PERCENTILES,
+                    np.percentile([run[stage] for run in runs], PERCENTILES),
+                )
+            }
+            for stage in STAGES
+        },
+        "sql_time": round(
+            float(np.median([run["sql_time"] for run in runs])) * 1000, 3
+        ),
+        **{
+            key: last_run[key]
+            for key in [
+                "sql_queries",
+                "rows",
+                "dataframe_bytes",
+                "payload_bytes",
+                "errors",
+            ]
+        },
+    }
@@ -0,0 +1,181 @@
+import logging
+import re
+import statistics
+
+from dateutil.relativedelta import relativedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Max
+
+from trend_monitoring.backend_utils.plot import get_subset_queryset
+from trend_monitoring.models.metadata import Report, Report_Sample, Sample
+
+logger = logging.getLogger("basic")
+
+# columns selected by get_data_for_plotting on top of the metric columns
+PLOT_COLUMNS = [
+    "sample__sample_id",
+    "report__date",
+    "report__project_name",
+    "assay",
+    "report__sequencer_id",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN ANALYZE on representative plot filters with and without "
+        "the plot filter indexes. Everything is done in a transaction that is "
+        "rolled back i.e. the database is left untouched. Use a database "
+        "populated with generate_synthetic_qc to benchmark at scale"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of EXPLAIN ANALYZE runs per filter, median is kept",
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        if connection.vendor != "postgresql":
+            raise CommandError("The benchmark needs a PostgreSQL database")
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for model in [Report, Report_Sample, Sample]:
+                    cursor.execute(f"ANALYZE {model._meta.db_table}")
+
+            filters = get_representative_filters()
+
+            if not filters:
+                raise CommandError(
+                    "No report in the database, use generate_synthetic_qc to "
+                    "add synthetic runs"
+                )
+
+            results = {"indexed": explain_filters(filters, options["repeat"])}
+
+            with connection.schema_editor() as schema_editor:
+                for model in [Report, Report_Sample]:
+                    for index in model._meta.indexes:
+                        schema_editor.remove_index(model, index)
+
+            results["no_index"] = explain_filters(filters, options["repeat"])
+
+            # leave the database untouched
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f"Benchmark on {Report_Sample.objects.count()} report samples"
+        )
+
+        for name in filters:
+            before = results["no_index"][name]
+            after = results["indexed"][name]
+            msg = (
+                f"{name}: {before['time']:.2f}ms -> {after['time']:.2f}ms "
+                f"({after['rows']} rows)\n"
+                f"    no index: {before['scans']}\n"
+                f"    indexed: {after['scans']}"
+            )
+            logger.debug(msg)
+            self.stdout.write(msg)
+
+        self.stdout.write(self.style.SUCCESS("Benchmark finished"))
+
+
+def get_representative_filters() -> dict:
+    """Build subset filters similar to the ones used in the dashboard using
+    the most common values of the database
+
+    Returns:
+        dict: Dict of filter name to form data, empty if there is no report
+    """
+
+    latest_date = Report.objects.aggregate(latest=Max("date"))["latest"]
+
+    if latest_date is None:
+        return {}
+
+    assay = (
+        Report_Sample.objects.values("assay")
+        .annotate(nb=Count("id"))
+        .order_by("-nb")[0]["assay"]
+    )
+    sequencer_id = (
+        Report.objects.values("sequencer_id")
+        .annotate(nb=Count("id"))
+        .order_by("-nb")[0]["sequencer_id"]
+    )
+    runs = list(
+        Report.objects.order_by("-date").values_list(
+            "project_name", flat=True
+        )[:5]
+    )
+    date_range = {
+        "date_start": [str(latest_date + relativedelta(months=-6))],
+        "date_end": [str(latest_date)],
+    }
+
+    return {
+        "assay": {"assay_select": [assay]},
+        "sequencer": {"sequencer_select": [sequencer_id]},
+        "runs": {"run_select": runs},
+        "date_range": date_range,
+        "assay_date_range": {"assay_select": [assay], **date_range},
+    }
+
+
+def explain_filters(filters: dict, repeat: int) -> dict:
+    """Run EXPLAIN ANALYZE on the plotting query of every filter
+
+    Args:
+        filters (dict): Dict of filter name to form data
+        repeat (int): Number of runs per filter
+
+    Returns:
+        dict: Dict of filter name to dict with the median execution time, the
+        number of rows returned and the scans used by the plan
+    """
+
+    results = {}
+
+    for name, form in filters.items():
+        queryset = get_subset_queryset(form).values(*PLOT_COLUMNS)
+        # warm up the cache of the database
+        queryset.explain(analyze=True)
+        plans = [queryset.explain(analyze=True) for _ in range(repeat)]
+
+        times = [
+            float(re.search(r"Execution Time: ([\d.]+) ms", plan).group(1))
+            for plan in plans
+        ]
+        rows = re.search(r"actual time=\S+ rows=(\d+)", plans[0]).group(1)
+        scans = re.findall(
+            r"((?:Parallel )?(?:Seq|Index Only|Index|Bitmap Index|Bitmap Heap) "
+            r"Scan)(?: using (\S+))? on (\w+)",
+            plans[0],
+        )
+
+        results[name] = {
+            "time": statistics.median(times),
+            "rows": int(rows),
+            "scans": ", ".join(
+                sorted(
+                    {
+                        f"{scan} on {table}"
+                        + (f" ({index})" if index else "")
+                        for scan, index, table in scans
+                    }
+                )
+            ),
+        }
+
+    return results
@@ -0,0 +1,28 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from trend_monitoring.backend_utils.cache import bump_generation
+from trend_monitoring.backend_utils.spc import rebuild_metric_baselines
+
+logger = logging.getLogger("basic")
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the metric baselines used for the control limits from the "
+        "run summaries, i.e. for summaries built before the baselines existed "
+        "or after deleting reports"
+    )
+
+    def handle(self, *args, **options):
+        """Rebuild the baselines and invalidate the plot cache"""
+
+        nb_baselines = rebuild_metric_baselines()
+
+        # plots built with the previous baselines are outdated
+        bump_generation()
+
+        msg = f"Built {nb_baselines} metric baselines"
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
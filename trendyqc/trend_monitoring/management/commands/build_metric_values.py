@@ -0,0 +1,65 @@
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from trend_monitoring.backend_utils.metric_store import update_metric_values
+from trend_monitoring.models.metadata import Report
+from trend_monitoring.models.metric_store import Metric_value
+
+logger = logging.getLogger("basic")
+
+
+class Command(BaseCommand):
+    help = "Copy the metrics of the reports in the metric value table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-r",
+            "--rebuild",
+            action="store_true",
+            default=False,
+            help=(
+                "Rebuild the metric values of every report. By default, only "
+                "the reports without metric values are processed"
+            ),
+        )
+        parser.add_argument(
+            "-p",
+            "--project_name",
+            nargs="+",
+            help="Project name(s) for which to build the metric values",
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        reports = Report.objects.all()
+
+        if options["project_name"]:
+            reports = reports.filter(project_name__in=options["project_name"])
+
+        if not options["rebuild"] and not options["project_name"]:
+            reports = reports.filter(
+                ~Exists(
+                    Metric_value.objects.filter(
+                        report_sample__report=OuterRef("pk")
+                    )
+                )
+            )
+
+        reports = reports.order_by("date")
+        nb_reports = reports.count()
+        nb_values = 0
+
+        for i, report in enumerate(reports.iterator(), 1):
+            nb_values += update_metric_values(report)
+            logger.debug(
+                f"Built metric values for {report.name} ({i}/{nb_reports})"
+            )
+
+        msg = f"Built {nb_values} metric values for {nb_reports} reports"
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,60 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from trend_monitoring.backend_utils.cache import bump_generation
+from trend_monitoring.backend_utils.summary import update_run_metric_summaries
+from trend_monitoring.models.metadata import Report
+
+logger = logging.getLogger("basic")
+
+
+class Command(BaseCommand):
+    help = "Build the per run metric summaries for the reports in TrendyQC"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-r",
+            "--rebuild",
+            action="store_true",
+            default=False,
+            help=(
+                "Rebuild the summaries of every report. By default, only the "
+                "reports without summaries are processed"
+            ),
+        )
+        parser.add_argument(
+            "-p",
+            "--project_name",
+            nargs="+",
+            help="Project name(s) for which to build the summaries",
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        reports = Report.objects.all()
+
+        if options["project_name"]:
+            reports = reports.filter(project_name__in=options["project_name"])
+
+        if not options["rebuild"] and not options["project_name"]:
+            reports = reports.filter(run_metric_summary__isnull=True)
+
+        reports = reports.distinct().order_by("date")
+        nb_reports = reports.count()
+        nb_summaries = 0
+
+        for i, report in enumerate(reports.iterator(), 1):
+            nb_summaries += update_run_metric_summaries(report)
+            logger.debug(f"Built summaries for {report.name} ({i}/{nb_reports})")
+
+        if nb_reports:
+            # plots built from the previous summaries are outdated
+            bump_generation()
+
+        msg = f"Built {nb_summaries} summaries for {nb_reports} reports"
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
@@ -0,0 +1,131 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trend_monitoring.backend_utils.export import (
+    EXPORT_FORMATS,
+    is_export_format_available,
+    stream_export,
+)
+from trend_monitoring.backend_utils.plot import get_subset_queryset
+from trend_monitoring.backend_utils.samples import is_valid_metric
+
+logger = logging.getLogger("basic")
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the values of the given metrics for every sample of a subset "
+        "of runs as CSV or Parquet (needs pyarrow). The subset is defined in "
+        "the same way as in the dashboard and the rows are streamed from a "
+        "server side cursor i.e. the memory used doesn't depend on the size "
+        "of the export"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-m",
+            "--metrics",
+            nargs="+",
+            required=True,
+            help="Metrics exported, in the model|field format",
+        )
+        parser.add_argument(
+            "-a", "--assays", nargs="+", default=[], help="Assays exported"
+        )
+        parser.add_argument(
+            "-r", "--runs", nargs="+", default=[], help="Runs exported"
+        )
+        parser.add_argument(
+            "-s",
+            "--sequencers",
+            nargs="+",
+            default=[],
+            help="Sequencer ids exported",
+        )
+        parser.add_argument(
+            "--date_start", help="Start of the run dates, YYYY-MM-DD"
+        )
+        parser.add_argument(
+            "--date_end", help="End of the run dates, YYYY-MM-DD"
+        )
+        parser.add_argument(
+            "-d", "--days_back", type=int, help="Number of days exported"
+        )
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=list(EXPORT_FORMATS),
+            default="csv",
+            help="Format of the export",
+        )
+        parser.add_argument(
+            "-c",
+            "--chunk_size",
+            type=int,
+            help=(
+                "Number of rows fetched per round trip and per row group, "
+                "EXPORT_CHUNK_SIZE by default"
+            ),
+        )
+        parser.add_argument(
+            "-o", "--output", required=True, help="Path of the export"
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        if not is_export_format_available(options["format"]):
+            raise CommandError(
+                f"The {options['format']} export needs pyarrow to be "
+                "installed"
+            )
+
+        metrics = list(dict.fromkeys(options["metrics"]))
+        invalid_metrics = [
+            metric for metric in metrics if not is_valid_metric(metric)
+        ]
+
+        if invalid_metrics:
+            raise CommandError(
+                f"Invalid metrics: {', '.join(invalid_metrics)}"
+            )
+
+        # same data as the subset part of the dashboard form
+        data = {
+            "assay_select": options["assays"],
+            "run_select": options["runs"],
+            "sequencer_select": options["sequencers"],
+        }
+
+        if options["days_back"]:
+            data["days_back"] = [options["days_back"]]
+        elif options["date_start"] and options["date_end"]:
+            data["date_start"] = options["date_start"]
+            data["date_end"] = options["date_end"]
+        elif options["date_start"] or options["date_end"]:
+            raise CommandError("Both --date_start and --date_end are needed")
+
+        if not any(data.values()):
+            raise CommandError("No subset of runs selected")
+
+        if options["format"] == "parquet":
+            output = open(options["output"], "wb")
+        else:
+            # the csv module writes the line endings
+            output = open(options["output"], "w", newline="")
+
+        with output as f:
+            for part in stream_export(
+                get_subset_queryset(data),
+                metrics,
+                options["format"],
+                options["chunk_size"],
+            ):
+                f.write(part)
+
+        msg = f"Exported {', '.join(metrics)} to {options['output']}"
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
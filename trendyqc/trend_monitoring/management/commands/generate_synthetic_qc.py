@@ -0,0 +1,792 @@
+import csv
+import datetime
+import io
+import json
+import logging
+import time
+from typing import Dict
+import zlib
+
+from dateutil.relativedelta import relativedelta
+import numpy as np
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from trend_monitoring.backend_utils.cache import bump_generation
+from trend_monitoring.backend_utils.metric_store import update_metric_values
+from trend_monitoring.backend_utils.plot import get_display_month
+from trend_monitoring.backend_utils.summary import update_run_metric_summaries
+from trend_monitoring.models.bam_qc import (
+    Base_distribution_by_cycle_metrics,
+    Picard,
+    RNA_seqc,
+)
+from trend_monitoring.models.fastq_qc import Fastqc, Read_data
+from trend_monitoring.models.metadata import Report, Report_Sample, Sample
+from trend_monitoring.models.vcf_qc import (
+    Happy,
+    Happy_indel_all,
+    Happy_indel_pass,
+    Happy_metrics,
+    Happy_snp_all,
+    Happy_snp_pass,
+    Sompy_data,
+)
+from .utils._multiqc import CONFIG_DIR
+
+logger = logging.getLogger("basic")
+
+SYNTHETIC_SEQUENCERS = ["A01295", "A01303", "NB552085"]
+NUMERIC_TYPES = [
+    "BigIntegerField",
+    "FloatField",
+    "IntegerField",
+]
+INTEGER_LIMITS = {"IntegerField": 2**31 - 1, "BigIntegerField": 2**63 - 1}
+# words identifying metrics stored as a fraction or a percentage
+RATIO_WORDS = ["pct", "rate", "recall", "precision", "score", "frac"]
+# models storing their ratios as percentages instead of fractions
+PERCENT_MODELS = ["read_data", "samtools_data", "bcl2fastq_data"]
+
+# median and relative spread of the metrics looked at the most, the other
+# metrics get a distribution derived from their name
+METRIC_DISTRIBUTIONS = {
+    "read_data.total_sequences": (8e6, 0.3),
+    "read_data.gc_pct": (45, 0.03),
+    "read_data.total_deduplicated_pct": (60, 0.1),
+    "read_data.avg_sequence_length": (145, 0.02),
+    "verifybamid_data.freemix": (0.003, 0.8),
+    "hs_metrics.fold_enrichment": (1500, 0.15),
+    "hs_metrics.mean_target_coverage": (350, 0.2),
+    "hs_metrics.pct_target_bases_20x": (0.98, 0.01),
+    "hs_metrics.pct_off_bait": (0.3, 0.1),
+    "insert_size_metrics.median_insert_size": (230, 0.08),
+    "duplication_metrics.pct_duplication": (0.15, 0.3),
+    "alignment_summary_metrics.pct_pf_reads_aligned": (0.995, 0.003),
+    "samtools_data.mapped_passed_pct": (99.5, 0.003),
+    "happy_metrics.metric_recall": (0.99, 0.005),
+    "happy_metrics.metric_precision": (0.995, 0.003),
+    "happy_metrics.metric_f1_score": (0.992, 0.004),
+    "vcfqc_data.het_hom_ratio": (1.6, 0.1),
+    "somalier_data.depth_mean": (150, 0.2),
+}
+# fraction of the samples with an outlier value for a metric
+OUTLIER_RATE = 0.01
+
+CHAR_VALUES = {
+    "file_type": "Conventional base calls",
+    "encoding": "Sanger / Illumina 1.9",
+    "sequence_length": "35-151",
+    "bait_set": "synthetic",
+    "category": "PAIR",
+    "pair_orientation": "FR",
+    "accumulation_level": "All Reads",
+    "reads_used": "ALL",
+    "custom_amplicon_set": "synthetic",
+    "rg": "synthetic",
+}
+
+# value written for nulls in the data loaded with COPY
+NULL = "\\N"
+LANE_NAMES = [(1, "1st"), (2, "2nd")]
+
+# sample with the hap.py and som.py data of the run
+CONTROL_SAMPLE = "NA12878"
+HAPPY_MODELS = {
+    ("snp", "ALL"): Happy_snp_all,
+    ("snp", "PASS"): Happy_snp_pass,
+    ("indel", "ALL"): Happy_indel_all,
+    ("indel", "PASS"): Happy_indel_pass,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Populate the database with synthetic runs and QC data for every "
+        "tool of the assay config, for testing the app at scale. Use a "
+        "dedicated database: the synthetic data is not meant to be removed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-r", "--runs", type=int, default=100, help="Number of runs"
+        )
+        parser.add_argument(
+            "-s",
+            "--samples_per_run",
+            type=int,
+            default=96,
+            help=(
+                "Average number of samples per run, the number of samples "
+                "of every run is between half and 1.5 times this number"
+            ),
+        )
+        parser.add_argument(
+            "-y",
+            "--years",
+            type=float,
+            default=5,
+            help="Number of years before today over which runs are spread",
+        )
+        parser.add_argument(
+            "-a",
+            "--assays",
+            nargs="+",
+            help=(
+                "Assays of the runs, defaults to every assay of the config "
+                "with plotting colors"
+            ),
+        )
+        parser.add_argument(
+            "-l",
+            "--lanes",
+            type=int,
+            default=2,
+            help="Number of lanes of the runs",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=None, help="Seed of the generator"
+        )
+        parser.add_argument(
+            "--chunk_size",
+            type=int,
+            default=50,
+            help="Number of runs inserted per transaction",
+        )
+        parser.add_argument(
+            "--build_summaries",
+            action="store_true",
+            default=False,
+            help=(
+                "Build the run summaries and metric values of the runs, "
+                "slower than generating the data"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        # rows are loaded with COPY and linked using ids reserved from the
+        # sequences of the tables
+        if connection.vendor != "postgresql":
+            raise CommandError("The generator needs a PostgreSQL database")
+
+        assays_config = json.loads((CONFIG_DIR / "assays.json").read_text())
+        # the plots need a color for every assay
+        plotable_assays = [
+            assay
+            for assay in assays_config
+            if assay in settings.PLOTTING_COLORS
+        ]
+        assays = options["assays"] or plotable_assays
+        unknown_assays = set(assays) - set(plotable_assays)
+
+        if unknown_assays:
+            raise CommandError(
+                "Assays not in both the assay config and the plotting colors: "
+                f"{sorted(unknown_assays)}"
+            )
+
+        rng = np.random.default_rng(options["seed"])
+        today = datetime.date.today()
+        nb_days = int(options["years"] * 365)
+        days_back = np.sort(rng.integers(0, nb_days + 1, options["runs"]))
+        start = time.perf_counter()
+        nb_samples = 0
+
+        for chunk_start in range(0, options["runs"], options["chunk_size"]):
+            runs = []
+
+            for run_nb in range(
+                chunk_start,
+                min(chunk_start + options["chunk_size"], options["runs"]),
+            ):
+                samples_per_run = options["samples_per_run"]
+                runs.append(
+                    {
+                        "run_nb": run_nb,
+                        "date": today
+                        + relativedelta(days=-int(days_back[-run_nb - 1])),
+                        # position of the run in the time span, used for the
+                        # drift of the metrics
+                        "time": 1 - days_back[-run_nb - 1] / max(nb_days, 1),
+                        "assay": str(rng.choice(assays)),
+                        "sequencer_id": str(rng.choice(SYNTHETIC_SEQUENCERS)),
+                        "nb_samples": int(
+                            rng.integers(
+                                max(samples_per_run // 2, 1),
+                                samples_per_run * 3 // 2 + 1,
+                            )
+                        ),
+                    }
+                )
+
+            with transaction.atomic():
+                report_ids = create_runs(
+                    runs, assays_config, options["lanes"], rng
+                )
+
+                if options["build_summaries"]:
+                    for report in Report.objects.filter(id__in=report_ids):
+                        update_run_metric_summaries(report)
+                        update_metric_values(report)
+
+            nb_samples += sum(run["nb_samples"] for run in runs)
+            logger.debug(
+                f"Generated {chunk_start + len(runs)}/{options['runs']} "
+                f"synthetic runs ({nb_samples} samples)"
+            )
+
+        # the cached plots don't include the new runs
+        bump_generation()
+
+        msg = (
+            f"Generated {options['runs']} synthetic runs and {nb_samples} "
+            f"samples in {time.perf_counter() - start:.1f}s"
+        )
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
+
+
+def reserve_ids(model, nb_ids: int) -> list:
+    """Reserve ids from the id sequence of the table of the model, in order
+    to link rows before inserting them
+
+    Args:
+        model (Model): Django model
+        nb_ids (int): Number of ids to reserve
+
+    Returns:
+        list: List of ids
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, nb_ids],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def copy_rows(model, columns: Dict, ids: list = None) -> list:
+    """Insert rows in the table of the model using COPY, which is a lot
+    faster than bulk_create for the wide tables of the tools
+
+    Args:
+        model (Model): Django model
+        columns (dict): Values of the columns by field attribute name, the
+        columns not given are null
+        ids (list, optional): Ids of the rows, reserved using reserve_ids.
+        Defaults to None.
+
+    Returns:
+        list: Ids of the inserted rows
+    """
+
+    nb_rows = len(next(iter(columns.values())))
+
+    if nb_rows == 0:
+        return []
+
+    if ids is None:
+        ids = reserve_ids(model, nb_rows)
+
+    columns = {"id": ids, **columns}
+    db_columns = {
+        field.attname: field.column for field in model._meta.concrete_fields
+    }
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [NULL if value is None else value for value in row]
+        for row in zip(*columns.values())
+    )
+    buffer.seek(0)
+    quote_name = connection.ops.quote_name
+    column_names = ", ".join(
+        quote_name(db_columns[column]) for column in columns
+    )
+
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {quote_name(model._meta.db_table)} ({column_names}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+            buffer,
+        )
+
+    return ids
+
+
+def get_distribution(model, field) -> tuple:
+    """Get the distribution of the values of a field. Fields without a
+    known distribution get one derived from their name so that the values of
+    a field are consistent between chunks of runs.
+
+    Args:
+        model (Model): Django model
+        field (Field): Numerical field of the model
+
+    Returns:
+        tuple: Median, relative spread, drift over the time span (in log
+        space) and upper bound of the values
+    """
+
+    model_name = model._meta.model_name
+    key = f"{model_name}.{field.name}"
+    field_rng = np.random.default_rng(zlib.crc32(key.encode()))
+    is_ratio = any(word in field.name for word in RATIO_WORDS)
+    upper_bound = None
+
+    if is_ratio:
+        upper_bound = 100 if model_name in PERCENT_MODELS else 1
+
+    if key in METRIC_DISTRIBUTIONS:
+        median, spread = METRIC_DISTRIBUTIONS[key]
+    elif is_ratio:
+        median = field_rng.uniform(0.1, 0.9) * upper_bound
+        spread = 0.05
+    else:
+        median = 10 ** field_rng.uniform(1, 6)
+        spread = 0.1
+
+    return median, spread, field_rng.normal(0, spread), upper_bound
+
+
+def generate_values(
+    model, field, run_indexes: np.ndarray, run_times: np.ndarray, rng
+) -> list:
+    """Generate the values of a numerical field for the given rows. Values
+    follow a log normal distribution around the median of the field with a
+    shift per run, a drift over time and a few outliers.
+
+    Args:
+        model (Model): Django model
+        field (Field): Numerical field of the model
+        run_indexes (np.ndarray): Index of the run of every row
+        run_times (np.ndarray): Position of every run in the time span
+        rng (Generator): Numpy random generator
+
+    Returns:
+        list: List of values
+    """
+
+    median, spread, drift, upper_bound = get_distribution(model, field)
+    nb_values = len(run_indexes)
+    run_shifts = rng.normal(0, spread / 2, len(run_times))
+    log_values = (
+        np.log(median)
+        + run_shifts[run_indexes]
+        + drift * run_times[run_indexes]
+        + rng.normal(0, spread, nb_values)
+    )
+    outliers = rng.random(nb_values) < OUTLIER_RATE
+    log_values[outliers] += rng.normal(0, 3 * spread, outliers.sum())
+    values = np.exp(log_values)
+
+    if upper_bound is not None:
+        values = np.minimum(values, upper_bound)
+
+    internal_type = field.get_internal_type()
+
+    if internal_type in INTEGER_LIMITS:
+        return (
+            np.minimum(np.round(values), INTEGER_LIMITS[internal_type])
+            .astype(np.int64)
+            .tolist()
+        )
+
+    return values.tolist()
+
+
+def generate_columns(
+    model, run_indexes: list, run_times: np.ndarray, rng, **columns
+) -> Dict:
+    """Generate the columns of rows of a QC model with values for every
+    field
+
+    Args:
+        model (Model): Django model
+        run_indexes (list): Index of the run of every row
+        run_times (np.ndarray): Position of every run in the time span
+        rng (Generator): Numpy random generator
+        columns (dict): Values of the fields not generated i.e. foreign key
+        ids, lanes or reads, by attribute name
+
+    Returns:
+        dict: Values of every column by field attribute name
+    """
+
+    run_indexes = np.asarray(run_indexes, dtype=int)
+    nb_rows = len(run_indexes)
+    values = {}
+
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            continue
+
+        if field.attname in columns:
+            values[field.attname] = columns[field.attname]
+        elif field.is_relation:
+            continue
+        elif field.get_internal_type() in NUMERIC_TYPES:
+            values[field.attname] = generate_values(
+                model, field, run_indexes, run_times, rng
+            )
+        else:
+            # status of the FastQC modules
+            default = "pass" if model is Read_data else ""
+            values[field.attname] = [
+                CHAR_VALUES.get(field.name, default)
+            ] * nb_rows
+
+    return values
+
+
+def create_runs(runs: list, assays_config: Dict, nb_lanes: int, rng) -> list:
+    """Insert the runs, their samples and the QC data of every tool of their
+    assay
+
+    Args:
+        runs (list): List of dicts with the run number, date, time, assay,
+        sequencer id and number of samples of every run
+        assays_config (dict): Content of the assay config
+        nb_lanes (int): Number of lanes of the runs
+        rng (Generator): Numpy random generator
+
+    Returns:
+        list: Ids of the reports
+    """
+
+    project_names = [
+        f"002_{run['date']:%y%m%d}_{run['sequencer_id']}_"
+        f"{run['run_nb']:05d}_SYNTHETIC"
+        for run in runs
+    ]
+    report_ids = copy_rows(
+        Report,
+        {
+            "name": [f"{name}.json" for name in project_names],
+            "project_id": [
+                f"project-synthetic{run['run_nb']:014d}" for run in runs
+            ],
+            "project_name": project_names,
+            "dnanexus_file_id": [
+                f"file-synthetic{run['run_nb']:017d}" for run in runs
+            ],
+            "sequencer_id": [run["sequencer_id"] for run in runs],
+            "date": [run["date"] for run in runs],
+            "job_date": [
+                datetime.datetime.combine(
+                    run["date"], datetime.time(), tzinfo=datetime.timezone.utc
+                )
+                for run in runs
+            ],
+            "display_month": [
+                get_display_month(name, run["date"])
+                for name, run in zip(project_names, runs)
+            ],
+        },
+    )
+    run_times = np.array([run["time"] for run in runs])
+
+    # one entry per sample of the chunk: (run index, sample id)
+    rows = [
+        (
+            run_index,
+            CONTROL_SAMPLE if i == 0 else f"X{run['run_nb']:06d}{i:03d}",
+        )
+        for run_index, run in enumerate(runs)
+        for i in range(run["nb_samples"])
+    ]
+    sample_ids = copy_rows(
+        Sample,
+        {
+            "sample_id": [
+                f"{sample_id}-{project_names[run_index]}"
+                for run_index, sample_id in rows
+            ]
+        },
+    )
+    report_sample_ids = reserve_ids(Report_Sample, len(rows))
+    # foreign key ids of the report samples to the data of the tools
+    links = {}
+    # foreign key of the report sample to the model of every simple tool
+    tool_fields = {
+        field.related_model: field
+        for field in Report_Sample._meta.fields
+        if field.is_relation
+        and field.related_model not in [Report, Sample, Fastqc, Picard, Happy]
+    }
+
+    for assay in {run["assay"] for run in runs}:
+        indexes = [
+            i
+            for i, (run_index, _) in enumerate(rows)
+            if runs[run_index]["assay"] == assay
+        ]
+        tools = {tuple(tool) for tool in assays_config[assay].values()}
+        picard_subtools = {
+            subtool.lower() for tool, subtool in tools if tool == "picard"
+        }
+        # som.py and hap.py data is only present for the control sample
+        control_indexes = [i for i in indexes if rows[i][1] == CONTROL_SAMPLE]
+
+        for model, field in tool_fields.items():
+            if not any(
+                field.name in [tool, f"{tool}_data"] for tool, _ in tools
+            ):
+                continue
+
+            tool_indexes = control_indexes if model is Sompy_data else indexes
+            extra_columns = {}
+
+            if model is RNA_seqc:
+                extra_columns["sample"] = [rows[i][1] for i in tool_indexes]
+
+            ids = copy_rows(
+                model,
+                generate_columns(
+                    model,
+                    [rows[i][0] for i in tool_indexes],
+                    run_times,
+                    rng,
+                    **extra_columns,
+                ),
+            )
+            add_links(links, field.attname, tool_indexes, ids, len(rows))
+
+        if ("fastqc", "read_data") in tools:
+            lane_ids = create_lane_data(
+                Read_data,
+                rows,
+                indexes,
+                report_sample_ids,
+                nb_lanes,
+                run_times,
+                rng,
+            )
+            ids = copy_rows(
+                Fastqc,
+                {
+                    f"read_data_{lane_name}_lane_{read}_id": [
+                        sample_lane_ids.get((lane_nb, read))
+                        for sample_lane_ids in lane_ids
+                    ]
+                    for lane_nb, lane_name in LANE_NAMES
+                    for read in ["R1", "R2"]
+                },
+            )
+            add_links(links, "fastqc_id", indexes, ids, len(rows))
+
+        if picard_subtools:
+            ids = create_picard_data(
+                picard_subtools,
+                rows,
+                indexes,
+                report_sample_ids,
+                nb_lanes,
+                run_times,
+                rng,
+            )
+            add_links(links, "picard_id", indexes, ids, len(rows))
+
+        if any(tool == "happy" for tool, _ in tools):
+            ids = create_happy_data(
+                rows, control_indexes, report_sample_ids, run_times, rng
+            )
+            add_links(links, "happy_id", control_indexes, ids, len(rows))
+
+    copy_rows(
+        Report_Sample,
+        {
+            "assay": [runs[run_index]["assay"] for run_index, _ in rows],
+            "report_id": [report_ids[run_index] for run_index, _ in rows],
+            "sample_id": sample_ids,
+            **links,
+        },
+        ids=report_sample_ids,
+    )
+    return report_ids
+
+
+def add_links(
+    links: Dict, attname: str, indexes: list, ids: list, nb_rows: int
+):
+    """Add foreign key ids to the columns of the report samples
+
+    Args:
+        links (dict): Foreign key columns of the report samples
+        attname (str): Attribute name of the foreign key
+        indexes (list): Indexes of the report samples linked
+        ids (list): Ids of the rows linked to the report samples
+        nb_rows (int): Number of report samples
+    """
+
+    column = links.setdefault(attname, [None] * nb_rows)
+
+    for i, row_id in zip(indexes, ids):
+        column[i] = row_id
+
+
+def create_lane_data(
+    model,
+    rows: list,
+    indexes: list,
+    report_sample_ids: list,
+    nb_lanes: int,
+    run_times: np.ndarray,
+    rng,
+) -> list:
+    """Insert the rows per lane and read of the given samples
+
+    Args:
+        model (Model): Read_data or Base_distribution_by_cycle_metrics
+        rows (list): Run index and sample id of every report sample
+        indexes (list): Indexes of the report samples of the assay
+        report_sample_ids (list): Reserved ids of the report samples
+        nb_lanes (int): Number of lanes of the runs
+        run_times (np.ndarray): Position of every run in the time span
+        rng (Generator): Numpy random generator
+
+    Returns:
+        list: Dicts of the (lane number, read) to row id of every sample
+    """
+
+    keys = [
+        (i, lane_nb, read)
+        for i in indexes
+        for lane_nb in range(1, nb_lanes + 1)
+        for read in ["R1", "R2"]
+    ]
+    ids = copy_rows(
+        model,
+        generate_columns(
+            model,
+            [rows[i][0] for i, _, _ in keys],
+            run_times,
+            rng,
+            report_sample_id=[report_sample_ids[i] for i, _, _ in keys],
+            lane=[f"L{lane_nb:03d}" for _, lane_nb, _ in keys],
+            sample_read=[read for _, _, read in keys],
+        ),
+    )
+    lane_ids = {i: {} for i in indexes}
+
+    for (i, lane_nb, read), row_id in zip(keys, ids):
+        lane_ids[i][(lane_nb, read)] = row_id
+
+    return [lane_ids[i] for i in indexes]
+
+
+def create_picard_data(
+    subtools: set,
+    rows: list,
+    indexes: list,
+    report_sample_ids: list,
+    nb_lanes: int,
+    run_times: np.ndarray,
+    rng,
+) -> list:
+    """Insert the Picard data of the given samples for the given Picard
+    subtools
+
+    Args:
+        subtools (set): Lowercase names of the Picard subtools of the assay
+        rows (list): Run index and sample id of every report sample
+        indexes (list): Indexes of the report samples of the assay
+        report_sample_ids (list): Reserved ids of the report samples
+        nb_lanes (int): Number of lanes of the runs
+        run_times (np.ndarray): Position of every run in the time span
+        rng (Generator): Numpy random generator
+
+    Returns:
+        list: Ids of the Picard rows of the samples
+    """
+
+    picard_columns = {}
+
+    for field in Picard._meta.fields:
+        if field.is_relation and field.name in subtools:
+            picard_columns[field.attname] = copy_rows(
+                field.related_model,
+                generate_columns(
+                    field.related_model,
+                    [rows[i][0] for i in indexes],
+                    run_times,
+                    rng,
+                ),
+            )
+
+    if "base_distribution_by_cycle_metrics" in subtools:
+        lane_ids = create_lane_data(
+            Base_distribution_by_cycle_metrics,
+            rows,
+            indexes,
+            report_sample_ids,
+            nb_lanes,
+            run_times,
+            rng,
+        )
+
+        for lane_nb, lane_name in LANE_NAMES:
+            for read in ["R1", "R2"]:
+                picard_columns[
+                    f"base_distribution_by_cycle_metrics_{lane_name}_lane_"
+                    f"{read}_id"
+                ] = [
+                    sample_lane_ids.get((lane_nb, read))
+                    for sample_lane_ids in lane_ids
+                ]
+
+    return copy_rows(Picard, picard_columns)
+
+
+def create_happy_data(
+    rows: list,
+    control_indexes: list,
+    report_sample_ids: list,
+    run_times: np.ndarray,
+    rng,
+) -> list:
+    """Insert the hap.py data of the control samples, in the long format
+    table and in the legacy tables per variant type and filter
+
+    Args:
+        rows (list): Run index and sample id of every report sample
+        control_indexes (list): Indexes of the control samples of the assay
+        report_sample_ids (list): Reserved ids of the report samples
+        run_times (np.ndarray): Position of every run in the time span
+        rng (Generator): Numpy random generator
+
+    Returns:
+        list: Ids of the Happy rows of the control samples
+    """
+
+    happy_columns = {}
+    nb_controls = len(control_indexes)
+
+    for (variant_type, happy_filter), legacy_model in HAPPY_MODELS.items():
+        columns = generate_columns(
+            Happy_metrics,
+            [rows[i][0] for i in control_indexes],
+            run_times,
+            rng,
+            report_sample_id=[report_sample_ids[i] for i in control_indexes],
+            variant_type=[variant_type] * nb_controls,
+            filter=[happy_filter] * nb_controls,
+        )
+        copy_rows(Happy_metrics, columns)
+        happy_columns[f"{legacy_model._meta.db_table}_id"] = copy_rows(
+            legacy_model,
+            {
+                f"{column}_{variant_type}": values
+                for column, values in columns.items()
+                if column not in ["report_sample_id", "variant_type"]
+            },
+        )
+
+    return copy_rows(Happy, happy_columns)
@@ -0,0 +1,383 @@
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+import json
+import logging
+import time
+from typing import Dict
+from urllib.parse import parse_qs, urljoin, urlparse
+
+import numpy as np
+import requests
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+)
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from trend_monitoring.models.filters import Filter
+from trend_monitoring.models.metadata import Report_Sample
+
+logger = logging.getLogger("basic")
+
+LOAD_TEST_USER = "load_test"
+PERCENTILES = [50, 90, 95, 99]
+# steps of the flow of every virtual user: name, method, path, POST data and
+# expected status code. A None path is the plot URL the previous step
+# redirected to
+FLOW_STEPS = [
+    ("dashboard", "GET", "", None, 200),
+    ("post_plot", "POST", "", "plot", 302),
+    ("plot", "GET", None, None, 200),
+    ("save_filter", "POST", "plot/", "save_filter", 302),
+    ("use_filter", "POST", "", "filter_use", 302),
+    ("filter_plot", "GET", None, None, 200),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent authenticated sessions through the dashboard -> plot "
+        "-> save filter -> use filter flow against a running TrendyQC and "
+        "report the throughput and latency of every step. The sessions are "
+        "created in the session store i.e. no LDAP server is needed, the "
+        "command needs to use the database of the server"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://localhost:8000/trendyqc/",
+            help="URL of the dashboard of the server",
+        )
+        parser.add_argument(
+            "-u",
+            "--users",
+            type=int,
+            default=5,
+            help="Number of concurrent virtual users",
+        )
+        parser.add_argument(
+            "-i",
+            "--iterations",
+            type=int,
+            default=3,
+            help="Number of times every virtual user goes through the flow",
+        )
+        parser.add_argument(
+            "-m",
+            "--metric",
+            default="hs_metrics|fold_enrichment",
+            help="Y-axis metric plotted, in the model|field format",
+        )
+        parser.add_argument(
+            "-a",
+            "--assays",
+            nargs="+",
+            default=[],
+            help="Assays plotted, every assay of the database by default",
+        )
+        parser.add_argument(
+            "-d",
+            "--days_back",
+            type=int,
+            help="Number of days plotted, every run by default",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Timeout in seconds of the requests",
+        )
+        parser.add_argument(
+            "-o", "--output", help="Path of a JSON output of the results"
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        # the plot form needs a subset of runs
+        assays = options["assays"] or sorted(
+            Report_Sample.objects.values_list("assay", flat=True).distinct()
+        )
+        form_data = {
+            "assay_select": assays,
+            "metrics_y": [get_display_metric(options["metric"])],
+        }
+
+        if options["days_back"]:
+            form_data["days_back"] = [options["days_back"]]
+
+        user, _ = User.objects.get_or_create(username=LOAD_TEST_USER)
+        session_keys = [create_session(user) for _ in range(options["users"])]
+
+        try:
+            start = time.perf_counter()
+
+            with ThreadPoolExecutor(options["users"]) as executor:
+                user_timings = list(
+                    executor.map(
+                        lambda args: run_user(
+                            options["url"],
+                            *args,
+                            options["iterations"],
+                            form_data,
+                            options["timeout"],
+                        ),
+                        enumerate(session_keys),
+                    )
+                )
+
+            wall_time = time.perf_counter() - start
+        finally:
+            Filter.objects.filter(
+                name__startswith=f"{LOAD_TEST_USER}_"
+            ).delete()
+
+            for session_key in session_keys:
+                get_session_store(session_key).delete()
+
+        results = summarise_timings(user_timings, wall_time)
+
+        if results["errors"] == results["requests"]:
+            raise CommandError(
+                f"Every request failed, check that {options['url']} is "
+                "reachable"
+            )
+
+        self.stdout.write(
+            f"{options['users']} users, {options['iterations']} iterations, "
+            f"{wall_time:.1f}s"
+        )
+
+        for step, step_results in results["steps"].items():
+            self.stdout.write(
+                f"{step}: {step_results['requests']} requests, "
+                f"{step_results['errors']} errors, "
+                f"{step_results['throughput']:.2f} req/s, "
+                + ", ".join(
+                    f"{name} {value:.0f}ms"
+                    for name, value in step_results["latency"].items()
+                )
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(results, f, indent=2)
+
+        msg = (
+            f"Load test finished: {results['requests']} requests, "
+            f"{results['errors']} errors, {results['throughput']:.2f} req/s"
+        )
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
+
+
+def get_display_metric(metric: str) -> str:
+    """Get the value of the metric in the metrics select of the dashboard
+
+    Args:
+        metric (str): Metric in the model|field format
+
+    Returns:
+        str: Metric with the display name of the model
+    """
+
+    model_name, field = metric.split("|")
+
+    for model, display_name in settings.DISPLAY_DATA_JSON.items():
+        if model.lower() == model_name.lower():
+            return f"{display_name}|{field}"
+
+    raise CommandError(f"Unknown metric: {metric}")
+
+
+def get_session_store(session_key: str = None):
+    """Get a session of the session engine of the app
+
+    Args:
+        session_key (str, optional): Key of an existing session. Defaults to
+        None.
+
+    Returns:
+        SessionBase: Session object
+    """
+
+    engine = import_module(settings.SESSION_ENGINE)
+    return engine.SessionStore(session_key)
+
+
+def create_session(user) -> str:
+    """Create an authenticated session for the user in the same way as the
+    login function
+
+    Args:
+        user (User): User of the session
+
+    Returns:
+        str: Key of the session, used as session cookie
+    """
+
+    session = get_session_store()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = "django.contrib.auth.backends.ModelBackend"
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+def run_user(
+    url: str,
+    user_nb: int,
+    session_key: str,
+    iterations: int,
+    form_data: Dict,
+    timeout: float,
+) -> Dict:
+    """Go through the flow with the given session
+
+    Args:
+        url (str): URL of the dashboard
+        user_nb (int): Number of the virtual user
+        session_key (str): Key of the authenticated session
+        iterations (int): Number of times the flow is done
+        form_data (dict): Data of the plot form
+        timeout (float): Timeout in seconds of the requests
+
+    Returns:
+        dict: Dict with the step name as key and the list of the latencies
+        in seconds, None for the failed requests, as value
+    """
+
+    timings = {step[0]: [] for step in FLOW_STEPS}
+    client = requests.Session()
+    client.cookies.set(settings.SESSION_COOKIE_NAME, session_key)
+
+    try:
+        run_flow(client, url, user_nb, iterations, form_data, timeout, timings)
+    finally:
+        # the filters are looked up in a connection opened by the thread
+        connection.close()
+
+    return timings
+
+
+def run_flow(
+    client: requests.Session,
+    url: str,
+    user_nb: int,
+    iterations: int,
+    form_data: Dict,
+    timeout: float,
+    timings: Dict,
+):
+    """Do the requests of the flow and add their latency to the timings
+
+    Args:
+        client (requests.Session): HTTP session with the session cookie
+        url (str): URL of the dashboard
+        user_nb (int): Number of the virtual user
+        iterations (int): Number of times the flow is done
+        form_data (dict): Data of the plot form
+        timeout (float): Timeout in seconds of the requests
+        timings (dict): Latencies of every step, see run_user
+    """
+
+    for iteration in range(iterations):
+        filter_name = f"{LOAD_TEST_USER}_{user_nb}_{iteration}"
+        location = ""
+
+        for step, method, path, action, expected_status in FLOW_STEPS:
+            if action == "plot":
+                data = {**form_data, "plot": "Plot"}
+            elif action == "save_filter":
+                # the plot form is carried by the plot token of the plot URL
+                token = parse_qs(urlparse(location).query).get("f", [""])
+                data = {"save_filter": filter_name, "f": token[0]}
+            elif action == "filter_use":
+                saved_filter = Filter.objects.filter(name=filter_name).first()
+                data = {"filter_use": saved_filter.id if saved_filter else ""}
+            else:
+                data = None
+
+            # the CSRF cookie is set by the dashboard page
+            headers = {"X-CSRFToken": client.cookies.get("csrftoken", "")}
+            start = time.perf_counter()
+
+            try:
+                response = client.request(
+                    method,
+                    urljoin(url, location if path is None else path),
+                    data=data,
+                    headers=headers,
+                    allow_redirects=False,
+                    timeout=timeout,
+                )
+            except requests.RequestException as e:
+                logger.warning(f"Load test {step} failed: {e}")
+                timings[step].append(None)
+
+                # the following steps of the flow depend on this one
+                break
+
+            latency = time.perf_counter() - start
+
+            if response.status_code != expected_status:
+                logger.warning(
+                    f"Load test {step} returned {response.status_code}"
+                )
+                timings[step].append(None)
+                break
+
+            timings[step].append(latency)
+            location = response.headers.get("Location", location)
+
+
+def summarise_timings(user_timings: list, wall_time: float) -> Dict:
+    """Get the number of requests and errors, the throughput and the
+    latency percentiles of every step
+
+    Args:
+        user_timings (list): Timings of every virtual user, see run_user
+        wall_time (float): Duration of the load test in seconds
+
+    Returns:
+        dict: Dict with the total number of requests, errors and throughput
+        and the results of every step
+    """
+
+    results = {"requests": 0, "errors": 0, "steps": {}}
+
+    for step, *_ in FLOW_STEPS:
+        timings = [
+            timing for user in user_timings for timing in user[step]
+        ]
+        latencies = [timing for timing in timings if timing is not None]
+        percentiles = (
+            np.percentile(latencies, PERCENTILES) if latencies else []
+        )
+        results["steps"][step] = {
+            "requests": len(timings),
+            "errors": len(timings) - len(latencies),
+            "throughput": len(latencies) / wall_time,
+            "latency": {
+                **{
+                    f"p{percentile}": value * 1000
+                    for percentile, value in zip(PERCENTILES, percentiles)
+                },
+                **({"max": max(latencies) * 1000} if latencies else {}),
+            },
+        }
+        results["requests"] += len(timings)
+        results["errors"] += len(timings) - len(latencies)
+
+    results["throughput"] = (results["requests"] - results["errors"]) / (
+        wall_time
+    )
+    return results
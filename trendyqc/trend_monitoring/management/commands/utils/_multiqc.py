@@ -14,6 +14,10 @@ from django.db import transaction
 from django.db.models import Model
 from django.db.utils import IntegrityError
 
+from trend_monitoring.backend_utils.metric_store import update_metric_values
+from trend_monitoring.backend_utils.plot import get_display_month
+from trend_monitoring.backend_utils.summary import update_run_metric_summaries
+
 from ._check import already_in_db
 from ._parsing import load_assay_config
 from ._tool import Tool
@@ -22,6 +26,8 @@ from ._utils import clean_value, clean_sample_naming
 # returns the /trendyqc/trend_monitoring/management folder
 BASE_DIR_MANAGEMENT = Path(__file__).resolve().parent.parent.parent
 CONFIG_DIR = BASE_DIR_MANAGEMENT / "configs"
+# statuses of the variants in the hap.py data
+HAPPY_FILTERS = ["ALL", "PASS"]
 
 
 class MultiQC_report:
@@ -123,26 +129,10 @@ class MultiQC_report:
             # for Picard. It will equal None if the main tool doesn't have a
             # subtool
             tool, subtool = tool_metadata
-
-            if tool == "happy":
-                # setup the happy tools and distinguish that happy has ALL and
-                # PASS statuses
-                happy_tool = Tool(
-                    tool, CONFIG_DIR, multiqc_field_in_config, subtool
-                )
-                happy_tool.set_happy_type("PASS")
-                self.tools.append(happy_tool)
-
-                happy_tool = Tool(
-                    tool, CONFIG_DIR, multiqc_field_in_config, subtool
-                )
-                happy_tool.set_happy_type("ALL")
-                self.tools.append(happy_tool)
-            else:
-                tool_obj = Tool(
-                    tool, CONFIG_DIR, multiqc_field_in_config, subtool
-                )
-                self.tools.append(tool_obj)
+            # happy has ALL and PASS statuses, both are parsed by the same
+            # tool and stored in the same table
+            tool_obj = Tool(tool, CONFIG_DIR, multiqc_field_in_config, subtool)
+            self.tools.append(tool_obj)
 
     def parse_multiqc_report(self):
         """Parse the multiqc report for easy import
@@ -250,12 +240,17 @@ class MultiQC_report:
                         **cleaned_data,
                     }
 
+                # happy has a sample per status, store the data using the
+                # status i.e. {"ALL": {field: data}, "PASS": {field: data}}
                 elif tool_name == "happy":
-                    if tool_obj.happy_type in cleaned_data.values():
-                        self.data[sample_id][tool_obj] = {
-                            **self.data[sample_id][tool_obj],
-                            **cleaned_data,
-                        }
+                    happy_filter = cleaned_data.get(
+                        f"filter_{tool_obj.subtool}"
+                    )
+
+                    if happy_filter in HAPPY_FILTERS:
+                        self.data[sample_id][tool_obj][happy_filter] = (
+                            cleaned_data
+                        )
 
                 else:
                     self.data[sample_id][tool_obj] = {
@@ -300,14 +295,19 @@ class MultiQC_report:
             # of the run
             self.date = self.datetime_job
 
+        # label used in the plots, stored to not parse the project name every
+        # time a plot is built
+        self.display_month = get_display_month(self.project_name, self.date)
+
     def map_models_to_tools(self):
         """Map Django models to tools. Store that info in the appropriate
         tool object"""
 
         # loop through the tools that we have for this MultiQC report
         for tool in self.tools:
-            if tool.happy_type:
-                tool_regex = f"{tool.subtool}_{tool.happy_type}"
+            if tool.name == "happy":
+                # every variant type and status is stored in the same table
+                tool_regex = "^happy_metrics$"
             elif tool.subtool:
                 tool_regex = tool.subtool
             else:
@@ -353,7 +353,11 @@ class MultiQC_report:
         """
 
         self.all_instances = {}
+        # report sample of every sample with the lane data and happy metrics
+        # instances that are linked to it after the import
+        self.report_sample_links = {}
         report_instance = self.create_report_instance()
+        self.report_instance = report_instance
 
         for sample in self.data:
             # reset the self.instances_per_sample variable to keep
@@ -369,12 +373,23 @@ class MultiQC_report:
             self.all_instances[sample].append(
                 self.create_sample_instance(sample)
             )
+            linked_instances = []
 
             for tool in sample_data:
-                # create instance for every tool
-                self.all_instances[sample].extend(
-                    self.create_tool_data_instance(tool, sample_data[tool])
+                tool_instances = self.create_tool_data_instance(
+                    tool, sample_data[tool]
                 )
+                # create instance for every tool
+                self.all_instances[sample].extend(tool_instances)
+
+                if tool.divided_by_lane_read:
+                    linked_instances.extend(tool_instances)
+                elif tool.name == "happy":
+                    linked_instances.extend(
+                        self.create_happy_metrics_instances(
+                            tool, sample_data[tool]
+                        )
+                    )
 
             for type_table in ["fastqc", "picard", "happy"]:
                 link_table = self.create_link_table_instance(type_table)
@@ -393,6 +408,10 @@ class MultiQC_report:
             )
 
             self.all_instances[sample].append(report_sample_instance)
+            self.report_sample_links[sample] = (
+                report_sample_instance,
+                linked_instances,
+            )
 
     def create_tool_data_instance(
         self, tool_obj: Tool, tool_data: dict
@@ -428,6 +447,18 @@ class MultiQC_report:
                     model_instance
                 )
                 instances_to_return.append(model_instance)
+        elif tool_obj.name == "happy":
+            for happy_filter, data in tool_data.items():
+                # the data is also stored in the table of its variant type and
+                # status i.e. happy_snp_all
+                happy_model = self.models[
+                    f"happy_{tool_obj.subtool}_{happy_filter.lower()}"
+                ]
+                model_instance = happy_model(**data)
+                self.instances_per_sample[tool_obj.parent].append(
+                    model_instance
+                )
+                instances_to_return.append(model_instance)
         else:
             model_instance = model(**tool_data)
 
@@ -447,6 +478,41 @@ class MultiQC_report:
 
         return instances_to_return
 
+    def create_happy_metrics_instances(
+        self, tool_obj: Tool, tool_data: dict
+    ) -> List:
+        """Create the happy metrics instances of a sample i.e. one instance
+        per status of the variant type of the tool
+
+        Args:
+            tool_obj (Tool): Happy tool object
+            tool_data (dict): Data stored for that tool using the status as key
+
+        Returns:
+            List: List of the unsaved happy metrics instances
+        """
+
+        instances = []
+        suffix = f"_{tool_obj.subtool}"
+
+        for happy_filter, data in tool_data.items():
+            # the fields of the happy tables are suffixed by the variant type
+            # i.e. metric_recall_snp
+            fields = {
+                field.removesuffix(suffix): value
+                for field, value in data.items()
+                if field != f"filter{suffix}"
+            }
+            instances.append(
+                tool_obj.model(
+                    variant_type=tool_obj.subtool,
+                    filter=happy_filter,
+                    **fields,
+                )
+            )
+
+        return instances
+
     def create_sample_instance(self, sample_id: str) -> Model:
         """Create the sample instance.
 
@@ -479,6 +545,7 @@ class MultiQC_report:
             sequencer_id=self.sequencer_id,
             job_date=self.datetime_job,
             dnanexus_file_id=self.multiqc_json_id,
+            display_month=self.display_month,
         )
         return report_instance
 
@@ -567,11 +634,18 @@ class MultiQC_report:
             if lane_instances:
                 if len(lane_instances) > 2:
                     self.messages.append(
-                        (("Contains more than 2 lanes"), "warning")
+                        (
+                            (
+                                "Contains more than 2 lanes, only the first 2 "
+                                f"are linked to {type_table}"
+                            ),
+                            "warning",
+                        )
                     )
 
-                # order the lanes for addition
-                ordered_lanes = sorted(lane_instances)
+                # order the lanes for addition, every lane is still linked
+                # to the report sample using the lane data table
+                ordered_lanes = sorted(lane_instances)[: len(lane_dict)]
 
                 for i, lane in enumerate(ordered_lanes):
                     # find out if the lane is the 1st or 2nd one
@@ -605,6 +679,46 @@ class MultiQC_report:
                         "Failed to import instance: %s", traceback.format_exc()
                     )
 
+        self.link_report_sample_instances()
+
+        # summarise the metrics of the run and copy them in the metric value
+        # table once all the samples are imported
+        if self.all_instances:
+            update_run_metric_summaries(self.report_instance)
+            update_metric_values(self.report_instance)
+
+    def link_report_sample_instances(self):
+        """Link the lane data and happy metrics of the samples to their report
+        sample. The lane data needs to be saved before the fastqc and picard
+        tables which are saved before the report sample so the link is added
+        after the import, with one query per model for the whole report.
+        """
+
+        saved_instances = defaultdict(list)
+        new_instances = defaultdict(list)
+
+        for report_sample_instance, linked_instances in (
+            self.report_sample_links.values()
+        ):
+            # the report sample failed to be imported
+            if report_sample_instance.pk is None:
+                continue
+
+            for instance in linked_instances:
+                instance.report_sample = report_sample_instance
+
+                # the lane data is already saved
+                if instance.pk:
+                    saved_instances[type(instance)].append(instance)
+                else:
+                    new_instances[type(instance)].append(instance)
+
+        for model, instances in saved_instances.items():
+            model.objects.bulk_update(instances, ["report_sample"])
+
+        for model, instances in new_instances.items():
+            model.objects.bulk_create(instances)
+
     def add_msg(self, msg, type_msg="error"):
         """Add messages usually error to the report object
 
@@ -8,6 +8,9 @@ from urllib3.util import Retry
 
 logger = logging.getLogger("basic")
 
+# maximum number of QC outliers listed per report in the Slack summary
+MAX_QC_OUTLIERS_PER_REPORT = 20
+
 
 def slack_notify(message, channel) -> None:
     """Notify the channel with the given message
@@ -42,7 +45,9 @@ def slack_notify(message, channel) -> None:
         )
 
 
-def build_report_for_slack(header: str, final_msg: str, dict_info: dict = {}):
+def build_report_for_slack(
+    header: str, final_msg: str, dict_info: dict = {}, qc_outliers: dict = {}
+):
     """Given all the messages that a MultiQC report object possesses, create a
     summary report of all the messages
 
@@ -52,6 +57,10 @@ def build_report_for_slack(header: str, final_msg: str, dict_info: dict = {}):
         dict_info (dict): Dict containing the report file-id and the messages
         to report
 
+        qc_outliers (dict): Dict containing the report file-id and the
+        messages of the QC check of the report, capped at
+        MAX_QC_OUTLIERS_PER_REPORT messages per report
+
     Returns:
         msg_report: Summary report string to send to loggers and to Slack
     """
@@ -64,6 +73,21 @@ def build_report_for_slack(header: str, final_msg: str, dict_info: dict = {}):
         for msg in msgs:
             msg_report += f"   - {msg}\n"
 
+    if qc_outliers:
+        msg_report += "\nQC metrics outside of the historical limits:\n"
+
+    for report_id, msgs in qc_outliers.items():
+        msg_report += f" - `{report_id}`\n"
+
+        for msg in msgs[:MAX_QC_OUTLIERS_PER_REPORT]:
+            msg_report += f"   - {msg}\n"
+
+        if len(msgs) > MAX_QC_OUTLIERS_PER_REPORT:
+            msg_report += (
+                f"   - ... and {len(msgs) - MAX_QC_OUTLIERS_PER_REPORT} "
+                "other outliers\n"
+            )
+
     msg_report += f"\n\n{final_msg}"
 
     return msg_report
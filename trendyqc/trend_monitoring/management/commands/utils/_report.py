@@ -1,6 +1,7 @@
 import logging
 import traceback
 
+from trend_monitoring.backend_utils.spc import get_run_outliers
 from ._dnanexus_utils import search_multiqc_reports, is_archived
 from ._multiqc import MultiQC_report
 
@@ -87,3 +88,24 @@ def import_multiqc_report(report: MultiQC_report):
     else:
         logger.debug(f"{report.multiqc_json_id} is not importable")
         return False
+
+
+def check_multiqc_report(report: MultiQC_report) -> list:
+    """Compare the metrics of an imported MultiQC report to the baselines of
+    its assay and sequencer. A failure of the check doesn't affect the import
+    and is reported as a warning of the report
+
+    Args:
+        report (MultiQC_report): Imported MultiQC report object
+
+    Returns:
+        list: List of messages describing the run and samples outside of the
+        limits
+    """
+
+    try:
+        return get_run_outliers(report.report_instance)
+    except Exception:
+        msg = f"Failed to check the QC metrics\n```{traceback.format_exc()}```"
+        report.add_msg(msg, "warning")
+        return []
@@ -27,7 +27,6 @@ class Tool:
         self.subtool = subtool
         self.parent = None
         self.children = []
-        self.happy_type = ""
         self.model = None
 
         if subtool:
@@ -113,8 +112,5 @@ class Tool:
 
         return converted_data
 
-    def set_happy_type(self, happy_type):
-        self.happy_type = happy_type
-
     def set_model(self, model):
         self.model = model
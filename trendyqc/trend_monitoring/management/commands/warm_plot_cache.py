@@ -0,0 +1,212 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from trend_monitoring.backend_utils.cache import get_cache_key, get_plot_cache
+from trend_monitoring.backend_utils.payload import get_plot_payload
+from trend_monitoring.backend_utils.timing import (
+    REQUEST_TIMINGS,
+    new_request_timings,
+    sql_timing_wrapper,
+)
+from trend_monitoring.models.filters import Filter
+
+logger = logging.getLogger("basic")
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the plot of every saved filter and store it in the plot cache, "
+        "i.e. after the import of new reports which invalidates the cached "
+        "plots. The plots are built in parallel and the compute time of "
+        "every filter is reported to spot the slow filters"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-w",
+            "--workers",
+            type=int,
+            default=settings.PLOT_CACHE_WARMUP_WORKERS,
+            help=(
+                "Number of plots built in parallel, "
+                "PLOT_CACHE_WARMUP_WORKERS by default"
+            ),
+        )
+        parser.add_argument(
+            "-f",
+            "--filters",
+            nargs="+",
+            help="Names of the filters warmed up, every filter by default",
+        )
+        parser.add_argument(
+            "-o", "--output", help="Path of a JSON output of the timings"
+        )
+
+    def handle(self, *args, **options):
+        """Handle options given through the CLI using the add_arguments
+        function
+        """
+
+        filters = Filter.objects.order_by("id")
+
+        if options["filters"]:
+            filters = filters.filter(name__in=options["filters"])
+
+        # filters with the same plot, i.e. saved by several users, are built
+        # once
+        plots = {}
+        results = []
+
+        for filter_obj in filters:
+            filter_name = f"{filter_obj.name} ({filter_obj.user})"
+
+            try:
+                form = json.loads(filter_obj.content)
+                cache_key = get_cache_key(form)
+            except Exception as e:
+                logger.warning(f"Invalid filter {filter_name}: {e}")
+                results.append(
+                    {"filters": [filter_name], "status": "invalid"}
+                )
+                continue
+
+            plots.setdefault(cache_key, (form, []))[1].append(filter_name)
+
+        start = time.perf_counter()
+
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(options["workers"]) as executor:
+                results.extend(
+                    executor.map(
+                        lambda args: warm_plot_in_thread(args[0], *args[1]),
+                        plots.items(),
+                    )
+                )
+        else:
+            results.extend(
+                warm_plot(cache_key, form, filter_names)
+                for cache_key, (form, filter_names) in plots.items()
+            )
+
+        wall_time = time.perf_counter() - start
+
+        # slowest plots first
+        results.sort(key=lambda result: -result.get("time", 0))
+
+        for result in results:
+            line = f"{', '.join(result['filters'])}: {result['status']}"
+
+            if "time" in result:
+                line += (
+                    f", {result['time']:.2f}s ({result['sql_queries']} "
+                    f"queries, {result['sql_time']:.2f}s SQL, "
+                    f"{result['pandas']:.2f}s pandas, "
+                    f"{result['traces']:.2f}s traces)"
+                )
+
+            logger.info(f"Plot cache warm-up: {line}")
+            self.stdout.write(line)
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(
+                    {"wall_time": wall_time, "plots": results}, f, indent=2
+                )
+
+        nb_cached = sum(result["status"] == "cached" for result in results)
+        nb_failed = sum(
+            result["status"] in ["error", "invalid"] for result in results
+        )
+        msg = (
+            f"Plot cache warmed up with {nb_cached} plots for "
+            f"{filters.count()} filters in {wall_time:.1f}s, {nb_failed} "
+            "plots failed"
+        )
+        logger.info(msg)
+        self.stdout.write(self.style.SUCCESS(msg))
+
+
+def warm_plot_in_thread(
+    cache_key: str, form: Dict, filter_names: list
+) -> Dict:
+    """Warm up the plot in a thread of the pool, see warm_plot
+
+    Args:
+        cache_key (str): Key of the plot in the plot cache
+        form (dict): Form data of the filter
+        filter_names (list): Names of the filters of the plot
+
+    Returns:
+        dict: Status and timings of the plot, see warm_plot
+    """
+
+    try:
+        return warm_plot(cache_key, form, filter_names)
+    finally:
+        # the connection is opened by the thread of the pool
+        connection.close()
+
+
+def warm_plot(cache_key: str, form: Dict, filter_names: list) -> Dict:
+    """Build the plot of the form and store it in the plot cache, unless it
+    is already cached
+
+    Args:
+        cache_key (str): Key of the plot in the plot cache
+        form (dict): Form data of the filter
+        filter_names (list): Names of the filters of the plot
+
+    Returns:
+        dict: Dict with the names of the filters, the status of the plot
+        ("already_cached", "cached", "not_cached", "no_data" or "error") and
+        the compute time, number of SQL queries and time spent in SQL,
+        pandas and trace building of built plots
+    """
+
+    if get_plot_cache().has_key(cache_key):
+        return {"filters": filter_names, "status": "already_cached"}
+
+    timings = new_request_timings()
+    token = REQUEST_TIMINGS.set(timings)
+    start = time.perf_counter()
+
+    try:
+        with connection.execute_wrapper(sql_timing_wrapper):
+            payload = get_plot_payload(form)
+
+        if payload["status"] == "error":
+            logger.warning(
+                f"Plot cache warm-up of {', '.join(filter_names)} failed: "
+                f"{payload['error']}"
+            )
+            status = "error"
+        elif payload["status"] == "no_data":
+            status = "no_data"
+        elif get_plot_cache().has_key(cache_key):
+            status = "cached"
+        else:
+            # payloads bigger than PLOT_CACHE_MAX_PAYLOAD_SIZE
+            status = "not_cached"
+
+    except Exception as e:
+        logger.warning(
+            f"Plot cache warm-up of {', '.join(filter_names)} failed: {e}"
+        )
+        status = "error"
+
+    finally:
+        REQUEST_TIMINGS.reset(token)
+
+    return {
+        "filters": filter_names,
+        "status": status,
+        "time": time.perf_counter() - start,
+        **timings,
+    }
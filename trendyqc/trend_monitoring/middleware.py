@@ -0,0 +1,140 @@
+from contextlib import ExitStack
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from .backend_utils.cache import normalise_form
+from .backend_utils.links import get_plot_form
+from .backend_utils.monitoring import observe_request
+from .backend_utils.profiling import (
+    PROFILE_ID_HEADER,
+    PROFILED_VIEWS,
+    is_profile_requested,
+    profile_view,
+)
+from .backend_utils.timing import (
+    REQUEST_TIMINGS,
+    new_request_timings,
+    record_request_timings,
+    sql_timing_wrapper,
+)
+
+logger = logging.getLogger("basic")
+
+# buttons of the dashboard and plot forms, used to tell apart the actions
+# posted to the same view
+FORM_ACTIONS = [
+    "plot",
+    "save_filter",
+    "filter_use",
+    "delete_filter",
+    "drill_down",
+    "dashboard",
+]
+
+
+def get_request_action(request) -> str:
+    """Get the form action of the request i.e. the button used to submit the
+    form for POST requests
+
+    Args:
+        request (HttpRequest): Request handled
+
+    Returns:
+        str: Form action, empty string if there is none
+    """
+
+    if request.method == "POST":
+        for action in FORM_ACTIONS:
+            if action in request.POST:
+                return action
+
+    return ""
+
+
+class RequestTimingMiddleware:
+    """Record the wall time, the number of SQL queries, the SQL time and the
+    time spent building the plot data of every request, in the aggregates of
+    the process and in the Prometheus metrics. Slow requests are logged with
+    their normalised filter.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = new_request_timings()
+        token = REQUEST_TIMINGS.set(timings)
+        start = time.perf_counter()
+
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sql_timing_wrapper)
+                    )
+
+                response = self.get_response(request)
+        finally:
+            REQUEST_TIMINGS.reset(token)
+
+        wall_time = time.perf_counter() - start
+
+        # URLs not resolving to a view i.e. static files or 404s
+        if request.resolver_match is not None:
+            view = request.resolver_match.view_name
+            action = get_request_action(request)
+            label = " ".join(filter(None, [view, request.method, action]))
+            record_request_timings(label, wall_time, timings)
+            observe_request(view, request.method, action, wall_time, timings)
+
+            if wall_time > settings.SLOW_REQUEST_THRESHOLD:
+                form = get_plot_form(
+                    request.GET.get("f") or request.POST.get("f")
+                )
+                logger.warning(
+                    f"Slow request {label}: {wall_time:.3f}s, "
+                    f"{timings['sql_queries']} SQL queries in "
+                    f"{timings['sql_time']:.3f}s, pandas "
+                    f"{timings['pandas']:.3f}s, traces "
+                    f"{timings['traces']:.3f}s, filter: "
+                    f"{normalise_form(form) if form else None}"
+                )
+
+        return response
+
+
+class RequestProfilingMiddleware:
+    """Run the dashboard and plot views under cProfile when a staff user asks
+    for it with the ?profile=1 query parameter or the X-Profile: 1 header.
+    The profile and the SQL queries are stored in the database and can be
+    viewed in the admin.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = request.resolver_match.view_name
+
+        if view not in PROFILED_VIEWS or not is_profile_requested(request):
+            return None
+
+        label = " ".join(
+            filter(None, [view, request.method, get_request_action(request)])
+        )
+        response, request_profile = profile_view(
+            request, view_func, view_args, view_kwargs, label
+        )
+        response[PROFILE_ID_HEADER] = str(request_profile.id)
+        logger.info(
+            f"Request {label} profiled by {request.user.username}: "
+            f"{request_profile.wall_time:.3f}s, profile "
+            f"{request_profile.id}"
+        )
+        return response
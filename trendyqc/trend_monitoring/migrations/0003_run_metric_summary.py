@@ -0,0 +1,39 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0002_rna_seqc_rnaseq_metrics_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Run_metric_summary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assay', models.CharField(max_length=50)),
+                ('sequencer_id', models.CharField(max_length=20)),
+                ('metric', models.CharField(max_length=200)),
+                ('lane', models.CharField(blank=True, default='', max_length=20)),
+                ('n', models.IntegerField()),
+                ('nb_null', models.IntegerField()),
+                ('min', models.FloatField(null=True)),
+                ('q1', models.FloatField(null=True)),
+                ('median', models.FloatField(null=True)),
+                ('q3', models.FloatField(null=True)),
+                ('max', models.FloatField(null=True)),
+                ('mean', models.FloatField(null=True)),
+                ('stdev', models.FloatField(null=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='trend_monitoring.report')),
+            ],
+            options={
+                'db_table': 'run_metric_summary',
+                'indexes': [models.Index(fields=['metric', 'assay', 'sequencer_id'], name='run_metric_summary_lookup')],
+                'constraints': [models.UniqueConstraint(fields=('report', 'assay', 'metric', 'lane'), name='unique_run_metric_summary')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.2 on 2026-10-19 02:58
+
+import calendar
+import datetime
+import re
+
+from django.db import migrations, models
+
+
+def get_display_month(project_name, date):
+    """Get the month label of a report as computed by get_display_month of
+    backend_utils/plot.py: the first YYMMDD date of the project name if it
+    exists and there is only one valid one, the date of the run otherwise.
+    """
+
+    matches = re.findall(r"[0-9]{2}[0-1][0-9][0-3][0-9]", project_name)
+    valid_dates = []
+
+    for match in matches:
+        try:
+            datetime.datetime.strptime(match, "%y%m%d")
+        except ValueError:
+            valid_dates.append(False)
+        else:
+            valid_dates.append(True)
+
+    if (
+        matches
+        and valid_dates[0]
+        and (len(matches) == 1 or not all(valid_dates))
+    ):
+        return (
+            f"{calendar.month_abbr[int(matches[0][2:4])]}. "
+            f"20{matches[0][0:2]}"
+        )
+
+    return f"{calendar.month_abbr[date.month]}. {date.year}"
+
+
+def fill_display_month(apps, schema_editor):
+    Report = apps.get_model("trend_monitoring", "Report")
+    reports = list(Report.objects.filter(display_month__isnull=True))
+
+    for report in reports:
+        report.display_month = get_display_month(
+            report.project_name, report.date
+        )
+
+    Report.objects.bulk_update(reports, ["display_month"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0003_run_metric_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='display_month',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.RunPython(fill_display_month, migrations.RunPython.noop),
+    ]
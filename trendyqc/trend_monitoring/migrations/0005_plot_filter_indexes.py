@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-19 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0004_report_display_month'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['date'], name='report_date'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['sequencer_id'], name='report_sequencer_id'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['project_name'], name='report_project_name'),
+        ),
+        migrations.AddIndex(
+            model_name='report_sample',
+            index=models.Index(fields=['assay', 'report'], name='report_sample_assay_report'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.2 on 2026-10-19 03:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+LANE_READS = ["1st_lane_R1", "1st_lane_R2", "2nd_lane_R1", "2nd_lane_R2"]
+
+
+def link_lane_data(apps, schema_editor):
+    """Link the existing lane data to its report sample using the lane
+    foreign keys of the fastqc and picard tables"""
+
+    Report_Sample = apps.get_model("trend_monitoring", "Report_Sample")
+    lane_models = {
+        "fastqc__read_data": apps.get_model("trend_monitoring", "Read_data"),
+        "picard__base_distribution_by_cycle_metrics": apps.get_model(
+            "trend_monitoring", "Base_distribution_by_cycle_metrics"
+        ),
+    }
+
+    for relation, model in lane_models.items():
+        for lane_read in LANE_READS:
+            report_samples = Report_Sample.objects.filter(
+                **{f"{relation}_{lane_read}": OuterRef("pk")}
+            ).values("pk")[:1]
+            model.objects.filter(
+                report_sample__isnull=True,
+                **{f"{relation.split('__')[1]}_{lane_read}__isnull": False},
+            ).update(report_sample=Subquery(report_samples))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0005_plot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='base_distribution_by_cycle_metrics',
+            name='report_sample',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='trend_monitoring.report_sample'),
+        ),
+        migrations.AddField(
+            model_name='read_data',
+            name='report_sample',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='trend_monitoring.report_sample'),
+        ),
+        migrations.AddIndex(
+            model_name='base_distribution_by_cycle_metrics',
+            index=models.Index(fields=['report_sample', 'lane', 'sample_read'], name='base_distribution_lane_read'),
+        ),
+        migrations.AddIndex(
+            model_name='read_data',
+            index=models.Index(fields=['report_sample', 'lane', 'sample_read'], name='fastqc_data_lane_read'),
+        ),
+        migrations.RunPython(link_lane_data, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.2 on 2026-10-19 03:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+HAPPY_TABLES = {
+    ("snp", "ALL"): "happy_snp_all",
+    ("snp", "PASS"): "happy_snp_pass",
+    ("indel", "ALL"): "happy_indel_all",
+    ("indel", "PASS"): "happy_indel_pass",
+}
+HAPPY_FIELDS = [
+    "truth_total",
+    "truth_tp",
+    "truth_fn",
+    "query_total",
+    "query_fp",
+    "query_unk",
+    "fp_gt",
+    "metric_recall",
+    "metric_precision",
+    "metric_frac_na",
+    "metric_f1_score",
+    "truth_total_titv_ratio",
+    "query_total_titv_ratio",
+    "truth_total_het_hom_ratio",
+    "query_total_het_hom_ratio",
+]
+
+
+def copy_happy_data(apps, schema_editor):
+    """Copy the data of the four hap.py tables in the happy metrics table"""
+
+    Report_Sample = apps.get_model("trend_monitoring", "Report_Sample")
+    Happy_metrics = apps.get_model("trend_monitoring", "Happy_metrics")
+
+    for (variant_type, happy_filter), table in HAPPY_TABLES.items():
+        legacy_fields = {
+            field: f"happy__{table}__{field}_{variant_type}"
+            for field in HAPPY_FIELDS
+        }
+        rows = Report_Sample.objects.filter(
+            **{f"happy__{table}__isnull": False}
+        ).values("pk", *legacy_fields.values())
+
+        Happy_metrics.objects.bulk_create(
+            [
+                Happy_metrics(
+                    report_sample_id=row["pk"],
+                    variant_type=variant_type,
+                    filter=happy_filter,
+                    **{
+                        field: row[legacy_field]
+                        for field, legacy_field in legacy_fields.items()
+                    },
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0006_lane_read_report_sample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Happy_metrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variant_type', models.CharField(max_length=10)),
+                ('filter', models.CharField(max_length=10)),
+                ('truth_total', models.IntegerField()),
+                ('truth_tp', models.IntegerField()),
+                ('truth_fn', models.IntegerField()),
+                ('query_total', models.IntegerField()),
+                ('query_fp', models.IntegerField()),
+                ('query_unk', models.IntegerField()),
+                ('fp_gt', models.IntegerField()),
+                ('metric_recall', models.FloatField()),
+                ('metric_precision', models.FloatField()),
+                ('metric_frac_na', models.FloatField()),
+                ('metric_f1_score', models.FloatField()),
+                ('truth_total_titv_ratio', models.FloatField(null=True)),
+                ('query_total_titv_ratio', models.FloatField(null=True)),
+                ('truth_total_het_hom_ratio', models.FloatField()),
+                ('query_total_het_hom_ratio', models.FloatField()),
+                ('report_sample', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='happy_metrics', to='trend_monitoring.report_sample')),
+            ],
+            options={
+                'db_table': 'happy_metrics',
+                'constraints': [models.UniqueConstraint(fields=('report_sample', 'variant_type', 'filter'), name='unique_happy_metrics')],
+            },
+        ),
+        migrations.RunPython(copy_happy_data, migrations.RunPython.noop),
+    ]
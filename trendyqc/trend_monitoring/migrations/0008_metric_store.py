@@ -0,0 +1,41 @@
+# Generated by Django 5.1.2 on 2026-10-19 03:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0007_happy_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Metric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('field', models.CharField(max_length=100)),
+            ],
+            options={
+                'db_table': 'metric',
+                'constraints': [models.UniqueConstraint(fields=('model', 'field'), name='unique_metric')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Metric_value',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lane', models.CharField(blank=True, default='', max_length=20)),
+                ('sample_read', models.CharField(blank=True, default='', max_length=5)),
+                ('value', models.FloatField()),
+                ('metric', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='trend_monitoring.metric')),
+                ('report_sample', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='trend_monitoring.report_sample')),
+            ],
+            options={
+                'db_table': 'metric_value',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'report_sample', 'lane', 'sample_read'), name='unique_metric_value')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-19 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0008_metric_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Request_profile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('user', models.CharField(max_length=100)),
+                ('view', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.TextField()),
+                ('wall_time', models.FloatField()),
+                ('sql_queries', models.IntegerField()),
+                ('sql_time', models.FloatField()),
+                ('profile', models.BinaryField()),
+                ('stats', models.TextField()),
+                ('queries', models.TextField()),
+            ],
+            options={
+                'db_table': 'request_profile',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.2 on 2026-10-19 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0009_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Metric_baseline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assay', models.CharField(max_length=50)),
+                ('sequencer_id', models.CharField(max_length=20)),
+                ('metric', models.CharField(max_length=200)),
+                ('lane', models.CharField(blank=True, default='', max_length=20)),
+                ('nb_runs', models.IntegerField(default=0)),
+                ('run_mean', models.FloatField(default=0)),
+                ('run_m2', models.FloatField(default=0)),
+                ('nb_samples', models.IntegerField(default=0)),
+                ('sample_mean', models.FloatField(default=0)),
+                ('sample_m2', models.FloatField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'metric_baseline',
+                'constraints': [models.UniqueConstraint(fields=('metric', 'assay', 'sequencer_id', 'lane'), name='unique_metric_baseline')],
+            },
+        ),
+    ]
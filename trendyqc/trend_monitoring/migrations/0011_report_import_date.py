@@ -0,0 +1,25 @@
+# Generated by Django 5.1.2 on 2026-10-19 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trend_monitoring', '0010_metric_baseline'),
+    ]
+
+    # the field is added without auto_now_add first so that the reports
+    # already imported get no import date instead of the migration time
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='import_date',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='import_date',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+    ]
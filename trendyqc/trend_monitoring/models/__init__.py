@@ -30,9 +30,24 @@ from .vcf_qc import (
     Happy_snp_all,
     Happy_snp_pass,
     Happy_indel_all,
-    Happy_indel_pass
+    Happy_indel_pass,
+    Happy_metrics
 )
 
 from .filters import (
     Filter
-)
\ No newline at end of file
+)
+
+from .summary import (
+    Run_metric_summary,
+    Metric_baseline
+)
+
+from .metric_store import (
+    Metric,
+    Metric_value
+)
+
+from .profiling import (
+    Request_profile
+)
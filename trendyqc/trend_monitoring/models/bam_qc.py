@@ -250,6 +250,15 @@ class Alignment_summary_metrics(models.Model):
 
 
 class Base_distribution_by_cycle_metrics(models.Model):
+    # long format link used for plotting, the picard lane foreign keys can
+    # only store 2 lanes
+    report_sample = models.ForeignKey(
+        "Report_Sample",
+        on_delete=models.DO_NOTHING,
+        blank=True,
+        null=True,
+        db_index=False,
+    )
     lane = models.CharField(max_length=20)
     sample_read = models.CharField(max_length=20)
     sum_pct_a = models.FloatField()
@@ -266,6 +275,12 @@ class Base_distribution_by_cycle_metrics(models.Model):
     class Meta:
         app_label = "trend_monitoring"
         db_table = "base_distribution_by_cycle_metrics"
+        indexes = [
+            models.Index(
+                fields=["report_sample", "lane", "sample_read"],
+                name="base_distribution_lane_read",
+            ),
+        ]
 
 
 class GC_bias_metrics(models.Model):
@@ -29,6 +29,15 @@ class Fastqc(models.Model):
 
 
 class Read_data(models.Model):
+    # long format link used for plotting, the fastqc lane foreign keys can
+    # only store 2 lanes
+    report_sample = models.ForeignKey(
+        "Report_Sample",
+        on_delete=models.DO_NOTHING,
+        blank=True,
+        null=True,
+        db_index=False,
+    )
     sample_read = models.CharField(max_length=50, blank=True)
     lane = models.CharField(max_length=20, blank=True)
     file_type = models.CharField(max_length=50)
@@ -54,6 +63,12 @@ class Read_data(models.Model):
     class Meta:
         app_label = "trend_monitoring"
         db_table = "fastqc_data"
+        indexes = [
+            models.Index(
+                fields=["report_sample", "lane", "sample_read"],
+                name="fastqc_data_lane_read",
+            ),
+        ]
 
 
 class Bcl2fastq_data(models.Model):
@@ -9,10 +9,21 @@ class Report(models.Model):
     sequencer_id = models.CharField(max_length=20)
     date = models.DateField()
     job_date = models.DateTimeField()
+    # month label displayed in the plots i.e. "May. 2024"
+    display_month = models.CharField(max_length=20, blank=True, null=True)
+    # time the report was imported in TrendyQC, null for the reports imported
+    # before the field was added
+    import_date = models.DateTimeField(auto_now_add=True, null=True)
 
     class Meta:
         app_label = "trend_monitoring"
         db_table = "report"
+        # columns used by the subset filters of the plotting form
+        indexes = [
+            models.Index(fields=["date"], name="report_date"),
+            models.Index(fields=["sequencer_id"], name="report_sequencer_id"),
+            models.Index(fields=["project_name"], name="report_project_name"),
+        ]
 
 
 class Patient(models.Model):
@@ -79,3 +90,10 @@ class Report_Sample(models.Model):
     class Meta:
         app_label = "trend_monitoring"
         db_table = "report_sample"
+        # assay is the most used subset filter and the report id allows
+        # joining the report filters without reading the table
+        indexes = [
+            models.Index(
+                fields=["assay", "report"], name="report_sample_assay_report"
+            ),
+        ]
@@ -0,0 +1,44 @@
+from django.db import models
+
+
+class Metric(models.Model):
+    # model and field names in the same format as the plotting form i.e.
+    # hs_metrics and fold_enrichment
+    model = models.CharField(max_length=100)
+    field = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = "trend_monitoring"
+        db_table = "metric"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "field"], name="unique_metric"
+            )
+        ]
+
+
+class Metric_value(models.Model):
+    # long format copy of the numerical metrics of every tool i.e. one row per
+    # report sample, metric, lane and read
+    report_sample = models.ForeignKey(
+        "Report_Sample", on_delete=models.CASCADE, db_index=False
+    )
+    metric = models.ForeignKey(
+        "Metric", on_delete=models.CASCADE, db_index=False
+    )
+    # empty strings for the data not separated by lane and read
+    lane = models.CharField(max_length=20, blank=True, default="")
+    sample_read = models.CharField(max_length=5, blank=True, default="")
+    value = models.FloatField()
+
+    class Meta:
+        app_label = "trend_monitoring"
+        db_table = "metric_value"
+        # the constraint index is used to get the values of a metric for a
+        # set of report samples
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "report_sample", "lane", "sample_read"],
+                name="unique_metric_value",
+            )
+        ]
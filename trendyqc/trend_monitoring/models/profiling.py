@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class Request_profile(models.Model):
+    created = models.DateTimeField(auto_now_add=True)
+    user = models.CharField(max_length=100)
+    # view name and form action, same label as the request timings
+    view = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    path = models.TextField()
+    wall_time = models.FloatField()
+    sql_queries = models.IntegerField()
+    sql_time = models.FloatField()
+    # pstats data of the cProfile run, loadable with pstats or snakeviz
+    profile = models.BinaryField()
+    # functions with the highest cumulative time, as printed by pstats
+    stats = models.TextField()
+    # JSON list of the slowest SQL queries with their time in seconds
+    queries = models.TextField()
+
+    class Meta:
+        app_label = "trend_monitoring"
+        db_table = "request_profile"
+        ordering = ["-created"]
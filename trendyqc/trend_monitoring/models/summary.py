@@ -0,0 +1,67 @@
+from django.db import models
+
+
+class Run_metric_summary(models.Model):
+    report = models.ForeignKey("Report", on_delete=models.CASCADE)
+    assay = models.CharField(max_length=50)
+    sequencer_id = models.CharField(max_length=20)
+    # metric stored in the same format as the plotting form i.e.
+    # hs_metrics|fold_enrichment
+    metric = models.CharField(max_length=200)
+    # empty string for the data combined across lanes, lane name otherwise
+    lane = models.CharField(max_length=20, blank=True, default="")
+    n = models.IntegerField()
+    nb_null = models.IntegerField()
+    min = models.FloatField(null=True)
+    q1 = models.FloatField(null=True)
+    median = models.FloatField(null=True)
+    q3 = models.FloatField(null=True)
+    max = models.FloatField(null=True)
+    mean = models.FloatField(null=True)
+    stdev = models.FloatField(null=True)
+
+    class Meta:
+        app_label = "trend_monitoring"
+        db_table = "run_metric_summary"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report", "assay", "metric", "lane"],
+                name="unique_run_metric_summary",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["metric", "assay", "sequencer_id"],
+                name="run_metric_summary_lookup",
+            )
+        ]
+
+
+class Metric_baseline(models.Model):
+    # historical distribution of a metric for an assay and sequencer, updated
+    # incrementally with the run summaries (see backend_utils/spc.py). The
+    # moments cover every run i.e. they don't follow SPC_BASELINE_RUNS nor
+    # SPC_BASELINE_METHOD, they are only used by the post-import QC check
+    assay = models.CharField(max_length=50)
+    sequencer_id = models.CharField(max_length=20)
+    metric = models.CharField(max_length=200)
+    lane = models.CharField(max_length=20, blank=True, default="")
+    # number, mean and sum of squared differences to the mean of the run means
+    nb_runs = models.IntegerField(default=0)
+    run_mean = models.FloatField(default=0)
+    run_m2 = models.FloatField(default=0)
+    # same statistics for the values of every sample of the runs
+    nb_samples = models.IntegerField(default=0)
+    sample_mean = models.FloatField(default=0)
+    sample_m2 = models.FloatField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "trend_monitoring"
+        db_table = "metric_baseline"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["metric", "assay", "sequencer_id", "lane"],
+                name="unique_metric_baseline",
+            )
+        ]
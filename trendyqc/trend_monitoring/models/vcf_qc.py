@@ -216,3 +216,43 @@ class Happy_indel_pass(models.Model):
     class Meta:
         app_label = "trend_monitoring"
         db_table = "happy_indel_pass"
+
+
+class Happy_metrics(models.Model):
+    # long format storage of the hap.py data i.e. one row per variant type
+    # (snp or indel) and filter (ALL or PASS) for every report sample
+    report_sample = models.ForeignKey(
+        "Report_Sample",
+        on_delete=models.CASCADE,
+        related_name="happy_metrics",
+        db_index=False,
+    )
+    variant_type = models.CharField(max_length=10)
+    filter = models.CharField(max_length=10)
+    truth_total = models.IntegerField()
+    truth_tp = models.IntegerField()
+    truth_fn = models.IntegerField()
+    query_total = models.IntegerField()
+    query_fp = models.IntegerField()
+    query_unk = models.IntegerField()
+    fp_gt = models.IntegerField()
+    metric_recall = models.FloatField()
+    metric_precision = models.FloatField()
+    metric_frac_na = models.FloatField()
+    metric_f1_score = models.FloatField()
+    truth_total_titv_ratio = models.FloatField(null=True)
+    query_total_titv_ratio = models.FloatField(null=True)
+    truth_total_het_hom_ratio = models.FloatField()
+    query_total_het_hom_ratio = models.FloatField()
+
+    class Meta:
+        app_label = "trend_monitoring"
+        db_table = "happy_metrics"
+        # the constraint index is used to join the metrics of one variant
+        # type and filter to the report sample
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report_sample", "variant_type", "filter"],
+                name="unique_happy_metrics",
+            )
+        ]
@@ -1,6 +1,20 @@
 from .custom_tests import CustomTests
+from .test_benchmark import *
+from .test_cache import *
+from .test_export import *
+from .test_facets import *
+from .test_generate_synthetic_qc import *
 from .test_integration import *
+from .test_links import *
+from .test_load_test import *
+from .test_metric_store import *
 from .test_multiqc import *
 from .test_plotting import *
+from .test_profiling import *
+from .test_samples import *
+from .test_spc import *
+from .test_summary import *
+from .test_timing import *
 from .test_tool import *
 from .test_views import *
+from .test_warm_plot_cache import *
@@ -0,0 +1,162 @@
+import datetime
+from io import StringIO
+import unittest
+
+from django.core.management import call_command
+from django.db import connection
+
+from trend_monitoring.backend_utils.plot import get_display_month
+from trend_monitoring.models.bam_qc import VerifyBAMid_data
+from trend_monitoring.models.fastq_qc import Fastqc, Read_data
+from trend_monitoring.models.metadata import Report, Report_Sample, Sample
+
+# default options of the synthetic QC data generated for the tests
+SYNTHETIC_QC_OPTIONS = {
+    "runs": 3,
+    "samples_per_run": 4,
+    "assays": ["Cancer Endocrine Neurology"],
+    "seed": 1,
+}
+
+
+@unittest.skipUnless(
+    connection.vendor == "postgresql",
+    "The synthetic QC generator needs a PostgreSQL database",
+)
+class SyntheticQCMixin:
+    """ Mixin for the tests needing realistic data of every tool, generated by
+    the generate_synthetic_qc command. The tests are skipped on databases
+    other than PostgreSQL.
+    """
+
+    @staticmethod
+    def generate_synthetic_qc(**options):
+        """ Generate synthetic QC data
+
+        Args:
+            options: Options of the command overriding SYNTHETIC_QC_OPTIONS
+        """
+
+        call_command(
+            "generate_synthetic_qc",
+            **{**SYNTHETIC_QC_OPTIONS, **options},
+            stdout=StringIO(),
+        )
+
+
+def create_read_data(lane, read, total_sequences):
+    """ Create a FastQC read data object
+
+    Args:
+        lane (str): Lane name
+        read (str): Read name
+        total_sequences (float): Total sequences value
+
+    Returns:
+        Read_data: Read data object
+    """
+
+    return Read_data.objects.create(
+        sample_read=read,
+        lane=lane,
+        file_type="Conventional base calls",
+        encoding="Sanger / Illumina 1.9",
+        total_sequences=total_sequences,
+        sequences_flagged_as_poor_quality=0.0,
+        sequence_length="35-151",
+        gc_pct=50.0,
+        total_deduplicated_pct=80.0,
+        avg_sequence_length=150.0,
+        basic_statistics="pass",
+        per_base_sequence_quality="pass",
+        per_sequence_quality_scores="pass",
+        per_base_sequence_content="pass",
+        per_sequence_gc_content="pass",
+        per_base_n_content="pass",
+        sequence_length_distribution="pass",
+        sequence_duplication_levels="pass",
+        overrepresented_sequences="pass",
+        adapter_content="pass",
+    )
+
+
+def create_run(
+    run_nb,
+    freemix_values,
+    sequencer_id="A01295",
+    assay="Cancer Endocrine Neurology",
+    total_sequences=None,
+):
+    """ Create a run with a sample per freemix value. The samples have
+    VerifyBAMid data and optionally FastQC data for 2 lanes
+
+    Args:
+        run_nb (int): Number of the run, the run is done run_nb days after
+        the 1st of January 2024
+        freemix_values (list): Freemix of every sample, None for samples
+        without VerifyBAMid data
+        sequencer_id (str, optional): Sequencer of the run
+        assay (str, optional): Assay of the samples
+        total_sequences (float, optional): Total sequences of the reads of
+        the 1st lane of the samples, the 2nd lane has twice as many sequences
+
+    Returns:
+        Report: Report object of the run
+    """
+
+    date = datetime.date(2024, 1, 1) + datetime.timedelta(days=run_nb)
+    project_name = f"002_{date:%y%m%d}_{sequencer_id}_{run_nb:04d}_CEN"
+    report = Report.objects.create(
+        name=f"Report{run_nb}",
+        project_id=f"Project{run_nb}",
+        project_name=project_name,
+        dnanexus_file_id=f"File{run_nb}",
+        sequencer_id=sequencer_id,
+        date=date,
+        job_date=datetime.datetime.combine(
+            date, datetime.time(), tzinfo=datetime.timezone.utc
+        ),
+        display_month=get_display_month(project_name, date),
+    )
+
+    for i, freemix in enumerate(freemix_values):
+        verifybamid_data = None
+        fastqc = None
+        read_data = []
+
+        if freemix is not None:
+            verifybamid_data = VerifyBAMid_data.objects.create(
+                rg=f"Sample{i}",
+                nb_snps=1000,
+                nb_reads=10000,
+                avg_dp=30.0 + i,
+                freemix=freemix,
+                freelk1=1.0,
+                freelk0=1.0,
+            )
+
+        if total_sequences is not None:
+            read_data = [
+                create_read_data(lane, read, lane_nb * total_sequences)
+                for lane_nb, lane in enumerate(["L001", "L002"], 1)
+                for read in ["R1", "R2"]
+            ]
+            fastqc = Fastqc.objects.create(
+                read_data_1st_lane_R1=read_data[0],
+                read_data_1st_lane_R2=read_data[1],
+                read_data_2nd_lane_R1=read_data[2],
+                read_data_2nd_lane_R2=read_data[3],
+            )
+
+        report_sample = Report_Sample.objects.create(
+            assay=assay,
+            report=report,
+            sample=Sample.objects.create(sample_id=f"{run_nb}-Sample{i}"),
+            verifybamid_data=verifybamid_data,
+            fastqc=fastqc,
+        )
+        Read_data.objects.filter(
+            pk__in=[instance.pk for instance in read_data]
+        ).update(report_sample=report_sample)
+
+    return report
@@ -0,0 +1,73 @@
+from io import StringIO
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from trend_monitoring.management.commands.benchmark_plot_pipeline import (
+    STAGES,
+    get_benchmark_filters,
+)
+from .fixtures import create_run
+
+
+class TestBenchmarkPlotPipeline(TestCase):
+    def setUp(self):
+        for run_nb in range(4):
+            create_run(run_nb, [0.01, 0.02, 0.03], total_sequences=1000.0)
+
+    def test_get_benchmark_filters(self):
+        """Test that the filters use the assay of the database"""
+
+        filters = get_benchmark_filters()
+
+        self.assertEqual(
+            sorted(filters),
+            [
+                "all_assays_2_years",
+                "fastqc_lanes",
+                "happy",
+                "multi_metric",
+                "single_assay_6_months",
+            ],
+        )
+        self.assertEqual(
+            filters["happy"]["assay_select"], ["Cancer Endocrine Neurology"]
+        )
+
+    def test_benchmark_plot_pipeline(self):
+        """Test that the JSON output has the latency percentiles, the number
+        of queries and the sizes of every filter
+        """
+
+        stdout = StringIO()
+        call_command(
+            "benchmark_plot_pipeline",
+            repeat=2,
+            filters=["fastqc_lanes", "multi_metric"],
+            stdout=stdout,
+        )
+        # the success message follows the JSON output
+        output = stdout.getvalue().rsplit("\n", 2)[0]
+        results = json.loads(output)
+
+        # the runs of the fixture have no Picard data
+        expected_errors = {
+            "fastqc_lanes": [],
+            "multi_metric": [
+                "No data for hs_metrics|fold_enrichment",
+                "No data for insert_size_metrics|median_insert_size",
+            ],
+        }
+
+        self.assertEqual(sorted(results["filters"]), sorted(expected_errors))
+
+        for name, result in results["filters"].items():
+            with self.subTest(name):
+                self.assertEqual(sorted(result["latency"]), sorted(STAGES))
+                self.assertEqual(result["errors"], expected_errors[name])
+                self.assertEqual(
+                    result["sql_queries"], len(result["form"]["metrics_y"])
+                )
+                self.assertGreater(result["dataframe_bytes"], 0)
+                self.assertGreater(result["payload_bytes"], 0)
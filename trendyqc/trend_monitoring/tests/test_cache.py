@@ -0,0 +1,127 @@
+import datetime
+from unittest.mock import patch
+
+from dateutil.relativedelta import relativedelta
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from trend_monitoring.backend_utils.cache import (
+    bump_generation,
+    get_cache_key,
+    get_form_hash,
+    normalise_form,
+)
+from trend_monitoring.backend_utils.payload import get_plot_payload
+
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "plot": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test_cache",
+    },
+}
+
+
+class TestNormaliseForm(TestCase):
+    def test_normalise_form_days_back(self):
+        """Test that the days back option is resolved to concrete dates"""
+
+        today = datetime.date.today()
+        test_output = normalise_form(
+            {"metrics_y": "model|field", "days_back": "30"}
+        )
+        expected_output = {
+            "metrics_y": ["model|field"],
+            "date_start": [str(today + relativedelta(days=-30))],
+            "date_end": [str(today)],
+        }
+        self.assertEqual(test_output, expected_output)
+
+    def test_normalise_form_lone_date(self):
+        """Test that a lone date, which is not used for filtering, is
+        dropped
+        """
+
+        test_output = normalise_form(
+            {"metrics_y": ["model|field"], "date_start": "2024-01-01"}
+        )
+        self.assertEqual(test_output, {"metrics_y": ["model|field"]})
+
+    def test_get_form_hash_order_insensitive(self):
+        """Test that the order of the subset values doesn't change the hash"""
+
+        form1 = {
+            "assay_select": ["Myeloid", "Twist WES"],
+            "metrics_y": ["model|field"],
+        }
+        form2 = {
+            "metrics_y": ["model|field"],
+            "assay_select": ["Twist WES", "Myeloid"],
+        }
+        self.assertEqual(get_form_hash(form1), get_form_hash(form2))
+
+    def test_get_form_hash_unknown_parameters(self):
+        """Test that the parameters which are not fields of the filter form
+        don't change the hash
+        """
+
+        form = {"metrics_y": ["model|field"], "days_back": ["30"]}
+        self.assertEqual(
+            get_form_hash(form),
+            get_form_hash({**form, "_": ["123"], "profile": ["1"]}),
+        )
+
+    def test_get_form_hash_different_metrics(self):
+        """Test that different metrics give different hashes"""
+
+        self.assertNotEqual(
+            get_form_hash({"metrics_y": ["model|field1"]}),
+            get_form_hash({"metrics_y": ["model|field2"]}),
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestPlotCache(TestCase):
+    def setUp(self):
+        caches["plot"].clear()
+        self.form = {"assay_select": ["Myeloid"], "metrics_y": ["model|field"]}
+
+    def test_bump_generation_changes_key(self):
+        """Test that bumping the generation invalidates the cache keys"""
+
+        key_before = get_cache_key(self.form)
+        bump_generation()
+        self.assertNotEqual(key_before, get_cache_key(self.form))
+
+    @patch("trend_monitoring.backend_utils.payload.build_plot_payload")
+    def test_get_plot_payload_cached(self, mock_build):
+        """Test that the payload is only built once until the generation is
+        bumped
+        """
+
+        mock_build.return_value = {"status": "ok", "plot": "[]"}
+
+        get_plot_payload(self.form)
+        get_plot_payload(self.form)
+
+        with self.subTest("Cache hit"):
+            self.assertEqual(mock_build.call_count, 1)
+
+        bump_generation()
+        get_plot_payload(self.form)
+
+        with self.subTest("Cache invalidated"):
+            self.assertEqual(mock_build.call_count, 2)
+
+    @patch("trend_monitoring.backend_utils.payload.build_plot_payload")
+    def test_get_plot_payload_error_not_cached(self, mock_build):
+        """Test that errors are not stored in the cache"""
+
+        mock_build.return_value = {"status": "error", "plot": None}
+
+        get_plot_payload(self.form)
+        get_plot_payload(self.form)
+
+        self.assertEqual(mock_build.call_count, 2)
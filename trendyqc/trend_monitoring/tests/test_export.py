@@ -0,0 +1,187 @@
+import csv
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from trend_monitoring.backend_utils.export import (
+    StreamBuffer,
+    stream_csv,
+    stream_parquet,
+)
+from trend_monitoring.models.metadata import Report_Sample
+from .fixtures import create_run
+
+
+class TestExport(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for run_nb in range(3):
+            create_run(
+                run_nb, [0.01, 0.02, 0.03, 0.04], total_sequences=1000.0
+            )
+
+        cls.metrics = [
+            "verifybamid_data|freemix",
+            "read_data|total_sequences",
+        ]
+
+    def read_csv(self, parts):
+        """ Parse the parts of a CSV export
+
+        Args:
+            parts (Iterator): Parts of the export
+
+        Returns:
+            list: List of rows as dicts
+        """
+
+        return list(csv.DictReader(io.StringIO("".join(parts))))
+
+    def test_stream_csv(self):
+        """ Test that every sample is exported with the value of the metrics,
+        the values of the lanes being averaged
+        """
+
+        test_output = self.read_csv(
+            stream_csv(Report_Sample.objects.all(), self.metrics)
+        )
+        report_sample = Report_Sample.objects.order_by("id").first()
+        row = next(
+            row
+            for row in test_output
+            if row["sample_id"] == report_sample.sample.sample_id
+        )
+
+        with self.subTest("Number of rows"):
+            self.assertEqual(len(test_output), Report_Sample.objects.count())
+
+        with self.subTest("Columns"):
+            self.assertEqual(
+                list(row),
+                [
+                    "sample_id",
+                    "date",
+                    "project_name",
+                    "assay",
+                    "sequencer_id",
+                    *self.metrics,
+                ],
+            )
+
+        with self.subTest("Values"):
+            self.assertAlmostEqual(
+                float(row["verifybamid_data|freemix"]),
+                report_sample.verifybamid_data.freemix,
+            )
+            self.assertAlmostEqual(
+                float(row["read_data|total_sequences"]), 1500.0
+            )
+
+        with self.subTest("Ordered by date"):
+            dates = [row["date"] for row in test_output]
+            self.assertEqual(dates, sorted(dates))
+
+    def test_stream_csv_chunks(self):
+        """ Test that the export is streamed in chunks without changing its
+        content
+        """
+
+        parts = list(
+            stream_csv(Report_Sample.objects.all(), self.metrics, chunk_size=5)
+        )
+
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(
+            self.read_csv(parts),
+            self.read_csv(
+                stream_csv(Report_Sample.objects.all(), self.metrics)
+            ),
+        )
+
+    def test_stream_csv_no_samples(self):
+        """ Test that an empty subset exports the header only """
+
+        test_output = "".join(
+            stream_csv(Report_Sample.objects.none(), self.metrics)
+        )
+
+        self.assertEqual(
+            test_output,
+            "sample_id,date,project_name,assay,sequencer_id,"
+            "verifybamid_data|freemix,read_data|total_sequences\r\n",
+        )
+
+    def test_stream_buffer(self):
+        """ Test that the position of the buffer includes the popped bytes """
+
+        buffer = StreamBuffer()
+        buffer.write(b"abc")
+
+        self.assertEqual(buffer.pop(), b"abc")
+
+        buffer.write(b"de")
+
+        self.assertEqual(buffer.tell(), 5)
+        self.assertEqual(buffer.pop(), b"de")
+
+    @unittest.skipUnless(
+        importlib.util.find_spec("pyarrow"), "pyarrow is not installed"
+    )
+    def test_stream_parquet(self):
+        """ Test that the Parquet export has one row group per chunk """
+
+        import pyarrow.parquet as pq
+
+        parts = stream_parquet(
+            Report_Sample.objects.all(), self.metrics, chunk_size=5
+        )
+        parquet_file = pq.ParquetFile(io.BytesIO(b"".join(parts)))
+
+        self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+        self.assertEqual(
+            parquet_file.metadata.num_rows, Report_Sample.objects.count()
+        )
+
+    def test_export_qc_data(self):
+        """ Test that the command writes the CSV export of the subset """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "export.csv")
+            call_command(
+                "export_qc_data",
+                metrics=self.metrics,
+                assays=["Cancer Endocrine Neurology"],
+                days_back=3650,
+                output=output,
+                stdout=io.StringIO(),
+            )
+
+            with open(output, newline="") as f:
+                test_output = list(csv.DictReader(f))
+
+        self.assertEqual(len(test_output), Report_Sample.objects.count())
+
+    def test_export_qc_data_invalid_options(self):
+        """ Test that a missing subset or an unknown metric raise an error """
+
+        for options in [
+            {"metrics": self.metrics},
+            {
+                "metrics": ["verifybamid_data|rg"],
+                "assays": ["Cancer Endocrine Neurology"],
+            },
+        ]:
+            with self.subTest(options):
+                with self.assertRaises(CommandError):
+                    call_command(
+                        "export_qc_data",
+                        output=os.devnull,
+                        stdout=io.StringIO(),
+                        **options,
+                    )
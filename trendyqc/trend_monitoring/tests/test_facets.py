@@ -0,0 +1,101 @@
+import datetime
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from trend_monitoring.backend_utils.cache import bump_generation
+from trend_monitoring.backend_utils.facets import (
+    get_dashboard_facets,
+    get_plotable_metrics,
+)
+from trend_monitoring.models.metadata import Report, Report_Sample, Sample
+from .test_cache import TEST_CACHES
+
+
+def create_report_sample(project_name, sequencer_id, assay, sample_id):
+    """Create a report sample and its report
+
+    Args:
+        project_name (str): Project name of the report
+        sequencer_id (str): Sequencer id of the report
+        assay (str): Assay of the sample
+        sample_id (str): Sample id
+
+    Returns:
+        Report_Sample: Report sample object
+    """
+
+    report, _ = Report.objects.get_or_create(
+        name=f"{project_name}_report",
+        project_id=project_name,
+        project_name=project_name,
+        dnanexus_file_id="File1",
+        sequencer_id=sequencer_id,
+        date=datetime.date(2024, 1, 1),
+        job_date=datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+
+    return Report_Sample.objects.create(
+        assay=assay,
+        report=report,
+        sample=Sample.objects.create(sample_id=sample_id),
+    )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestGetDashboardFacets(TestCase):
+    def setUp(self):
+        caches["plot"].clear()
+        create_report_sample("Project2", "Sequencer2", "Myeloid", "Sample1")
+        create_report_sample("Project2", "Sequencer2", "Myeloid", "Sample2")
+        create_report_sample("Project1", "Sequencer1", "Twist WES", "Sample3")
+
+    def test_get_dashboard_facets(self):
+        """Test that the facets are distinct and sorted"""
+
+        expected_output = {
+            "assays": ["Myeloid", "Twist WES"],
+            "sequencer_ids": ["Sequencer1", "Sequencer2"],
+            "project_names": ["Project1", "Project2"],
+        }
+        self.assertEqual(get_dashboard_facets(), expected_output)
+
+    def test_get_dashboard_facets_cached(self):
+        """Test that the facets are cached until the generation is bumped"""
+
+        get_dashboard_facets()
+
+        with self.assertNumQueries(0):
+            get_dashboard_facets()
+
+        create_report_sample("Project3", "Sequencer1", "PanCancer", "Sample4")
+
+        with self.subTest("Cached facets"):
+            self.assertNotIn(
+                "Project3", get_dashboard_facets()["project_names"]
+            )
+
+        bump_generation()
+
+        with self.subTest("Invalidated facets"):
+            self.assertIn(
+                "Project3", get_dashboard_facets()["project_names"]
+            )
+
+
+class TestGetPlotableMetrics(TestCase):
+    def test_get_plotable_metrics(self):
+        """Test that the numerical fields are gathered by display name"""
+
+        plotable_metrics = get_plotable_metrics()
+
+        with self.subTest("Numerical field"):
+            self.assertIn("freemix", plotable_metrics["Verify BAMid"])
+
+        with self.subTest("Non numerical field"):
+            self.assertNotIn("rg", plotable_metrics["Verify BAMid"])
+
+        with self.subTest("Sorted display names"):
+            self.assertEqual(
+                list(plotable_metrics), sorted(plotable_metrics)
+            )
@@ -0,0 +1,55 @@
+from django.test import TestCase
+
+from trend_monitoring.backend_utils.plot import get_data_for_plotting
+from trend_monitoring.models.bam_qc import Picard
+from trend_monitoring.models.fastq_qc import Read_data
+from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.vcf_qc import Happy, Happy_metrics
+from .fixtures import SyntheticQCMixin
+
+
+class TestGenerateSyntheticQC(SyntheticQCMixin, TestCase):
+    def setUp(self):
+        self.generate_synthetic_qc(chunk_size=2)
+        self.report_samples = Report_Sample.objects.all()
+
+    def test_generate_synthetic_qc_counts(self):
+        """Test that every sample has the data of the tools of the assay and
+        that the hap.py data is only added for one sample per run
+        """
+
+        nb_samples = self.report_samples.count()
+
+        with self.subTest("Runs"):
+            self.assertEqual(Report.objects.count(), 3)
+
+        with self.subTest("Tools"):
+            self.assertFalse(
+                self.report_samples.filter(verifybamid_data=None).exists()
+            )
+            self.assertFalse(self.report_samples.filter(fastqc=None).exists())
+
+        with self.subTest("Lanes"):
+            self.assertEqual(Read_data.objects.count(), nb_samples * 4)
+
+        with self.subTest("Picard"):
+            self.assertEqual(
+                Picard.objects.exclude(hs_metrics=None).count(), nb_samples
+            )
+
+        with self.subTest("Happy"):
+            self.assertEqual(Happy.objects.count(), 3)
+            self.assertEqual(Happy_metrics.objects.count(), 3 * 4)
+
+    def test_generate_synthetic_qc_plotting(self):
+        """Test that the synthetic data can be plotted"""
+
+        data = get_data_for_plotting(
+            self.report_samples,
+            ["hs_metrics|fold_enrichment", "read_data|total_sequences"],
+        )[0]
+
+        for df in data:
+            with self.subTest(columns=list(df.columns)):
+                self.assertEqual(len(df), self.report_samples.count())
+                self.assertFalse(df.iloc[:, -1].isna().any())
@@ -0,0 +1,66 @@
+from django.test import TestCase, override_settings
+
+from trend_monitoring.backend_utils.links import (
+    get_plot_form,
+    get_plot_token,
+    get_plot_url,
+)
+
+
+class TestPlotLinks(TestCase):
+    def test_get_plot_token(self):
+        """Test that equivalent forms give the same token and that the days
+        back option stays relative
+        """
+
+        test_output = get_plot_token(
+            {
+                "metrics_y": "read_data|avg_length",
+                "assay_select": ["CEN", "Myeloid", "CEN"],
+                "days_back": 365,
+                "project_select": [],
+            }
+        )
+        expected_output = get_plot_token(
+            {
+                "assay_select": ["Myeloid", "CEN"],
+                "days_back": ["365"],
+                "metrics_y": ["read_data|avg_length"],
+            }
+        )
+
+        self.assertEqual(test_output, expected_output)
+        self.assertEqual(
+            get_plot_form(test_output),
+            {
+                "assay_select": ["CEN", "Myeloid"],
+                "days_back": ["365"],
+                "metrics_y": ["read_data|avg_length"],
+            },
+        )
+
+    def test_get_plot_form_invalid_token(self):
+        """Test that missing and tampered tokens return None"""
+
+        token = get_plot_token({"assay_select": ["CEN"]})
+
+        for test_token in [None, "", f"{token}x", token.replace(":", "x")]:
+            with self.subTest(test_token):
+                self.assertIsNone(get_plot_form(test_token))
+
+    def test_get_plot_form_other_secret_key(self):
+        """Test that the tokens are invalidated by a new secret key"""
+
+        token = get_plot_token({"assay_select": ["CEN"]})
+
+        with override_settings(SECRET_KEY="new_secret_key"):
+            self.assertIsNone(get_plot_form(token))
+
+    def test_get_plot_url(self):
+        """Test that the plot URL contains the token"""
+
+        form = {"assay_select": ["CEN"], "metrics_y": ["read_data|gc"]}
+
+        self.assertEqual(
+            get_plot_url(form), f"/trendyqc/plot/?f={get_plot_token(form)}"
+        )
@@ -0,0 +1,46 @@
+from io import StringIO
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase
+
+from trend_monitoring.management.commands.load_test import FLOW_STEPS
+from trend_monitoring.models.filters import Filter
+from .fixtures import create_run
+
+
+class TestLoadTest(LiveServerTestCase):
+    def setUp(self):
+        for run_nb in range(2):
+            create_run(run_nb, [0.01, 0.02, 0.03])
+
+    def test_load_test(self):
+        """Test that every step of the flow succeeds against a live server
+        and that the filters saved are deleted
+        """
+
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command(
+                "load_test",
+                url=f"{self.live_server_url}/trendyqc/",
+                users=2,
+                iterations=2,
+                metric="verifybamid_data|freemix",
+                days_back=3650,
+                output=output.name,
+                stdout=StringIO(),
+            )
+            results = json.load(output)
+
+        with self.subTest("Requests"):
+            self.assertEqual(results["requests"], 2 * 2 * len(FLOW_STEPS))
+            self.assertEqual(results["errors"], 0)
+
+        with self.subTest("Steps"):
+            self.assertEqual(
+                list(results["steps"]), [step[0] for step in FLOW_STEPS]
+            )
+
+        with self.subTest("Cleanup"):
+            self.assertFalse(Filter.objects.exists())
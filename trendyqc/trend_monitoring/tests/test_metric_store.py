@@ -0,0 +1,128 @@
+import datetime
+
+from django.test import TestCase, override_settings
+import pandas as pd
+
+from trend_monitoring.backend_utils.metric_store import update_metric_values
+from trend_monitoring.backend_utils.plot import (
+    get_data_for_plotting,
+    get_subset_queryset,
+)
+from trend_monitoring.models.metadata import Report
+from trend_monitoring.models.metric_store import Metric, Metric_value
+from .test_plotting import create_lane_report_sample
+from .test_summary import create_verifybamid_sample
+
+
+class TestUpdateMetricValues(TestCase):
+    def setUp(self):
+        self.report = Report.objects.create(
+            name="Report1",
+            project_id="Project1",
+            project_name="002_240101_A01295_0001_CEN",
+            dnanexus_file_id="File1",
+            sequencer_id="A01295",
+            date=datetime.date(2024, 1, 1),
+            job_date=datetime.datetime(
+                2024, 1, 1, tzinfo=datetime.timezone.utc
+            ),
+            display_month="Jan. 2024",
+        )
+        self.samples = [
+            create_verifybamid_sample(self.report, "Sample1", 0.01),
+            create_verifybamid_sample(self.report, "Sample2", None),
+        ]
+
+    def test_update_metric_values(self):
+        """Test that the numerical metrics are stored once per sample and
+        that missing values are not stored
+        """
+
+        update_metric_values(self.report)
+
+        values = Metric_value.objects.filter(
+            metric__model="verifybamid_data", metric__field="freemix"
+        )
+
+        with self.subTest("Metric dictionary"):
+            self.assertTrue(
+                Metric.objects.filter(
+                    model="hs_metrics", field="fold_enrichment"
+                ).exists()
+            )
+
+        with self.subTest("Values"):
+            self.assertEqual(
+                list(values.values_list("report_sample", "lane", "value")),
+                [(self.samples[0].id, "", 0.01)]
+            )
+
+    def test_update_metric_values_twice(self):
+        """Test that the values of a report are replaced"""
+
+        update_metric_values(self.report)
+        nb_values = Metric_value.objects.count()
+        update_metric_values(self.report)
+
+        self.assertEqual(Metric_value.objects.count(), nb_values)
+
+
+class TestGetDataForPlottingMetricValue(TestCase):
+    def setUp(self):
+        report_sample = create_lane_report_sample()
+        create_verifybamid_sample(report_sample.report, "Sample2", 0.02)
+        create_verifybamid_sample(report_sample.report, "Sample3", None)
+        update_metric_values(report_sample.report)
+
+    def get_data(self, metric):
+        """Get the plotting data of the metric using both backends
+
+        Args:
+            metric (str): Metric in the form format i.e. model|field
+
+        Returns:
+            tuple: Outputs of get_data_for_plotting for the models and metric
+            value backends
+        """
+
+        queryset = get_subset_queryset(
+            {"assay_select": ["Cancer Endocrine Neurology"]}
+        )
+
+        with override_settings(PLOTTING_BACKEND="models"):
+            models_output = get_data_for_plotting(queryset, [metric])
+
+        with override_settings(PLOTTING_BACKEND="metric_value"):
+            metric_value_output = get_data_for_plotting(queryset, [metric])
+
+        return models_output, metric_value_output
+
+    def test_get_data_for_plotting_metric_value(self):
+        """Test that both backends return the same data and missing
+        samples
+        """
+
+        models_output, metric_value_output = self.get_data(
+            "verifybamid_data|freemix"
+        )
+
+        pd.testing.assert_frame_equal(
+            models_output[0][0].reset_index(drop=True),
+            metric_value_output[0][0].reset_index(drop=True),
+            check_dtype=False,
+        )
+        self.assertEqual(models_output[1:], metric_value_output[1:])
+
+    def test_get_data_for_plotting_metric_value_lanes(self):
+        """Test that both backends return the same data for lane metrics"""
+
+        models_output, metric_value_output = self.get_data(
+            "read_data|total_sequences"
+        )
+
+        pd.testing.assert_frame_equal(
+            models_output[0][0].reset_index(drop=True),
+            metric_value_output[0][0].reset_index(drop=True),
+            check_dtype=False,
+        )
+        self.assertEqual(models_output[1:], metric_value_output[1:])
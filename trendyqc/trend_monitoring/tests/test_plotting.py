@@ -1,8 +1,11 @@
+import base64
 import datetime
 import json
 from unittest.mock import Mock, patch
 
-from django.test import TestCase
+from django.conf import settings
+from django.test import TestCase, override_settings
+import numpy as np
 import pandas as pd
 
 from trend_monitoring.backend_utils.plot import (
@@ -10,13 +13,31 @@ from trend_monitoring.backend_utils.plot import (
     get_data_for_plotting,
     get_metric_filter,
     get_date_from_project_name,
+    get_display_month,
     build_groups,
     format_data_for_plotly_js,
-    create_trace
+    create_trace,
+    encode_typed_array,
+    pivot_lane_data,
+    get_bucket_size,
+    get_bucket_labels,
+    get_detail_form,
+    get_drill_down_form,
+    format_buckets_for_plotly_js,
+    get_scatter_data,
+    downsample_scatter,
+    format_scatter_for_plotly_js,
 )
+from trend_monitoring.backend_utils.payload import build_plot_payload
+from trend_monitoring.backend_utils.summary import (
+    update_run_metric_summaries,
+)
+from trend_monitoring.models.fastq_qc import Fastqc, Read_data
 from trend_monitoring.models.metadata import (
     Report, Report_Sample, Patient, Sample
 )
+from trend_monitoring.models.vcf_qc import Happy_metrics
+from .fixtures import create_read_data, create_run
 
 
 class TestGetSubsetQueryset(TestCase):
@@ -176,6 +197,7 @@ class TestGetDataForPlotting(TestCase):
                 "report__project_name": "Project1",
                 "assay": "Assay1",
                 "report__sequencer_id": "Sequencer1",
+                "report__display_month": "Jan. 2000",
                 "picard__hs_metrics__fold_enrichment": 80.0
             }]
         })
@@ -193,6 +215,7 @@ class TestGetDataForPlotting(TestCase):
                         "project_name": ["Project1"],
                         "assay": ["Assay1"],
                         "sequencer_id": ["Sequencer1"],
+                        "display_month": ["Jan. 2000"],
                         "picard__hs_metrics__fold_enrichment": [80.0]
                     }
                 )
@@ -233,6 +256,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": 80.0
                 },
                 {
@@ -241,6 +265,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": 75.0
                 },
                 {
@@ -249,6 +274,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": None
                 }
             ]
@@ -267,6 +293,7 @@ class TestGetDataForPlotting(TestCase):
                         "project_name": ["Project1", "Project1"],
                         "assay": ["Assay1", "Assay1"],
                         "sequencer_id": ["Sequencer1", "Sequencer1"],
+                        "display_month": ["Jan. 2000", "Jan. 2000"],
                         "picard__hs_metrics__fold_enrichment": [80.0, 75.0]
                     },
                 )
@@ -311,6 +338,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": 80.0
                 },
                 {
@@ -319,6 +347,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project2",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": None
                 }
             ]
@@ -337,6 +366,7 @@ class TestGetDataForPlotting(TestCase):
                         "project_name": ["Project1"],
                         "assay": ["Assay1"],
                         "sequencer_id": ["Sequencer1"],
+                        "display_month": ["Jan. 2000"],
                         "picard__hs_metrics__fold_enrichment": [80.0]
                     },
                 )
@@ -381,6 +411,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": 80.0
                 },
                 {
@@ -389,6 +420,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": 75.0
                 },
                 {
@@ -397,6 +429,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project1",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": None
                 },
                 {
@@ -405,6 +438,7 @@ class TestGetDataForPlotting(TestCase):
                     "report__project_name": "Project2",
                     "assay": "Assay1",
                     "report__sequencer_id": "Sequencer1",
+                    "report__display_month": "Jan. 2000",
                     "picard__hs_metrics__fold_enrichment": None
                 }
             ]
@@ -423,6 +457,7 @@ class TestGetDataForPlotting(TestCase):
                         "project_name": ["Project1", "Project1"],
                         "assay": ["Assay1", "Assay1"],
                         "sequencer_id": ["Sequencer1", "Sequencer1"],
+                        "display_month": ["Jan. 2000", "Jan. 2000"],
                         "picard__hs_metrics__fold_enrichment": [80.0, 75.0]
                     },
                 )
@@ -446,6 +481,223 @@ class TestGetDataForPlotting(TestCase):
                     self.assertEqual(test, expected)
 
 
+def create_lane_report_sample():
+    """ Create a report sample with FastQC data for 3 lanes i.e. more than the
+    fastqc lane foreign keys can store
+
+    Returns:
+        Report_Sample: Report sample object
+    """
+
+    report = Report.objects.create(
+        name="Report1",
+        project_id="Project1",
+        project_name="002_240101_A01295_0001_CEN",
+        dnanexus_file_id="File1",
+        sequencer_id="A01295",
+        date=datetime.date(2024, 1, 1),
+        job_date=datetime.datetime(
+            2024, 1, 1, tzinfo=datetime.timezone.utc
+        ),
+        display_month="Jan. 2024",
+    )
+
+    read_data = {
+        (lane, read): create_read_data(lane, read, value)
+        for lane, read, value in [
+            ("L001", "R1", 1.0),
+            ("L001", "R2", 2.0),
+            ("L002", "R1", 3.0),
+            ("L002", "R2", 4.0),
+            ("L003", "R1", 5.0),
+            ("L003", "R2", 6.0),
+        ]
+    }
+    report_sample = Report_Sample.objects.create(
+        assay="Cancer Endocrine Neurology",
+        report=report,
+        sample=Sample.objects.create(sample_id="Sample1"),
+        fastqc=Fastqc.objects.create(
+            read_data_1st_lane_R1=read_data[("L001", "R1")],
+            read_data_1st_lane_R2=read_data[("L001", "R2")],
+            read_data_2nd_lane_R1=read_data[("L002", "R1")],
+            read_data_2nd_lane_R2=read_data[("L002", "R2")],
+        ),
+    )
+    Read_data.objects.filter(
+        pk__in=[instance.pk for instance in read_data.values()]
+    ).update(report_sample=report_sample)
+    return report_sample
+
+
+class TestGetDataForPlottingLanes(TestCase):
+    def setUp(self):
+        create_lane_report_sample()
+
+    def test_get_data_for_plotting_lane_metric(self):
+        """ Test that every lane is returned using the long format lane
+        table
+        """
+
+        data_dfs, _, _ = get_data_for_plotting(
+            get_subset_queryset({"assay_select": ["Cancer Endocrine Neurology"]}),
+            ["read_data|total_sequences"]
+        )
+        test_output = data_dfs[0]
+
+        with self.subTest("One row per sample"):
+            self.assertEqual(len(test_output), 1)
+
+        with self.subTest("Lane names"):
+            self.assertEqual(
+                list(test_output[["lane_1", "lane_2", "lane_3"]].iloc[0]),
+                ["L001", "L002", "L003"]
+            )
+
+        with self.subTest("Lane values"):
+            self.assertEqual(
+                list(test_output.iloc[0][-6:]),
+                [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+            )
+
+
+class TestGetDataForPlottingHappy(TestCase):
+    def setUp(self):
+        report = Report.objects.create(
+            name="Report1",
+            project_id="Project1",
+            project_name="002_240101_A01295_0001_TWE",
+            dnanexus_file_id="File1",
+            sequencer_id="A01295",
+            date=datetime.date(2024, 1, 1),
+            job_date=datetime.datetime(
+                2024, 1, 1, tzinfo=datetime.timezone.utc
+            ),
+            display_month="Jan. 2024",
+        )
+
+        for sample_id in ["Sample1", "Sample2"]:
+            report_sample = Report_Sample.objects.create(
+                assay="TWE",
+                report=report,
+                sample=Sample.objects.create(sample_id=sample_id),
+            )
+
+            # the second sample doesn't have hap.py data
+            if sample_id == "Sample2":
+                continue
+
+            for i, (variant_type, happy_filter) in enumerate(
+                [
+                    ("snp", "ALL"), ("snp", "PASS"),
+                    ("indel", "ALL"), ("indel", "PASS")
+                ]
+            ):
+                Happy_metrics.objects.create(
+                    report_sample=report_sample,
+                    variant_type=variant_type,
+                    filter=happy_filter,
+                    truth_total=100,
+                    truth_tp=90,
+                    truth_fn=10,
+                    query_total=100,
+                    query_fp=5,
+                    query_unk=0,
+                    fp_gt=1,
+                    metric_recall=0.9 + i / 100,
+                    metric_precision=0.95,
+                    metric_frac_na=0.0,
+                    metric_f1_score=0.92,
+                    truth_total_het_hom_ratio=1.5,
+                    query_total_het_hom_ratio=1.5,
+                )
+
+    def test_get_data_for_plotting_happy_metric(self):
+        """ Test that only the hap.py row of the variant type and filter of
+        the model is returned and that samples without hap.py data are
+        reported
+        """
+
+        data_dfs, projects_no_metric, samples_no_metric = (
+            get_data_for_plotting(
+                get_subset_queryset({"assay_select": ["TWE"]}),
+                ["happy_indel_all|metric_recall_indel"]
+            )
+        )
+        test_output = data_dfs[0]
+
+        with self.subTest("Values"):
+            self.assertEqual(list(test_output["sample_id"]), ["Sample1"])
+            self.assertEqual(
+                list(test_output["happy_indel_all__metric_recall"]), [0.92]
+            )
+
+        with self.subTest("Missing samples"):
+            self.assertEqual(projects_no_metric, {})
+            self.assertEqual(
+                samples_no_metric,
+                {
+                    "happy_indel_all|metric_recall_indel": {
+                        "002_240101_A01295_0001_TWE": {"Sample2"}
+                    }
+                }
+            )
+
+
+class TestPivotLaneData(TestCase):
+    def test_pivot_lane_data(self):
+        """ Test the pivot of the lane rows, including a sample without lane
+        data and a sample with less lanes
+        """
+
+        metadata = {
+            "date": "2024-06-24",
+            "project_name": "240624_Project1",
+            "assay": "Myeloid",
+            "sequencer_id": "Sequencer1",
+            "display_month": "Jun. 2024",
+        }
+        metric_filter = [
+            "read_data__lane", "read_data__sample_read", "read_data__gc_pct"
+        ]
+        test_input = pd.DataFrame(
+            [
+                {"sample_id": "Sample1", **metadata, "read_data__lane": lane, "read_data__sample_read": read, "read_data__gc_pct": value}
+                for lane, read, value in [
+                    ("L002", "R2", 4.0),
+                    ("L001", "R1", 1.0),
+                    ("L001", "R2", 2.0),
+                    ("L002", "R1", 3.0),
+                ]
+            ] + [
+                {"sample_id": "Sample2", **metadata, "read_data__lane": "L001", "read_data__sample_read": "R1", "read_data__gc_pct": 5.0},
+                {"sample_id": "Sample3", **metadata, "read_data__lane": None, "read_data__sample_read": None, "read_data__gc_pct": None},
+            ]
+        )[["sample_id", "date", "project_name", "assay", "sequencer_id", "display_month", *metric_filter]]
+
+        test_output = pivot_lane_data(test_input, metric_filter)
+
+        with self.subTest("Columns"):
+            self.assertEqual(
+                list(test_output.columns[6:]),
+                [
+                    "lane_1", "lane_2", "gc_pct_L1_R1", "gc_pct_L1_R2",
+                    "gc_pct_L2_R1", "gc_pct_L2_R2"
+                ]
+            )
+
+        with self.subTest("Values"):
+            self.assertEqual(
+                list(test_output.iloc[0][6:]),
+                ["L001", "L002", 1.0, 2.0, 3.0, 4.0]
+            )
+
+        with self.subTest("Missing lanes"):
+            self.assertEqual(list(test_output["sample_id"]), ["Sample1", "Sample2", "Sample3"])
+            self.assertTrue(pd.isna(test_output.iloc[1]["lane_2"]))
+            self.assertTrue(test_output.iloc[2][6:].isna().all())
+
+
 class TestGetMetricFilter(TestCase):
     def test_get_metric_filter_normal_filter(self):
         """ Test the get_metric_filter using VerifyBAMid """
@@ -468,9 +720,7 @@ class TestGetMetricFilter(TestCase):
 
         model, metric = "happy_snp_all", "truth_total_het_hom_ratio_snp"
         test_output = get_metric_filter(model, metric)
-        expected_output = [
-            "happy__happy_snp_all__truth_total_het_hom_ratio_snp"
-        ]
+        expected_output = ["happy_snp_all__truth_total_het_hom_ratio"]
         self.assertEqual(test_output, expected_output)
 
     def test_get_metric_filter_fastqc_filter(self):
@@ -479,12 +729,9 @@ class TestGetMetricFilter(TestCase):
         model, metric = "read_data", "total_sequences"
         test_output = get_metric_filter(model, metric)
         expected_output = [
-            "fastqc__read_data_1st_lane_R1__lane",
-            "fastqc__read_data_2nd_lane_R1__lane",
-            "fastqc__read_data_1st_lane_R1__total_sequences",
-            "fastqc__read_data_1st_lane_R2__total_sequences",
-            "fastqc__read_data_2nd_lane_R1__total_sequences",
-            "fastqc__read_data_2nd_lane_R2__total_sequences"
+            "read_data__lane",
+            "read_data__sample_read",
+            "read_data__total_sequences"
         ]
         self.assertEqual(test_output, expected_output)
 
@@ -496,12 +743,9 @@ class TestGetMetricFilter(TestCase):
         model, metric = "base_distribution_by_cycle_metrics", "sum_pct_t"
         test_output = get_metric_filter(model, metric)
         expected_output = [
-            "picard__base_distribution_by_cycle_metrics_1st_lane_R1__lane",
-            "picard__base_distribution_by_cycle_metrics_2nd_lane_R1__lane",
-            "picard__base_distribution_by_cycle_metrics_1st_lane_R1__sum_pct_t",
-            "picard__base_distribution_by_cycle_metrics_1st_lane_R2__sum_pct_t",
-            "picard__base_distribution_by_cycle_metrics_2nd_lane_R1__sum_pct_t",
-            "picard__base_distribution_by_cycle_metrics_2nd_lane_R2__sum_pct_t"
+            "base_distribution_by_cycle_metrics__lane",
+            "base_distribution_by_cycle_metrics__sample_read",
+            "base_distribution_by_cycle_metrics__sum_pct_t"
         ]
         self.assertEqual(test_output, expected_output)
 
@@ -567,6 +811,41 @@ class TestGetDateFromProjectName(TestCase):
                     raise AssertionError(f"{date} is not a valid date")
 
 
+class TestGetDisplayMonth(TestCase):
+    def test_get_display_month_from_project_name(self):
+        """ Test that the month label is parsed from the project name """
+
+        test_output = get_display_month(
+            "002_240524_A01295_0001_CEN", datetime.date(2024, 6, 1)
+        )
+        self.assertEqual(test_output, "May. 2024")
+
+    def test_get_display_month_fallback_date(self):
+        """ Test that the date of the run is used if the project name doesn't
+        contain a date
+        """
+
+        test_output = get_display_month(
+            "002_A01295_CEN", datetime.date(2024, 6, 1)
+        )
+        self.assertEqual(test_output, "Jun. 2024")
+
+    def test_get_display_month_invalid_month(self):
+        """ Test that the date of the run is used if the date of the project
+        name has a month that doesn't exist
+        """
+
+        for project_name in [
+            "002_231534_A01295_0001_CEN",
+            "002_230015_A01295_0001_CEN",
+        ]:
+            with self.subTest(project_name):
+                test_output = get_display_month(
+                    project_name, datetime.date(2024, 6, 1)
+                )
+                self.assertEqual(test_output, "Jun. 2024")
+
+
 class TestBuildGroups(TestCase):
     def test_build_groups(self):
         """ Test build_groups function """
@@ -988,3 +1267,529 @@ class TestCreateTrace(TestCase):
         }
 
         self.assertEqual(test_output, expected_output)
+
+    def test_create_trace_compact(self):
+        """ Test to create a trace using the compact encoding """
+
+        test_df = pd.DataFrame(
+            {
+                "sample_id": ["Sample1", "Sample2", "Sample3"],
+                "date": ["2024-06-25", "2024-06-25", "2024-06-25"],
+                "project_name": ["240625_Project1", "240625_Project1", "240625_Project1"],
+                "assay": ["Myeloid", "Myeloid", "Myeloid"],
+                "sequencer_id": ["Sequencer1", "Sequencer1", "Sequencer1"],
+                "metric": [3, 1, 2]
+            }
+        )
+
+        test_input = {
+            "data": test_df,
+            "data_column": "metric",
+            "project_name": "240625_Project1",
+            "lane": "L001",
+            "name": "First lane",
+            "boxplot_color": "AED6F1",
+            "boxplot_line_color": "000000",
+            "offsetgroup": "First lane",
+            "legendgroup": "First lane",
+            "showlegend": True,
+            "encoding": "compact",
+        }
+
+        test_output = create_trace(**test_input)
+
+        with self.subTest("Run sent once"):
+            self.assertEqual(
+                test_output["x"], ["Jun. 2024", "240625_Project1"]
+            )
+
+        with self.subTest("Typed array values"):
+            self.assertEqual(test_output["y"]["dtype"], "f4")
+            values = np.frombuffer(
+                base64.b64decode(test_output["y"]["bdata"]), dtype="<f4"
+            )
+            self.assertEqual(list(values), [1.0, 2.0, 3.0])
+
+        with self.subTest("Lane without sample text"):
+            self.assertNotIn("text", test_output)
+            self.assertEqual(test_output["lane"], "L001")
+            self.assertTrue(test_output["compact"])
+
+
+    @patch("trend_monitoring.backend_utils.plot.get_date_from_project_name")
+    def test_create_trace_display_month(self, mock_date):
+        """ Test that the stored month label is used instead of parsing the
+        project name
+        """
+
+        test_df = pd.DataFrame(
+            {
+                "sample_id": ["Sample1"],
+                "project_name": ["240625_Project1"],
+                "metric": [1],
+            }
+        )
+
+        test_output = create_trace(
+            data=test_df,
+            data_column="metric",
+            project_name="240625_Project1",
+            display_month="Jun. 2024",
+            lane=None,
+            name="Myeloid - Project1",
+            boxplot_color="#FF7800",
+            offsetgroup="",
+            showlegend=True,
+        )
+
+        self.assertEqual(test_output["x"][0], ["Jun. 2024"])
+        mock_date.assert_not_called()
+
+
+class TestEncodeTypedArray(TestCase):
+    def test_encode_typed_array_float32(self):
+        """ Test that small values are encoded as float32 """
+
+        test_output = encode_typed_array([0.5, 1.25, float("nan")])
+        values = np.frombuffer(
+            base64.b64decode(test_output["bdata"]), dtype="<f4"
+        )
+
+        self.assertEqual(test_output["dtype"], "f4")
+        self.assertEqual(list(values[:2]), [0.5, 1.25])
+        self.assertTrue(np.isnan(values[2]))
+
+    def test_encode_typed_array_float64(self):
+        """ Test that values too big for float32 are encoded as float64 """
+
+        test_output = encode_typed_array([1.0, 123456789.0])
+        values = np.frombuffer(
+            base64.b64decode(test_output["bdata"]), dtype="<f8"
+        )
+
+        self.assertEqual(test_output["dtype"], "f8")
+        self.assertEqual(list(values), [1.0, 123456789.0])
+
+
+class TestFormatDataForPlotlyJSLanes(TestCase):
+    def test_format_data_for_plotly_js_three_lanes(self):
+        """ Test that a trace is created for every lane of a run """
+
+        test_input = pd.DataFrame(
+            {
+                "sample_id": ["Sample1", "Sample2"],
+                "date": ["2024-06-24", "2024-06-24"],
+                "project_name": ["240624_Project1", "240624_Project1"],
+                "assay": ["Myeloid", "Myeloid"],
+                "sequencer_id": ["Sequencer1", "Sequencer1"],
+                "lane_1": ["L001", "L001"],
+                "lane_2": ["L002", "L002"],
+                "lane_3": ["L003", "L003"],
+                "metric_L1_R1": [1, 2],
+                "metric_L1_R2": [1, 2],
+                "metric_L2_R1": [3, 4],
+                "metric_L2_R2": [3, 4],
+                "metric_L3_R1": [5, 6],
+                "metric_L3_R2": [5, 6],
+            }
+        )
+
+        traces, is_grouped = format_data_for_plotly_js(test_input)
+        traces = json.loads(traces)
+
+        with self.subTest("Trace names"):
+            self.assertEqual(
+                [trace["name"] for trace in traces],
+                ["Myeloid - Sequencer1", "First lane", "Second lane", "Lane 3"]
+            )
+
+        with self.subTest("Third lane values"):
+            self.assertEqual(traces[3]["y"], [5.0, 6.0])
+            self.assertEqual(
+                traces[3]["text"], ["Sample1 - L003", "Sample2 - L003"]
+            )
+
+        with self.subTest("Combined values"):
+            self.assertEqual(traces[0]["y"], [3.0, 4.0])
+
+        self.assertEqual(is_grouped, json.dumps(True))
+
+
+@override_settings(BUCKET_PLOT_RUN_THRESHOLD=10, BUCKET_PLOT_MAX_BOXES=12)
+class TestGetBucketSize(TestCase):
+    def test_get_bucket_size_few_runs(self):
+        """ Test that every run is displayed under the run threshold """
+
+        run_dates = pd.Series(pd.date_range("2020-01-01", periods=10, freq="90D"))
+        self.assertIsNone(get_bucket_size(run_dates))
+
+    def test_get_bucket_size_auto(self):
+        """ Test that the smallest bucket size giving less buckets than the
+        maximum number of boxes is chosen
+        """
+
+        with self.subTest("Week"):
+            run_dates = pd.Series(pd.date_range("2024-01-01", periods=20, freq="D"))
+            self.assertEqual(get_bucket_size(run_dates), "week")
+
+        with self.subTest("Month"):
+            run_dates = pd.Series(pd.date_range("2024-01-01", periods=20, freq="15D"))
+            self.assertEqual(get_bucket_size(run_dates), "month")
+
+        with self.subTest("Quarter"):
+            run_dates = pd.Series(pd.date_range("2020-01-01", periods=20, freq="60D"))
+            self.assertEqual(get_bucket_size(run_dates), "quarter")
+
+    def test_get_bucket_size_user_choice(self):
+        """ Test that the bucket size chosen in the form is used """
+
+        run_dates = pd.Series(pd.date_range("2024-01-01", periods=20, freq="D"))
+
+        with self.subTest("Bucket size"):
+            self.assertEqual(get_bucket_size(run_dates, "quarter"), "quarter")
+
+        with self.subTest("Runs"):
+            self.assertIsNone(get_bucket_size(run_dates, "run"))
+
+
+class TestBuildPlotPayloadAuto(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project_names = []
+
+        for run_nb in range(8):
+            report = create_run(run_nb, [0.01, 0.02, 0.03])
+            update_run_metric_summaries(report)
+            cls.project_names.append(report.project_name)
+
+        cls.sequencer_id = report.sequencer_id
+
+    def get_payload(self, nb_runs):
+        return build_plot_payload(
+            {
+                "run_select": self.project_names[:nb_runs],
+                "metrics_y": ["verifybamid_data|freemix"],
+            }
+        )
+
+    def test_default_thresholds(self):
+        """ Test that the runs are bucketed above the summary threshold """
+
+        self.assertLess(
+            settings.SUMMARY_PLOT_RUN_THRESHOLD,
+            settings.BUCKET_PLOT_RUN_THRESHOLD
+        )
+
+    @override_settings(
+        SUMMARY_PLOT_RUN_THRESHOLD=3, BUCKET_PLOT_RUN_THRESHOLD=6
+    )
+    def test_build_plot_payload_auto(self):
+        """ Test that the automatic mode displays the samples, the run
+        summaries and the time buckets as the number of runs grows
+        """
+
+        for nb_runs, nb_summary_runs, bucket_size in [
+            (2, None, None),
+            (5, 5, None),
+            (8, None, "week"),
+        ]:
+            with self.subTest(nb_runs=nb_runs):
+                payload = self.get_payload(nb_runs)
+
+                self.assertEqual(payload["status"], "ok")
+                self.assertEqual(payload["nb_summary_runs"], nb_summary_runs)
+                self.assertEqual(payload["bucket_size"], bucket_size)
+
+
+    def test_build_plot_payload_control_limits(self):
+        """ Test that the control limits are drawn for the runs with enough
+        previous runs, from the baselines of the Westgard rules
+        """
+
+        payload = self.get_payload(8)
+        nb_previous_runs = settings.SPC_MIN_BASELINE_RUNS
+
+        self.assertEqual(
+            [
+                (limits["group"], limits["project_name"])
+                for limits in payload["control_limits"]
+            ],
+            [
+                (
+                    f"Cancer Endocrine Neurology - {self.sequencer_id}",
+                    self.project_names[nb_previous_runs:],
+                )
+            ],
+        )
+        # every run has the same mean i.e. no spread
+        self.assertEqual(
+            payload["control_limits"][0]["spread"],
+            [None] * (8 - nb_previous_runs),
+        )
+
+
+class TestGetBucketLabels(TestCase):
+    def test_get_bucket_labels(self):
+        """ Test the labels of the buckets which need to sort in order """
+
+        dates = pd.Series([datetime.date(2023, 12, 31), datetime.date(2024, 1, 3)])
+
+        with self.subTest("Week"):
+            self.assertEqual(
+                list(get_bucket_labels(dates, "week")),
+                ["2023-12-25", "2024-01-01"]
+            )
+
+        with self.subTest("Month"):
+            self.assertEqual(
+                list(get_bucket_labels(dates, "month")), ["2023-12", "2024-01"]
+            )
+
+        with self.subTest("Quarter"):
+            self.assertEqual(
+                list(get_bucket_labels(dates, "quarter")), ["2023Q4", "2024Q1"]
+            )
+
+
+class TestGetDrillDownForm(TestCase):
+    def test_get_drill_down_form(self):
+        """ Test that the days back are replaced by the dates of the bucket """
+
+        form = {
+            "assay_select": ["Myeloid"],
+            "days_back": ["365"],
+            "bucket": ["auto"],
+            "metrics_y": ["verifybamid_data|freemix"],
+        }
+        expected_output = {
+            "assay_select": ["Myeloid"],
+            "bucket": ["run"],
+            "metrics_y": ["verifybamid_data|freemix"],
+            "date_start": ["2024-01-01"],
+            "date_end": ["2024-01-07"],
+        }
+
+        self.assertEqual(
+            get_drill_down_form(form, "2024-01-01", "week"), expected_output
+        )
+
+
+class TestGetDetailForm(TestCase):
+    def test_get_detail_form_runs(self):
+        """ Test that the runs displayed replace the selected runs and that
+        every sample is displayed
+        """
+
+        form = {
+            "run_select": ["Project3", "Project1", "Project2"],
+            "days_back": ["365"],
+            "metrics_y": ["verifybamid_data|freemix"],
+        }
+        expected_output = {
+            "run_select": ["Project1", "Project2"],
+            "bucket": ["run"],
+            "metrics_y": ["verifybamid_data|freemix"],
+        }
+
+        self.assertEqual(
+            get_detail_form(form, runs=["Project2", "Project1"]),
+            expected_output
+        )
+
+
+class TestFormatBucketsForPlotlyJS(TestCase):
+    def test_format_buckets_for_plotly_js(self):
+        """ Test that the samples of the runs of a bucket are aggregated per
+        assay and sequencer group
+        """
+
+        test_input = pd.DataFrame(
+            [
+                ["Sample1", datetime.date(2024, 1, 2), "Project1", "Myeloid", "Sequencer1", "Jan. 2024", 1.0],
+                ["Sample2", datetime.date(2024, 1, 2), "Project1", "Myeloid", "Sequencer1", "Jan. 2024", 2.0],
+                ["Sample3", datetime.date(2024, 1, 20), "Project2", "Myeloid", "Sequencer1", "Jan. 2024", 3.0],
+                ["Sample4", datetime.date(2024, 2, 2), "Project3", "Myeloid", "Sequencer1", "Feb. 2024", 4.0],
+                ["Sample5", datetime.date(2024, 1, 2), "Project4", "Myeloid", "Sequencer2", "Jan. 2024", 5.0],
+            ],
+            columns=[
+                "sample_id", "date", "project_name", "assay", "sequencer_id",
+                "display_month", "verifybamid_data__freemix"
+            ]
+        )
+
+        test_output, is_grouped = format_buckets_for_plotly_js(
+            test_input, "month"
+        )
+        traces = json.loads(test_output)
+
+        with self.subTest("One trace per group"):
+            self.assertEqual(
+                [trace["name"] for trace in traces],
+                ["Myeloid - Sequencer1", "Myeloid - Sequencer2"]
+            )
+
+        with self.subTest("Buckets"):
+            self.assertEqual(traces[0]["x"], ["2024-01", "2024-02"])
+            self.assertEqual(traces[0]["median"], [2.0, 4.0])
+            self.assertEqual(traces[0]["lowerfence"], [1.0, 4.0])
+            self.assertEqual(traces[0]["upperfence"], [3.0, 4.0])
+            self.assertEqual(
+                traces[0]["text"], ["3 samples - 2 runs", "1 samples - 1 runs"]
+            )
+
+        with self.subTest("Grouped boxes"):
+            self.assertTrue(json.loads(is_grouped))
+
+
+class TestGetScatterData(TestCase):
+    def setUp(self):
+        for run_nb in range(3):
+            create_run(
+                run_nb, [0.01, 0.02, 0.03, None], total_sequences=1000.0
+            )
+
+    def test_get_scatter_data(self):
+        """ Test that the values of both metrics are joined per sample in one
+        query
+        """
+
+        queryset = get_subset_queryset(
+            {"assay_select": ["Cancer Endocrine Neurology"]}
+        )
+
+        with self.assertNumQueries(1):
+            data, projects, samples = get_scatter_data(
+                queryset,
+                "verifybamid_data|avg_dp",
+                "verifybamid_data|freemix"
+            )
+
+        with self.subTest("One row per sample with data"):
+            self.assertEqual(len(data), 9)
+
+        with self.subTest("Values"):
+            report_sample = queryset.get(
+                sample__sample_id=data["sample_id"][0],
+                report__project_name=data["project_name"][0]
+            )
+            verifybamid_data = report_sample.verifybamid_data
+            self.assertAlmostEqual(data["x"][0], verifybamid_data.avg_dp)
+            self.assertAlmostEqual(data["y"][0], verifybamid_data.freemix)
+
+    def test_get_scatter_data_lane_metrics(self):
+        """ Test that the lane values are averaged and that the samples
+        without data are reported as missing
+        """
+
+        queryset = get_subset_queryset(
+            {"assay_select": ["Cancer Endocrine Neurology"]}
+        )
+        data, projects, samples = get_scatter_data(
+            queryset,
+            "read_data|total_sequences",
+            "verifybamid_data|freemix"
+        )
+
+        with self.subTest("Only the samples with both metrics"):
+            self.assertEqual(len(data), 9)
+
+        with self.subTest("Mean of the lanes"):
+            self.assertEqual(set(data["x"]), {1500.0})
+
+        with self.subTest("Missing samples"):
+            self.assertEqual(projects, {})
+            self.assertEqual(
+                sum(
+                    len(project_samples)
+                    for project_samples in samples[
+                        "verifybamid_data|freemix"
+                    ].values()
+                ),
+                3
+            )
+
+
+class TestDownsampleScatter(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.data = pd.DataFrame(
+            {
+                "x": np.append(rng.normal(0, 1, 10000), [50.0, -50.0]),
+                "y": np.append(rng.normal(0, 1, 10000), [50.0, 50.0]),
+            }
+        )
+
+    def test_downsample_scatter_below_max_points(self):
+        """ Test that small plots are not downsampled """
+
+        self.assertIs(downsample_scatter(self.data, 20000), self.data)
+
+    def test_downsample_scatter(self):
+        """ Test that the number of points is capped, that the outliers are
+        kept and that the sampling is reproducible
+        """
+
+        test_output = downsample_scatter(self.data, 1000)
+
+        with self.subTest("Number of points"):
+            self.assertLessEqual(len(test_output), 1000)
+            self.assertGreater(len(test_output), 500)
+
+        with self.subTest("Outliers kept"):
+            self.assertIn(10000, test_output.index)
+            self.assertIn(10001, test_output.index)
+
+        with self.subTest("Density preserved"):
+            self.assertAlmostEqual(
+                (test_output["x"].abs() < 1).mean(),
+                (self.data["x"].abs() < 1).mean(),
+                delta=0.05
+            )
+
+        with self.subTest("Reproducible"):
+            pd.testing.assert_frame_equal(
+                test_output, downsample_scatter(self.data, 1000)
+            )
+
+
+class TestFormatScatterForPlotlyJS(TestCase):
+    def test_format_scatter_for_plotly_js(self):
+        """ Test that a WebGL scatter trace is created per group """
+
+        test_input = pd.DataFrame(
+            [
+                ["Sample1", datetime.date(2024, 1, 1), "Project1", "Myeloid", "Sequencer1", "Jan. 2024", 1.0, 2.0],
+                ["Sample2", datetime.date(2024, 1, 1), "Project1", "Myeloid", "Sequencer1", "Jan. 2024", 3.0, 4.0],
+                ["Sample3", datetime.date(2024, 1, 2), "Project2", "Myeloid", "Sequencer2", "Jan. 2024", 5.0, 6.0],
+            ],
+            columns=[
+                "sample_id", "date", "project_name", "assay", "sequencer_id",
+                "display_month", "x", "y"
+            ]
+        )
+
+        test_output, is_grouped = format_scatter_for_plotly_js(test_input)
+        traces = json.loads(test_output)
+
+        with self.subTest("One trace per group"):
+            self.assertEqual(
+                [trace["name"] for trace in traces],
+                ["Myeloid - Sequencer1", "Myeloid - Sequencer2"]
+            )
+
+        with self.subTest("Points"):
+            self.assertEqual(traces[0]["type"], "scattergl")
+            self.assertEqual(traces[0]["x"], [1.0, 3.0])
+            self.assertEqual(traces[0]["y"], [2.0, 4.0])
+            self.assertEqual(
+                traces[0]["text"],
+                ["Sample1 - Project1", "Sample2 - Project1"]
+            )
+
+        with self.subTest("Different colors"):
+            self.assertNotEqual(
+                traces[0]["marker"]["color"], traces[1]["marker"]["color"]
+            )
+
+        with self.subTest("Not grouped"):
+            self.assertFalse(json.loads(is_grouped))
@@ -0,0 +1,71 @@
+import marshal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from trend_monitoring.backend_utils.profiling import PROFILE_ID_HEADER
+from trend_monitoring.models.profiling import Request_profile
+from .test_views import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestRequestProfilingMiddleware(TestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_superuser(
+            "staff", password="staff"
+        )
+        self.user = User.objects.create_user("user", password="user")
+
+    def test_profile_staff(self):
+        """Test that the dashboard is profiled for staff users with the query
+        parameter and the header
+        """
+
+        self.client.force_login(self.staff_user)
+
+        for kwargs in [{"data": {"profile": "1"}}, {"HTTP_X_PROFILE": "1"}]:
+            response = self.client.get("/trendyqc/", **kwargs)
+
+            with self.subTest(kwargs):
+                self.assertEqual(response.status_code, 200)
+                request_profile = Request_profile.objects.get(
+                    id=response[PROFILE_ID_HEADER]
+                )
+                self.assertEqual(request_profile.view, "Dashboard GET")
+                self.assertEqual(request_profile.user, "staff")
+                self.assertGreater(request_profile.sql_queries, 0)
+                self.assertIn("views.py", request_profile.stats)
+
+    def test_profile_not_staff(self):
+        """Test that the requests of other users are not profiled"""
+
+        self.client.force_login(self.user)
+        response = self.client.get("/trendyqc/", {"profile": "1"})
+
+        self.assertNotIn(PROFILE_ID_HEADER, response)
+        self.assertFalse(Request_profile.objects.exists())
+
+    def test_profile_admin(self):
+        """Test that the profiles are viewable and downloadable in the
+        admin
+        """
+
+        self.client.force_login(self.staff_user)
+        profile_id = self.client.get("/trendyqc/", {"profile": "1"})[
+            PROFILE_ID_HEADER
+        ]
+
+        with self.subTest("Change page"):
+            response = self.client.get(
+                f"/trendyqc/admin/trend_monitoring/request_profile/"
+                f"{profile_id}/change/"
+            )
+            self.assertContains(response, "Slowest SQL queries")
+
+        with self.subTest("Download"):
+            response = self.client.get(
+                f"/trendyqc/admin/trend_monitoring/request_profile/"
+                f"{profile_id}/download/"
+            )
+            stats = marshal.loads(response.content)
+            self.assertTrue(any(function[2] == "get" for function in stats))
@@ -0,0 +1,117 @@
+from django.test import TestCase
+
+from trend_monitoring.backend_utils.metric_store import update_metric_values
+from trend_monitoring.backend_utils.samples import (
+    get_run_sample_data,
+    is_valid_metric,
+)
+from trend_monitoring.models.metric_store import Metric_value
+from .test_plotting import create_lane_report_sample
+from .test_summary import create_verifybamid_sample
+
+
+class TestIsValidMetric(TestCase):
+    def test_is_valid_metric(self):
+        """Test that only the plotable metrics in the form format are
+        valid
+        """
+
+        for metric, expected_output in [
+            ("verifybamid_data|freemix", True),
+            ("read_data|total_sequences", True),
+            ("verifybamid_data|rg", False),
+            ("Verify BAMid|freemix", False),
+            ("sample|sample_id", False),
+            ("", False),
+        ]:
+            with self.subTest(metric):
+                self.assertEqual(is_valid_metric(metric), expected_output)
+
+
+class TestGetRunSampleData(TestCase):
+    def setUp(self):
+        self.report_sample = create_lane_report_sample()
+        self.project_name = self.report_sample.report.project_name
+        create_verifybamid_sample(self.report_sample.report, "Sample2", 0.02)
+        create_verifybamid_sample(self.report_sample.report, "Sample3", 0.01)
+        update_metric_values(self.report_sample.report)
+
+    def test_get_run_sample_data(self):
+        """Test that the samples with a value are sorted by value with their
+        other metrics
+        """
+
+        sample_data = get_run_sample_data(
+            self.project_name, "verifybamid_data|freemix"
+        )
+
+        with self.subTest("Samples"):
+            self.assertEqual(
+                [
+                    (sample["sample_id"], sample["value"])
+                    for sample in sample_data["samples"]
+                ],
+                [("Sample3", 0.01), ("Sample2", 0.02)],
+            )
+
+        with self.subTest("Other metrics"):
+            self.assertEqual(
+                sample_data["samples"][0]["metrics"]["verifybamid_data|avg_dp"],
+                1.0,
+            )
+
+    def test_get_run_sample_data_lanes(self):
+        """Test that the values of the lane and combined traces are the mean
+        of their reads
+        """
+
+        for lane, expected_value in [(None, 3.5), ("L003", 5.5)]:
+            with self.subTest(lane):
+                sample_data = get_run_sample_data(
+                    self.project_name, "read_data|total_sequences", lane
+                )
+                self.assertEqual(
+                    [
+                        (sample["sample_id"], sample["value"])
+                        for sample in sample_data["samples"]
+                    ],
+                    [("Sample1", expected_value)],
+                )
+
+        with self.subTest("Lane metrics names"):
+            self.assertEqual(
+                sample_data["samples"][0]["metrics"][
+                    "read_data|total_sequences L003 R2"
+                ],
+                6.0,
+            )
+
+    def test_get_run_sample_data_no_metric_values(self):
+        """Test that the other metrics of the reports without metric values
+        are read from the tables of the tools
+        """
+
+        expected_output = get_run_sample_data(
+            self.project_name, "verifybamid_data|freemix"
+        )
+        Metric_value.objects.all().delete()
+
+        self.assertEqual(
+            get_run_sample_data(self.project_name, "verifybamid_data|freemix"),
+            expected_output,
+        )
+
+    def test_get_run_sample_data_unknown(self):
+        """Test that unknown runs and lanes have no samples"""
+
+        for project_name, lane in [
+            ("Unknown run", None),
+            (self.project_name, "L008"),
+        ]:
+            with self.subTest(f"{project_name} {lane}"):
+                self.assertEqual(
+                    get_run_sample_data(
+                        project_name, "read_data|total_sequences", lane
+                    )["samples"],
+                    [],
+                )
@@ -0,0 +1,479 @@
+import datetime
+
+from unittest.mock import patch
+
+from django.test import TestCase
+import numpy as np
+import pandas as pd
+
+from trend_monitoring.backend_utils.spc import (
+    combine_moments,
+    compute_control_chart,
+    get_control_limits,
+    get_rolling_mad,
+    get_run_outliers,
+    get_run_violations,
+    get_stdev,
+    rebuild_metric_baselines,
+    remove_moments,
+)
+from trend_monitoring.backend_utils.summary import (
+    update_run_metric_summaries,
+)
+from trend_monitoring.management.commands.utils._notifications import (
+    build_report_for_slack,
+)
+from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.summary import Metric_baseline
+from .fixtures import create_run
+
+
+def get_moments(values):
+    """ Get the number of values, mean and sum of squared differences of the
+    values
+
+    Args:
+        values (list): List of values
+
+    Returns:
+        tuple: Moments of the values
+    """
+
+    values = np.asarray(values, dtype=float)
+    return len(values), values.mean(), ((values - values.mean()) ** 2).sum()
+
+
+class TestMoments(TestCase):
+    def test_combine_moments(self):
+        """ Test that combining the moments of 2 sets gives the moments of
+        their union
+        """
+
+        values_a = [1.0, 2.0, 4.0]
+        values_b = [10.0, 12.0]
+
+        np.testing.assert_allclose(
+            combine_moments(*get_moments(values_a), *get_moments(values_b)),
+            get_moments(values_a + values_b)
+        )
+
+    def test_remove_moments(self):
+        """ Test that removing the moments of a set gives the moments of the
+        other values
+        """
+
+        values_a = [1.0, 2.0, 4.0]
+        values_b = [10.0, 12.0]
+
+        np.testing.assert_allclose(
+            remove_moments(
+                *get_moments(values_a + values_b), *get_moments(values_b)
+            ),
+            get_moments(values_a)
+        )
+
+    def test_get_stdev(self):
+        """ Test the standard deviation of the moments """
+
+        values = [1.0, 2.0, 4.0]
+        n, _, m2 = get_moments(values)
+
+        self.assertAlmostEqual(get_stdev(n, m2), np.std(values, ddof=1))
+        self.assertIsNone(get_stdev(1, 0.0))
+
+
+class TestMetricBaselines(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # the summaries of the runs are built once for the tests of the class
+        for run_nb in range(4):
+            report = create_run(
+                run_nb,
+                [0.01 * (run_nb + 1) + 0.002 * i for i in range(5)],
+            )
+            update_run_metric_summaries(report)
+
+        cls.metric = "verifybamid_data|freemix"
+
+    def get_baseline(self):
+        report = Report.objects.first()
+        return Metric_baseline.objects.get(
+            metric=self.metric,
+            assay="Cancer Endocrine Neurology",
+            sequencer_id=report.sequencer_id,
+            lane=""
+        )
+
+    def test_update_metric_baselines(self):
+        """ Test that the baselines updated with the summaries of every run
+        match the statistics of the values of every sample
+        """
+
+        baseline = self.get_baseline()
+        report_samples = Report_Sample.objects.filter(
+            report__sequencer_id=baseline.sequencer_id
+        )
+        values = list(
+            report_samples.values_list(
+                "verifybamid_data__freemix", flat=True
+            )
+        )
+
+        with self.subTest("Sample values"):
+            self.assertEqual(baseline.nb_samples, len(values))
+            self.assertAlmostEqual(baseline.sample_mean, np.mean(values))
+            self.assertAlmostEqual(
+                get_stdev(baseline.nb_samples, baseline.sample_m2),
+                np.std(values, ddof=1)
+            )
+
+        with self.subTest("Run values"):
+            self.assertEqual(
+                baseline.nb_runs,
+                report_samples.values("report").distinct().count()
+            )
+
+    def test_update_metric_baselines_new_series(self):
+        """ Test that the baseline of a new sequencer is created with the
+        summaries of its first run only
+        """
+
+        nb_baselines = Metric_baseline.objects.count()
+        report = create_run(4, [0.01, 0.02], sequencer_id="A01303")
+        update_run_metric_summaries(report)
+        baseline = Metric_baseline.objects.get(
+            metric=self.metric, sequencer_id="A01303"
+        )
+
+        self.assertEqual(Metric_baseline.objects.count(), nb_baselines * 2)
+        self.assertEqual(baseline.nb_runs, 1)
+        self.assertEqual(baseline.nb_samples, 2)
+        self.assertAlmostEqual(baseline.sample_mean, 0.015)
+
+    def test_update_metric_baselines_rebuilt_report(self):
+        """ Test that rebuilding the summaries of a report replaces its
+        contribution to the baselines
+        """
+
+        baseline = self.get_baseline()
+        update_run_metric_summaries(Report.objects.first())
+        rebuilt_baseline = self.get_baseline()
+
+        self.assertEqual(rebuilt_baseline.nb_runs, baseline.nb_runs)
+        self.assertEqual(rebuilt_baseline.nb_samples, baseline.nb_samples)
+        self.assertAlmostEqual(
+            rebuilt_baseline.sample_mean, baseline.sample_mean
+        )
+        self.assertAlmostEqual(rebuilt_baseline.sample_m2, baseline.sample_m2)
+
+    def test_rebuild_metric_baselines(self):
+        """ Test that rebuilding the baselines from the run summaries gives
+        the incrementally updated baselines
+        """
+
+        baseline = self.get_baseline()
+        nb_baselines = Metric_baseline.objects.count()
+
+        self.assertEqual(rebuild_metric_baselines(), nb_baselines)
+
+        rebuilt_baseline = self.get_baseline()
+
+        for field in ["run_mean", "run_m2", "sample_mean", "sample_m2"]:
+            with self.subTest(field):
+                self.assertAlmostEqual(
+                    getattr(rebuilt_baseline, field), getattr(baseline, field)
+                )
+
+    def test_get_run_outliers(self):
+        """ Test that a sample far from the baseline of the previous runs is
+        flagged
+        """
+
+        report = Report.objects.order_by("date").last()
+        report_sample = Report_Sample.objects.filter(report=report).first()
+        verifybamid_data = report_sample.verifybamid_data
+        verifybamid_data.freemix = 1_000_000
+        verifybamid_data.save()
+        update_run_metric_summaries(report)
+        # the baseline includes the checked run
+        nb_previous_runs = Metric_baseline.objects.get(
+            metric=self.metric,
+            assay=report_sample.assay,
+            sequencer_id=report.sequencer_id,
+            lane=""
+        ).nb_runs - 1
+
+        test_output = get_run_outliers(
+            report, metrics=[self.metric], min_runs=nb_previous_runs
+        )
+
+        with self.subTest("Sample flagged"):
+            self.assertTrue(
+                any(
+                    msg.startswith(
+                        f"{report_sample.sample.sample_id} `{self.metric}`: "
+                        "1e+06 outside of"
+                    )
+                    for msg in test_output
+                )
+            )
+
+        with self.subTest("Not enough previous runs"):
+            self.assertEqual(
+                get_run_outliers(
+                    report,
+                    metrics=[self.metric],
+                    min_runs=nb_previous_runs + 1
+                ),
+                []
+            )
+
+    def test_build_report_for_slack_qc_outliers(self):
+        """ Test that the QC outliers of the reports are capped in the Slack
+        summary
+        """
+
+        test_output = build_report_for_slack(
+            "header",
+            "final",
+            qc_outliers={"file-1": [f"outlier {i}" for i in range(25)]}
+        )
+
+        self.assertIn("   - outlier 19\n", test_output)
+        self.assertNotIn("outlier 20", test_output)
+        self.assertIn("... and 5 other outliers", test_output)
+
+
+class TestComputeControlChart(TestCase):
+    def get_runs(self, values, sequencer_id="A01295"):
+        """ Build the run summaries of a series of runs
+
+        Args:
+            values (list): Run mean of every run
+            sequencer_id (str, optional): Sequencer of the runs
+
+        Returns:
+            pd.DataFrame: Dataframe of run summaries
+        """
+
+        return pd.DataFrame(
+            {
+                "date": [
+                    datetime.date(2024, 1, 1) + datetime.timedelta(days=i)
+                    for i in range(len(values))
+                ],
+                "project_name": [
+                    f"002_run{i}_{sequencer_id}" for i in range(len(values))
+                ],
+                "assay": "Myeloid",
+                "sequencer_id": sequencer_id,
+                "mean": values,
+                "median": values,
+            }
+        )
+
+    def setUp(self):
+        # stable baseline of mean 10 and standard deviation 1
+        self.baseline = [9.0, 11.0] * 5
+
+    def test_compute_control_chart_baseline(self):
+        """ Test that the baseline of a run only uses the previous runs """
+
+        test_output = compute_control_chart(
+            self.get_runs(self.baseline + [30.0]), window=10, min_runs=5
+        )
+
+        with self.subTest("Not enough previous runs"):
+            self.assertTrue(test_output["center"][:5].isna().all())
+
+        with self.subTest("Previous runs"):
+            self.assertAlmostEqual(test_output["center"].iloc[-1], 10.0)
+            self.assertAlmostEqual(
+                test_output["spread"].iloc[-1], np.std(self.baseline, ddof=1)
+            )
+
+    def test_compute_control_chart_rules(self):
+        """ Test that every rule is flagged on its pattern only """
+
+        patterns = {
+            "1_3s": [14.0],
+            "2_2s": [12.8, 13.2],
+            "R_4s": [12.8, 7.2],
+            "10_x": [10.5] * 10,
+        }
+
+        for rule, pattern in patterns.items():
+            with self.subTest(rule):
+                test_output = compute_control_chart(
+                    self.get_runs(self.baseline + pattern),
+                    window=0,
+                    min_runs=5
+                )
+                flagged_rules = [
+                    flagged_rule
+                    for flagged_rule in patterns
+                    if test_output[flagged_rule].iloc[-1]
+                ]
+
+                self.assertEqual(flagged_rules, [rule])
+                self.assertFalse(
+                    test_output[list(patterns)][:len(self.baseline)]
+                    .any()
+                    .any()
+                )
+
+    def test_compute_control_chart_series(self):
+        """ Test that the runs of other sequencers are not used in the
+        baseline
+        """
+
+        data = pd.concat(
+            [
+                self.get_runs(self.baseline + [14.0]),
+                self.get_runs([100.0] * 11, sequencer_id="A01303"),
+            ]
+        )
+        test_output = compute_control_chart(data, window=0, min_runs=5)
+        last_run = test_output[
+            test_output["project_name"] == "002_run10_A01295"
+        ].iloc[0]
+
+        self.assertAlmostEqual(last_run["center"], 10.0)
+        self.assertTrue(last_run["1_3s"])
+
+    def test_compute_control_chart_median_mad(self):
+        """ Test the median and median absolute deviation baseline """
+
+        test_output = compute_control_chart(
+            self.get_runs(self.baseline + [100.0, 14.0]),
+            method="median_mad",
+            window=0,
+            min_runs=5
+        )
+
+        with self.subTest("Robust to the previous outlier"):
+            self.assertAlmostEqual(test_output["center"].iloc[-1], 11.0)
+            self.assertTrue(test_output["1_3s"].iloc[-2])
+
+    def test_get_rolling_mad(self):
+        """ Test that the median absolute deviations of the windows of every
+        group are the ones computed window by window
+        """
+
+        rng = np.random.default_rng(1)
+        values = pd.Series(rng.normal(10.0, 1.0, 30))
+        values[[0, 7]] = np.nan
+        groups = [pd.Series(rng.choice(["A01295", "A01303"], 30))]
+
+        def get_mad(window_values):
+            window_values = window_values[~np.isnan(window_values)]
+            return np.median(
+                np.abs(window_values - np.median(window_values))
+            )
+
+        for window in [0, 4]:
+            with self.subTest(window=window):
+                if window:
+                    windows = values.groupby(groups).rolling(
+                        window, min_periods=3
+                    )
+                else:
+                    windows = values.groupby(groups).expanding(min_periods=3)
+
+                expected_output = (
+                    windows.apply(get_mad, raw=True)
+                    .droplevel(0)
+                    .sort_index()
+                )
+
+                pd.testing.assert_series_equal(
+                    get_rolling_mad(values, groups, window, 3),
+                    expected_output,
+                    check_names=False,
+                )
+
+    def test_get_rolling_mad_long_series(self):
+        """ Test that the windows of every previous run of a long series are
+        stacked by chunks of bounded size
+        """
+
+        rng = np.random.default_rng(1)
+        values = pd.Series(rng.normal(10.0, 1.0, 3000))
+        groups = [pd.Series(["A01295"] * 2000 + ["A01303"] * 1000)]
+        expected_output = (
+            values.groupby(groups)
+            .expanding(min_periods=5)
+            .apply(
+                lambda window_values: np.median(
+                    np.abs(window_values - np.median(window_values))
+                ),
+                raw=True,
+            )
+            .droplevel(0)
+            .sort_index()
+        )
+
+        with patch("numpy.nanmedian", wraps=np.nanmedian) as mock_nanmedian:
+            with patch(
+                "trend_monitoring.backend_utils.spc.MAD_MAX_WINDOW_VALUES",
+                100_000,
+            ):
+                test_output = get_rolling_mad(values, groups, 0, 5)
+
+        with self.subTest("Values"):
+            pd.testing.assert_series_equal(
+                test_output, expected_output, check_names=False
+            )
+
+        with self.subTest("Bounded chunks"):
+            self.assertTrue(
+                all(
+                    call.args[0].size <= 100_000
+                    for call in mock_nanmedian.call_args_list
+                )
+            )
+
+    def test_get_control_limits(self):
+        """ Test that the limits of the given runs are the baselines used by
+        the Westgard rules
+        """
+
+        chart_data = compute_control_chart(
+            self.get_runs(self.baseline + [10.0] * 7),
+            window=5,
+            min_runs=5,
+        )
+        project_names = [f"002_run{i}_A01295" for i in [2, 9, 16]]
+
+        self.assertEqual(
+            get_control_limits(chart_data, project_names),
+            [
+                {
+                    "group": "Myeloid - A01295",
+                    "project_name": project_names[1:],
+                    "center": list(chart_data["center"][[9, 16]]),
+                    "spread": [chart_data["spread"][9], None],
+                }
+            ],
+        )
+
+    def test_get_run_violations(self):
+        """ Test that the violations of the given runs are returned per
+        rule
+        """
+
+        chart_data = compute_control_chart(
+            self.get_runs(self.baseline + [14.0]), window=0, min_runs=5
+        )
+
+        self.assertEqual(
+            get_run_violations(chart_data, ["002_run10_A01295"]),
+            {
+                "1-3s: run more than 3 SD away from the baseline": [
+                    "002_run10_A01295 (Myeloid - A01295)"
+                ]
+            }
+        )
+        self.assertEqual(
+            get_run_violations(chart_data, ["002_run9_A01295"]), {}
+        )
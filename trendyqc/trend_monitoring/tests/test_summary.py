@@ -0,0 +1,241 @@
+import datetime
+import json
+
+from django.test import TestCase
+import pandas as pd
+
+from trend_monitoring.backend_utils.plot import format_summary_for_plotly_js
+from trend_monitoring.backend_utils.summary import (
+    describe_values,
+    get_run_summary_data,
+    update_run_metric_summaries,
+)
+from trend_monitoring.models.bam_qc import VerifyBAMid_data
+from trend_monitoring.models.metadata import Report, Report_Sample, Sample
+from trend_monitoring.models.summary import Run_metric_summary
+from .test_plotting import create_lane_report_sample
+
+
+def create_verifybamid_sample(report, sample_id, freemix):
+    """Create a report sample with VerifyBAMid data
+
+    Args:
+        report (Report): Report object
+        sample_id (str): Sample id
+        freemix (float): Freemix value, no VerifyBAMid data is created if None
+
+    Returns:
+        Report_Sample: Report sample object
+    """
+
+    verifybamid = None
+
+    if freemix is not None:
+        verifybamid = VerifyBAMid_data.objects.create(
+            rg="RG",
+            nb_snps=1,
+            nb_reads=1,
+            avg_dp=1.0,
+            freemix=freemix,
+            freelk1=1.0,
+            freelk0=1.0,
+        )
+
+    return Report_Sample.objects.create(
+        assay="Cancer Endocrine Neurology",
+        report=report,
+        sample=Sample.objects.create(sample_id=sample_id),
+        verifybamid_data=verifybamid,
+    )
+
+
+class TestDescribeValues(TestCase):
+    def test_describe_values(self):
+        """Test the statistics computed for a series with a missing value"""
+
+        test_output = describe_values(pd.Series([1, 2, 3, 4, 5, None]))
+        expected_output = {
+            "n": 5,
+            "nb_null": 1,
+            "min": 1.0,
+            "q1": 2.0,
+            "median": 3.0,
+            "q3": 4.0,
+            "max": 5.0,
+            "mean": 3.0,
+            "stdev": pd.Series([1, 2, 3, 4, 5]).std(),
+        }
+        self.assertEqual(test_output, expected_output)
+
+    def test_describe_values_single_value(self):
+        """Test that the standard deviation of one value is stored as None"""
+
+        test_output = describe_values(pd.Series([1.0]))
+        self.assertIsNone(test_output["stdev"])
+
+    def test_describe_values_no_value(self):
+        """Test that a series with no value returns None"""
+
+        self.assertIsNone(describe_values(pd.Series([None, None])))
+
+
+class TestUpdateRunMetricSummaries(TestCase):
+    def setUp(self):
+        self.report = Report.objects.create(
+            name="Report1",
+            project_id="Project1",
+            project_name="002_240101_A01295_0001_CEN",
+            dnanexus_file_id="File1",
+            sequencer_id="A01295",
+            date=datetime.date(2024, 1, 1),
+            job_date=datetime.datetime(
+                2024, 1, 1, tzinfo=datetime.timezone.utc
+            ),
+        )
+
+        for i, freemix in enumerate([0.01, 0.02, 0.03, None]):
+            create_verifybamid_sample(self.report, f"Sample{i}", freemix)
+
+    def test_update_run_metric_summaries(self):
+        """Test that the summary of a metric is created for the report"""
+
+        update_run_metric_summaries(self.report)
+        summary = Run_metric_summary.objects.get(
+            report=self.report, metric="verifybamid_data|freemix"
+        )
+
+        with self.subTest("Grouping columns"):
+            self.assertEqual(summary.assay, "Cancer Endocrine Neurology")
+            self.assertEqual(summary.sequencer_id, "A01295")
+            self.assertEqual(summary.lane, "")
+
+        with self.subTest("Statistics"):
+            self.assertEqual(summary.n, 3)
+            self.assertEqual(summary.nb_null, 1)
+            self.assertAlmostEqual(summary.median, 0.02)
+            self.assertAlmostEqual(summary.min, 0.01)
+            self.assertAlmostEqual(summary.max, 0.03)
+
+    def test_update_run_metric_summaries_replace(self):
+        """Test that rebuilding the summaries doesn't duplicate them"""
+
+        first_count = update_run_metric_summaries(self.report)
+        second_count = update_run_metric_summaries(self.report)
+
+        self.assertEqual(first_count, second_count)
+        self.assertEqual(
+            Run_metric_summary.objects.filter(report=self.report).count(),
+            second_count,
+        )
+
+    def test_get_run_summary_data(self):
+        """Test getting the summaries using the subset of the form"""
+
+        update_run_metric_summaries(self.report)
+        test_output = get_run_summary_data(
+            {"assay_select": ["Cancer Endocrine Neurology"]},
+            "verifybamid_data|freemix",
+        )
+
+        self.assertEqual(
+            list(test_output["project_name"]), ["002_240101_A01295_0001_CEN"]
+        )
+        self.assertEqual(list(test_output["n"]), [3])
+
+
+class TestUpdateRunMetricSummariesLanes(TestCase):
+    def setUp(self):
+        self.report = create_lane_report_sample().report
+
+    def test_update_run_metric_summaries_lanes(self):
+        """Test that a summary is created for the combined data and for every
+        lane
+        """
+
+        update_run_metric_summaries(self.report)
+        summaries = {
+            summary.lane: summary.median
+            for summary in Run_metric_summary.objects.filter(
+                metric="read_data|total_sequences"
+            )
+        }
+
+        self.assertEqual(
+            summaries, {"": 3.5, "L001": 1.5, "L002": 3.5, "L003": 5.5}
+        )
+
+    def test_format_summary_for_plotly_js_lanes(self):
+        """Test that the lane summaries are displayed as hidden boxes grouped
+        with the box of the combined lanes
+        """
+
+        update_run_metric_summaries(self.report)
+        summary_data = get_run_summary_data(
+            {"assay_select": ["Cancer Endocrine Neurology"]},
+            "read_data|total_sequences",
+        )
+        traces, is_grouped = format_summary_for_plotly_js(summary_data)
+        traces = json.loads(traces)
+
+        with self.subTest("Grouping"):
+            self.assertEqual(is_grouped, json.dumps(True))
+
+        with self.subTest("Trace names"):
+            self.assertEqual(
+                [trace["name"] for trace in traces],
+                [
+                    "Cancer Endocrine Neurology - A01295",
+                    "First lane",
+                    "Second lane",
+                    "Lane 3",
+                ],
+            )
+
+        with self.subTest("Lane statistics"):
+            self.assertEqual(
+                [trace["median"] for trace in traces],
+                [[3.5], [1.5], [3.5], [5.5]],
+            )
+
+        with self.subTest("Hidden lanes"):
+            self.assertEqual(
+                [trace["visible"] for trace in traces],
+                [True, "legendonly", "legendonly", "legendonly"],
+            )
+
+
+class TestFormatSummaryForPlotlyJS(TestCase):
+    def test_format_summary_for_plotly_js(self):
+        """Test that a box is created per run using the statistics"""
+
+        test_input = pd.DataFrame(
+            {
+                "date": [datetime.date(2024, 6, 24)],
+                "project_name": ["240624_Project1"],
+                "assay": ["Myeloid"],
+                "sequencer_id": ["Sequencer1"],
+                "n": [3],
+                "min": [1.0],
+                "q1": [1.5],
+                "median": [2.0],
+                "q3": [2.5],
+                "max": [3.0],
+                "mean": [2.0],
+                "stdev": [1.0],
+            }
+        )
+
+        traces, is_grouped = format_summary_for_plotly_js(test_input)
+        trace = json.loads(traces)[0]
+
+        with self.subTest("Grouping"):
+            self.assertEqual(is_grouped, json.dumps(False))
+
+        with self.subTest("Box statistics"):
+            self.assertEqual(
+                trace["x"], [["Jun. 2024"], ["240624_Project1"]]
+            )
+            self.assertEqual(trace["median"], [2.0])
+            self.assertEqual(trace["lowerfence"], [1.0])
+            self.assertEqual(trace["upperfence"], [3.0])
+            self.assertNotIn("y", trace)
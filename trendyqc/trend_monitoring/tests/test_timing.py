@@ -0,0 +1,154 @@
+import datetime
+
+from django.test import TestCase, override_settings
+
+from trend_monitoring.backend_utils.links import get_plot_token
+from trend_monitoring.backend_utils.timing import (
+    REQUEST_TIMINGS,
+    get_request_aggregates,
+    new_request_timings,
+    reset_request_aggregates,
+    timed,
+)
+from trend_monitoring.models.metadata import Report
+from .test_views import TEST_CACHES
+
+
+class TestTimed(TestCase):
+    def test_timed_request(self):
+        """Test that the time of the block is added to the section of the
+        current request
+        """
+
+        timings = new_request_timings()
+        token = REQUEST_TIMINGS.set(timings)
+
+        try:
+            with timed("pandas"):
+                sum(range(1000))
+        finally:
+            REQUEST_TIMINGS.reset(token)
+
+        self.assertGreater(timings["pandas"], 0)
+        self.assertEqual(timings["traces"], 0)
+
+    def test_timed_no_request(self):
+        """Test that timing a block outside of a request does nothing"""
+
+        with timed("pandas"):
+            pass
+
+        self.assertIsNone(REQUEST_TIMINGS.get())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestRequestTimingMiddleware(TestCase):
+    def setUp(self):
+        reset_request_aggregates()
+
+    def test_request_timings(self):
+        """Test that the requests are aggregated by view and action with
+        their SQL queries
+        """
+
+        self.client.get("/trendyqc/")
+        self.client.get("/trendyqc/")
+        self.client.post("/trendyqc/", {"save_filter": "Save filter"})
+        aggregates = get_request_aggregates()
+
+        with self.subTest("Labels"):
+            self.assertEqual(
+                sorted(aggregates),
+                ["Dashboard GET", "Dashboard POST save_filter"],
+            )
+
+        with self.subTest("Dashboard GET"):
+            self.assertEqual(aggregates["Dashboard GET"]["requests"], 2)
+            self.assertGreater(aggregates["Dashboard GET"]["sql_queries"], 0)
+            self.assertGreater(aggregates["Dashboard GET"]["wall_time"], 0)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD=0)
+    def test_slow_request(self):
+        """Test that slow requests are logged with their filter"""
+
+        token = get_plot_token(
+            {
+                "assay_select": ["Myeloid"],
+                "metrics_y": ["verifybamid_data|freemix"],
+            }
+        )
+
+        with self.assertLogs("basic", level="WARNING") as logs:
+            self.client.get(f"/trendyqc/api/timings/?f={token}")
+
+        self.assertIn("Slow request Request_timings GET", logs.output[0])
+        self.assertIn("'assay_select': ['Myeloid']", logs.output[0])
+
+    def test_request_timings_api(self):
+        """Test that the aggregates are exposed as JSON"""
+
+        self.client.get("/trendyqc/")
+        response = self.client.get("/trendyqc/api/timings/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["Dashboard GET"]["requests"], 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestMetrics(TestCase):
+    def test_metrics(self):
+        """Test that the request, plot cache and database metrics are exposed
+        in the Prometheus format
+        """
+
+        self.client.get("/trendyqc/")
+        response = self.client.get("/trendyqc/metrics")
+        content = response.content.decode()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+        for metric in [
+            'trendyqc_request_duration_seconds_count{action="",method="GET",'
+            'view="Dashboard"}',
+            'trendyqc_request_sql_queries_total{action="",method="GET",'
+            'view="Dashboard"}',
+            'trendyqc_table_rows{table="report"}',
+        ]:
+            with self.subTest(metric):
+                self.assertIn(metric, content)
+
+    def test_metrics_last_import(self):
+        """Test that the time of the latest import is read from the import
+        date of the reports
+        """
+
+        with self.subTest("No imported report"):
+            response = self.client.get("/trendyqc/metrics")
+            self.assertNotIn(
+                "trendyqc_last_import_timestamp_seconds",
+                response.content.decode(),
+            )
+
+        report = Report.objects.create(
+            name="Report1",
+            project_id="Project1",
+            project_name="002_240101_A01295_0001_CEN",
+            dnanexus_file_id="File1",
+            sequencer_id="A01295",
+            date=datetime.date(2024, 1, 1),
+            job_date=datetime.datetime(
+                2024, 1, 1, tzinfo=datetime.timezone.utc
+            ),
+        )
+
+        with self.subTest("Imported report"):
+            response = self.client.get("/trendyqc/metrics")
+            value = next(
+                line.split()[1]
+                for line in response.content.decode().splitlines()
+                if line.startswith("trendyqc_last_import_timestamp_seconds ")
+            )
+            self.assertAlmostEqual(
+                float(value), report.import_date.timestamp(), places=3
+            )
@@ -1,13 +1,49 @@
+import datetime
 import json
+from urllib.parse import parse_qs, urlparse
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.test import TestCase, override_settings
 from unittest.mock import patch
+import pandas as pd
 
+from trend_monitoring.backend_utils.links import (
+    get_plot_form,
+    get_plot_token,
+    get_plot_url,
+)
 from trend_monitoring.models.filters import Filter
 from trend_monitoring.models.metadata import Report
 from trend_monitoring.tables import ReportTable
 
+# the plot cache is isolated from the one used by the app to not reuse plots
+# from other runs
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "plot": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test_views",
+    },
+}
 
+
+def get_redirect_form(response):
+    """Get the form data of the plot token of a redirection to the plot page
+
+    Args:
+        response (HttpResponse): Redirect response
+
+    Returns:
+        dict: Form data of the plot token
+    """
+
+    return get_plot_form(parse_qs(urlparse(response.url).query)["f"][0])
+
+
+@override_settings(CACHES=TEST_CACHES)
 class TestDashboard(TestCase):
     """Suite of tests to test the backend functionality"""
 
@@ -80,7 +116,33 @@ class TestDashboard(TestCase):
             "plot": ["Plot"],
         }
         response = self.client.post("/trendyqc/", post_data)
-        self.assertRedirects(response, "/trendyqc/plot/")
+        form = get_redirect_form(response)
+
+        self.assertRedirects(response, get_plot_url(form))
+        self.assertEqual(form["metrics_y"], ["read_data|avg_length"])
+
+    def test_dashboard_post_plot_scatter(self):
+        """Test dashboard post request for a metric vs metric plot.
+        Check if the display names of both metrics are replaced by the model
+        names.
+        """
+
+        post_data = {
+            "assay_select": ["Cancer Endocrine Neurology"],
+            "metrics_x": ["Picard - HS metrics|fold_80_base_penalty"],
+            "metrics_y": ["Picard - HS metrics|mean_target_coverage"],
+            "plot": ["Plot"],
+        }
+        response = self.client.post("/trendyqc/", post_data)
+        form = get_redirect_form(response)
+
+        self.assertRedirects(
+            response, get_plot_url(form), fetch_redirect_response=False
+        )
+        self.assertEqual(form["metrics_x"], ["hs_metrics|fold_80_base_penalty"])
+        self.assertEqual(
+            form["metrics_y"], ["hs_metrics|mean_target_coverage"]
+        )
 
     def test_dashboard_post_plot_filter(self):
         """Test dashboard post request for plotting using filter.
@@ -96,7 +158,11 @@ class TestDashboard(TestCase):
             "filter_use": Filter.objects.all()[0].id,
         }
         response = self.client.post("/trendyqc/", post_data)
-        self.assertRedirects(response, "/trendyqc/plot/")
+        self.assertRedirects(
+            response,
+            get_plot_url(json.loads(Filter.objects.all()[0].content)),
+            fetch_redirect_response=False,
+        )
 
     def test_dashboard_post_save_filter(self):
         """Test dashboard post request for saving filter.
@@ -161,6 +227,7 @@ class TestDashboard(TestCase):
                 Filter.objects.get(id=filter_id_to_delete)
 
 
+@override_settings(CACHES=TEST_CACHES)
 class TestPlot(TestCase):
     """Suite of tests for the Plot view"""
 
@@ -174,11 +241,12 @@ class TestPlot(TestCase):
             "skipped_samples",
         ]
 
-    @patch("trend_monitoring.views.format_data_for_plotly_js")
-    @patch("trend_monitoring.views.get_data_for_plotting")
-    @patch("trend_monitoring.views.get_subset_queryset")
+    @patch("trend_monitoring.backend_utils.payload.format_data_for_plotly_js")
+    @patch("trend_monitoring.backend_utils.payload.get_data_for_plotting")
+    @patch("trend_monitoring.backend_utils.payload.get_subset_runs")
+    @patch("trend_monitoring.backend_utils.payload.get_subset_queryset")
     def test_plot_get_with_filled_form_end_to_end(
-        self, mock_queryset, mock_plotting_data, mock_plotly_js
+        self, mock_queryset, mock_runs, mock_plotting_data, mock_plotly_js
     ):
         """Test for GET request in Plot class view.
         This test contains a correct filled form to reach the final render
@@ -190,18 +258,18 @@ class TestPlot(TestCase):
         Args:
             mock_filter_data (Mock): Mock for the prepare_filter_data
             mock_queryset (Mock): Mock for the get_subset_queryset
+            mock_runs (Mock): Mock for the get_subset_runs
             mock_plotting_data (Mock): Mock for the get_data_for_plotting
             mock_plotly_js (Mock): Mock for the format_data_for_plotly_js
         """
 
-        # I use the session to send data to the Plot view, as posting using the
-        # normal URL dispatcher with the amount of parameters i have, sounds
-        # like a nightmare
-        session = self.client.session
-        session["form"] = {"assay_select": ["v1"], "metrics_y": ["v2"]}
-        session.save()
+        # the form data is sent to the Plot view in the plot token
+        url = get_plot_url({"assay_select": ["v1"], "metrics_y": ["v2"]})
 
         mock_queryset.return_value = "not None"
+        mock_runs.return_value = pd.DataFrame(
+            {"project_name": ["project1"], "date": [datetime.date(2023, 5, 23)]}
+        )
         mock_plotting_data.return_value = (["mock dataframe"], {}, {})
         mock_plotly_js.return_value = (
             [
@@ -262,7 +330,7 @@ class TestPlot(TestCase):
             "skipped_samples": {},
         }
 
-        response = self.client.get("/trendyqc/plot/", follow=True)
+        response = self.client.get(url, follow=True)
 
         with self.subTest("Status code test"):
             self.assertEqual(response.status_code, 200)
@@ -307,10 +375,6 @@ class TestPlot(TestCase):
         context data.
         """
 
-        session = self.client.session
-        self.client.session["form"] = None
-        session.save()
-
         response = self.client.get("/trendyqc/plot/")
 
         with self.subTest("Status code test"):
@@ -339,3 +403,624 @@ class TestPlot(TestCase):
                             flag_to_test_presence = True
 
             self.assertEqual(flag_to_test_presence, False)
+
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_get_scatter(self, mock_payload):
+        """Test for GET request in Plot class view for a downsampled metric vs
+        metric plot.
+        """
+
+        url = get_plot_url(
+            {
+                "assay_select": ["v1"],
+                "metrics_x": ["v2"],
+                "metrics_y": ["v3"],
+            }
+        )
+
+        mock_payload.return_value = {
+            "status": "ok",
+            "plot": "[]",
+            "is_grouped": "false",
+            "skipped_projects": {},
+            "skipped_samples": {},
+            "nb_summary_runs": None,
+            "bucket_size": None,
+            "is_scatter": True,
+            "nb_points": 100,
+            "nb_displayed_points": 10,
+            "warning": None,
+            "error": None,
+        }
+
+        response = self.client.get(url)
+
+        with self.subTest("Axes"):
+            self.assertTrue(response.context["is_scatter"])
+            self.assertEqual(response.context["x_axis"], "v2")
+            self.assertEqual(response.context["y_axis"], "v3")
+
+        with self.subTest("Downsampling message"):
+            self.assertIn(
+                "100 samples selected, 10 points are displayed",
+                [str(message) for message in response.context["messages"]][0],
+            )
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_get_etag(self, mock_payload):
+        """Test that the plot page is revalidated using its ETag without
+        building the plot again
+        """
+
+        url = get_plot_url(
+            {"assay_select": ["v1"], "metrics_y": ["verifybamid_data|freemix"]}
+        )
+        mock_payload.return_value = {
+            "status": "ok",
+            "plot": "[]",
+            "is_grouped": "false",
+            "skipped_projects": {},
+            "skipped_samples": {},
+            "nb_summary_runs": None,
+            "bucket_size": None,
+            "warning": None,
+            "error": None,
+        }
+
+        # the CSRF cookie of the forms is set by the dashboard page
+        self.client.get("/trendyqc/")
+        response = self.client.get(url)
+
+        with self.subTest("Caching headers"):
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("ETag", response)
+            self.assertIn("private", response["Cache-Control"])
+            self.assertIn("no-cache", response["Cache-Control"])
+
+        with self.subTest("Not modified"):
+            response = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(mock_payload.call_count, 1)
+
+        with self.subTest("No session"):
+            self.assertNotIn("form", self.client.session)
+
+    def test_plot_get_invalid_token(self):
+        """Test that a tampered plot link displays an error message"""
+
+        url = get_plot_url({"assay_select": ["v1"], "metrics_y": ["v2"]})
+        response = self.client.get(f"{url}x")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            "Invalid plot link",
+            [str(message) for message in response.context["messages"]][0],
+        )
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_get_etag_other_user(self, mock_payload):
+        """Test that the plot page of a user is not revalidated for another
+        user logged in on the same browser
+        """
+
+        url = get_plot_url(
+            {"assay_select": ["v1"], "metrics_y": ["verifybamid_data|freemix"]}
+        )
+        mock_payload.return_value = {
+            "status": "ok",
+            "plot": "[]",
+            "is_grouped": "false",
+            "skipped_projects": {},
+            "skipped_samples": {},
+            "nb_summary_runs": None,
+            "bucket_size": None,
+            "warning": None,
+            "error": None,
+        }
+
+        self.client.force_login(User.objects.create(username="user_a"))
+        response = self.client.get(url)
+
+        self.client.force_login(User.objects.create(username="user_b"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "user_b")
+
+    def test_plot_post_save_filter_invalid_token(self):
+        """Test that saving the filter of a tampered plot link displays an
+        error message without saving the filter
+        """
+
+        self.client.force_login(User.objects.create(username="user_a"))
+        response = self.client.post(
+            "/trendyqc/plot/", {"save_filter": "Filter", "f": "bad"}
+        )
+
+        with self.subTest("Redirection"):
+            self.assertRedirects(
+                response, "/trendyqc/plot/", fetch_redirect_response=False
+            )
+
+        with self.subTest("Message"):
+            messages = get_messages(response.wsgi_request)
+            self.assertEqual(
+                [str(message) for message in messages], ["Invalid plot link"]
+            )
+
+        with self.subTest("Filter"):
+            self.assertFalse(Filter.objects.exists())
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestPlotDrillDown(TestCase):
+    """Suite of tests for the drill down of a bucketed plot"""
+
+    def setUp(self):
+        self.form = {
+            "assay_select": ["Myeloid"],
+            "days_back": ["365"],
+            "metrics_y": ["verifybamid_data|freemix"],
+        }
+
+    def test_plot_post_drill_down(self):
+        """Test that the form is restricted to the dates of the bucket and
+        displays every run
+        """
+
+        response = self.client.post(
+            "/trendyqc/plot/",
+            {
+                "drill_down": "2024Q1",
+                "bucket_size": "quarter",
+                "f": get_plot_token(self.form),
+            },
+        )
+
+        with self.subTest("Redirection"):
+            self.assertRedirects(
+                response,
+                get_plot_url(get_redirect_form(response)),
+                fetch_redirect_response=False,
+            )
+
+        with self.subTest("Form"):
+            self.assertEqual(
+                get_redirect_form(response),
+                {
+                    "assay_select": ["Myeloid"],
+                    "metrics_y": ["verifybamid_data|freemix"],
+                    "date_start": ["2024-01-01"],
+                    "date_end": ["2024-03-31"],
+                    "bucket": ["run"],
+                },
+            )
+
+    def test_plot_post_drill_down_unknown_bucket_size(self):
+        """Test that an unknown bucket size doesn't change the form"""
+
+        response = self.client.post(
+            "/trendyqc/plot/",
+            {
+                "drill_down": "2024Q1",
+                "bucket_size": "year",
+                "f": get_plot_token(self.form),
+            },
+        )
+
+        self.assertRedirects(
+            response, get_plot_url(self.form), fetch_redirect_response=False
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestPlotData(TestCase):
+    """Suite of tests for the plot data API"""
+
+    def setUp(self):
+        self.url = (
+            "/trendyqc/api/plot/?assay_select=Myeloid"
+            "&metrics_y=Verify BAMid|freemix"
+        )
+        self.payload = {
+            "status": "ok",
+            "plot": json.dumps([{"x0": "project1", "y": [0.1, 0.2]}]),
+            "is_grouped": json.dumps(False),
+            "skipped_projects": {},
+            "skipped_samples": {},
+            "nb_summary_runs": None,
+            "warning": None,
+            "error": None,
+        }
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_data_get(self, mock_payload):
+        """Test that the plot data is returned as JSON with an ETag
+
+        Args:
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_payload.return_value = self.payload
+        response = self.client.get(self.url)
+
+        with self.subTest("Status code test"):
+            self.assertEqual(response.status_code, 200)
+
+        with self.subTest("ETag test"):
+            self.assertTrue(response.has_header("ETag"))
+            self.assertFalse(response["ETag"].startswith("W/"))
+
+        with self.subTest("Content test"):
+            data = response.json()
+            self.assertEqual(
+                data["plot"], [{"x0": "project1", "y": [0.1, 0.2]}]
+            )
+            self.assertEqual(data["is_grouped"], False)
+
+        with self.subTest("Form cleaning test"):
+            self.assertEqual(
+                mock_payload.call_args.args[0]["metrics_y"],
+                ["verifybamid_data|freemix"],
+            )
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_data_not_modified(self, mock_payload):
+        """Test that a repeat request with the ETag gets a 304 response
+        without computing the plot data
+
+        Args:
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_payload.return_value = self.payload
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(mock_payload.call_count, 1)
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_data_not_modified_cache_buster(self, mock_payload):
+        """Test that query parameters which are not filters don't change the
+        ETag
+
+        Args:
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_payload.return_value = self.payload
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(
+            f"{self.url}&_=123&profile=1", HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_data_new_report(self, mock_payload):
+        """Test that importing a new report changes the ETag
+
+        Args:
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_payload.return_value = self.payload
+        etag = self.client.get(self.url)["ETag"]
+
+        Report.objects.create(
+            name="Report1",
+            project_id="Project1",
+            project_name="002_240101_A01295_0001_CEN",
+            dnanexus_file_id="File1",
+            sequencer_id="A01295",
+            date="2024-01-01",
+            job_date="2024-01-01T00:00:00Z",
+        )
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_plot_data_invalid_form(self):
+        """Test that a filter without Y-axis metric returns a 400 response"""
+
+        response = self.client.get("/trendyqc/api/plot/?assay_select=Myeloid")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("metrics_y", response.json()["errors"])
+
+    def test_plot_data_scatter_multiple_y_metrics(self):
+        """Test that a scatter plot with several Y-axis metrics returns a 400
+        response instead of dropping the other metrics
+        """
+
+        response = self.client.get(
+            f"{self.url}&metrics_y=Verify BAMid|avg_dp"
+            "&metrics_x=FastQC|total_sequences"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("metrics_y", response.json()["errors"])
+
+
+@override_settings(CACHES=TEST_CACHES, PLOT_DETAIL_MAX_RUNS=2)
+class TestPlotDetail(TestCase):
+    """Suite of tests for the sample values API of the plot page"""
+
+    def setUp(self):
+        self.token = get_plot_token(
+            {
+                "assay_select": ["Myeloid"],
+                "days_back": ["365"],
+                "metrics_y": ["verifybamid_data|freemix"],
+            }
+        )
+
+        self.payload = {
+            "status": "ok",
+            "plot": json.dumps([{"x0": "project1", "y": [0.1, 0.2]}]),
+            "is_grouped": json.dumps(False),
+            "skipped_projects": {},
+            "skipped_samples": {},
+            "nb_summary_runs": None,
+            "warning": None,
+            "error": None,
+        }
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_detail_buckets(self, mock_payload):
+        """Test that the plot of the visible buckets displays every run of
+        their dates
+
+        Args:
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_payload.return_value = self.payload
+        response = self.client.get(
+            f"/trendyqc/api/plot/detail/?f={self.token}&bucket_size=month"
+            "&bucket_start=2024-01&bucket_end=2024-02"
+        )
+
+        with self.subTest("Status code test"):
+            self.assertEqual(response.status_code, 200)
+
+        with self.subTest("Content test"):
+            self.assertEqual(
+                response.json()["plot"], [{"x0": "project1", "y": [0.1, 0.2]}]
+            )
+
+        with self.subTest("Form test"):
+            self.assertEqual(
+                mock_payload.call_args.args[0],
+                {
+                    "assay_select": ["Myeloid"],
+                    "metrics_y": ["verifybamid_data|freemix"],
+                    "date_start": ["2024-01-01"],
+                    "date_end": ["2024-02-29"],
+                    "bucket": ["run"],
+                },
+            )
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    def test_plot_detail_runs(self, mock_payload):
+        """Test that the plot of the visible runs of a summary plot displays
+        every sample
+
+        Args:
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_payload.return_value = self.payload
+        response = self.client.get(
+            f"/trendyqc/api/plot/detail/?f={self.token}&run_select=Project2"
+            "&run_select=Project1"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            mock_payload.call_args.args[0]["run_select"],
+            ["Project1", "Project2"],
+        )
+
+    @patch("trend_monitoring.views.get_plot_payload")
+    @patch("trend_monitoring.views.get_subset_runs")
+    def test_plot_detail_too_many_runs(self, mock_runs, mock_payload):
+        """Test that the sample values are not loaded for more runs than
+        PLOT_DETAIL_MAX_RUNS
+
+        Args:
+            mock_runs (Mock): Mock for the get_subset_runs
+            mock_payload (Mock): Mock for the get_plot_payload
+        """
+
+        mock_runs.return_value = pd.DataFrame(
+            {"project_name": ["Project1", "Project2", "Project3"]}
+        )
+        response = self.client.get(
+            f"/trendyqc/api/plot/detail/?f={self.token}&bucket_size=quarter"
+            "&bucket_start=2024Q1&bucket_end=2024Q2"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        mock_payload.assert_not_called()
+
+    def test_plot_detail_invalid_parameters(self):
+        """Test that unknown buckets or missing parameters return a 400
+        response
+        """
+
+        for params in [
+            "",
+            "&bucket_size=year&bucket_start=2024&bucket_end=2024",
+            "&bucket_size=month&bucket_start=Jan&bucket_end=2024-02",
+        ]:
+            with self.subTest(params):
+                response = self.client.get(
+                    f"/trendyqc/api/plot/detail/?f={self.token}{params}"
+                )
+                self.assertEqual(response.status_code, 400)
+
+    def test_plot_detail_no_plot(self):
+        """Test that a 400 response is returned without plot token or with
+        an invalid one
+        """
+
+        for params in ["", f"f={self.token}x&"]:
+            with self.subTest(params):
+                response = self.client.get(
+                    f"/trendyqc/api/plot/detail/?{params}run_select=Project1"
+                )
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestPlotSamples(TestCase):
+    """Suite of tests for the samples API of the plot page"""
+
+    @patch("trend_monitoring.views.get_run_sample_data")
+    def test_plot_samples_get(self, mock_samples):
+        """Test that the samples of the box are returned as JSON
+
+        Args:
+            mock_samples (Mock): Mock for the get_run_sample_data
+        """
+
+        mock_samples.return_value = {
+            "project_name": "Project1",
+            "metric": "read_data|total_sequences",
+            "lane": "L001",
+            "samples": [
+                {
+                    "sample_id": "Sample1",
+                    "assay": "Myeloid",
+                    "value": 1.0,
+                    "metrics": {},
+                }
+            ],
+        }
+
+        response = self.client.get(
+            "/trendyqc/api/plot/samples/?project_name=Project1"
+            "&metric=read_data|total_sequences&lane=L001"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), mock_samples.return_value)
+        mock_samples.assert_called_once_with(
+            "Project1", "read_data|total_sequences", "L001"
+        )
+
+    def test_plot_samples_invalid_parameters(self):
+        """Test that a missing run or an unknown metric return a 400
+        response
+        """
+
+        for params in [
+            "?metric=verifybamid_data|freemix",
+            "?project_name=Project1&metric=verifybamid_data|rg",
+        ]:
+            with self.subTest(params):
+                response = self.client.get(f"/trendyqc/api/plot/samples/{params}")
+                self.assertEqual(response.status_code, 400)
+
+    def test_plot_samples_no_data(self):
+        """Test that a run without samples returns a 404 response"""
+
+        response = self.client.get(
+            "/trendyqc/api/plot/samples/?project_name=Project1"
+            "&metric=verifybamid_data|freemix"
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TestExport(TestCase):
+    """Suite of tests for the export of the values of the plots"""
+
+    def setUp(self):
+        self.token = get_plot_token(
+            {
+                "assay_select": ["Myeloid"],
+                "days_back": ["365"],
+                "metrics_y": ["verifybamid_data|freemix"],
+            }
+        )
+
+    @patch("trend_monitoring.views.stream_export")
+    def test_export_plot_token(self, mock_export):
+        """Test that the plot of the plot token is streamed as CSV
+
+        Args:
+            mock_export (Mock): Mock for the stream_export
+        """
+
+        mock_export.return_value = iter(["sample_id\n", "sample1\n"])
+        response = self.client.get(f"/trendyqc/api/export/csv/?f={self.token}")
+
+        with self.subTest("Status code test"):
+            self.assertEqual(response.status_code, 200)
+
+        with self.subTest("Streamed content"):
+            self.assertTrue(response.streaming)
+            self.assertEqual(
+                b"".join(response.streaming_content),
+                b"sample_id\nsample1\n",
+            )
+
+        with self.subTest("Attachment"):
+            self.assertEqual(response["Content-Type"], "text/csv")
+            self.assertIn("attachment", response["Content-Disposition"])
+
+        self.assertEqual(
+            mock_export.call_args.args[1:],
+            (["verifybamid_data|freemix"], "csv"),
+        )
+
+    @patch("trend_monitoring.views.stream_export")
+    def test_export_query_parameters(self, mock_export):
+        """Test that the filter of the query parameters is used without plot
+        token
+
+        Args:
+            mock_export (Mock): Mock for the stream_export
+        """
+
+        mock_export.return_value = iter([])
+        response = self.client.get(
+            "/trendyqc/api/export/csv/?assay_select=Myeloid"
+            "&metrics_y=Verify BAMid|freemix&metrics_x=FastQC|total_sequences"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            mock_export.call_args.args[1],
+            ["verifybamid_data|freemix", "read_data|total_sequences"],
+        )
+
+    def test_export_invalid_requests(self):
+        """Test that unknown formats, invalid filters and invalid plot tokens
+        return a 400 response
+        """
+
+        with self.subTest("Unknown format"):
+            response = self.client.get("/trendyqc/api/export/xlsx/")
+            self.assertEqual(response.status_code, 400)
+
+        with self.subTest("Invalid filter"):
+            response = self.client.get(
+                "/trendyqc/api/export/csv/?assay_select=Myeloid"
+            )
+            self.assertEqual(response.status_code, 400)
+
+        with self.subTest("Invalid plot token"):
+            response = self.client.get(
+                f"/trendyqc/api/export/csv/?f={self.token}x"
+            )
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,208 @@
+from io import StringIO
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from trend_monitoring.backend_utils.cache import get_cache_key, get_plot_cache
+from trend_monitoring.management.commands.warm_plot_cache import (
+    warm_plot_in_thread,
+)
+from trend_monitoring.models.filters import Filter
+from .fixtures import create_run
+
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "plot": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "test_warm_plot_cache",
+    },
+}
+
+
+# the plots are built by the threads of the pool which use their own
+# database connections i.e. the data needs to be committed
+@override_settings(CACHES=TEST_CACHES)
+class TestWarmPlotCache(TransactionTestCase):
+    def setUp(self):
+        for run_nb in range(2):
+            create_run(run_nb, [0.01, 0.02, 0.03])
+
+        get_plot_cache().clear()
+        self.form = {
+            "assay_select": ["Cancer Endocrine Neurology"],
+            "days_back": ["3650"],
+            "metrics_y": ["verifybamid_data|freemix"],
+        }
+
+        # the same plot saved by 2 users, the automatic bucket size is the
+        # default i.e. both filters have the same cache key
+        Filter.objects.create(
+            name="CEN", user="user1", content=json.dumps(self.form)
+        )
+        Filter.objects.create(
+            name="CEN",
+            user="user2",
+            content=json.dumps({**self.form, "bucket": ["auto"]}),
+        )
+        Filter.objects.create(name="Old filter", user="user1", content="{")
+
+    def warm_plot_cache(self, **options):
+        """ Run the command and get the results of its JSON output
+
+        Returns:
+            dict: Wall time and results of every plot
+        """
+
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            call_command(
+                "warm_plot_cache",
+                output=output.name,
+                stdout=StringIO(),
+                **options,
+            )
+            return json.load(output)
+
+    def get_statuses(self, **options):
+        """ Run the command and get the status of every plot
+
+        Returns:
+            dict: Dict with the tuple of the filter names as key and the
+            status of the plot as value
+        """
+
+        return {
+            tuple(result["filters"]): result["status"]
+            for result in self.warm_plot_cache(**options)["plots"]
+        }
+
+    def test_warm_plot_cache(self):
+        """ Test that the plot of the saved filters is built once and stored
+        in the plot cache with its timings
+        """
+
+        test_output = self.warm_plot_cache(workers=2)
+        results = {
+            tuple(result["filters"]): result
+            for result in test_output["plots"]
+        }
+
+        with self.subTest("Plots"):
+            self.assertEqual(
+                set(results),
+                {("CEN (user1)", "CEN (user2)"), ("Old filter (user1)",)},
+            )
+
+        with self.subTest("Cached"):
+            self.assertEqual(
+                results[("CEN (user1)", "CEN (user2)")]["status"], "cached"
+            )
+            self.assertTrue(get_plot_cache().has_key(get_cache_key(self.form)))
+
+        with self.subTest("Timings"):
+            self.assertGreater(
+                results[("CEN (user1)", "CEN (user2)")]["sql_queries"], 0
+            )
+
+        with self.subTest("Invalid filter"):
+            self.assertEqual(
+                results[("Old filter (user1)",)]["status"], "invalid"
+            )
+
+    def test_warm_plot_cache_already_cached(self):
+        """ Test that the cached plots are not built again """
+
+        self.warm_plot_cache(workers=1, filters=["CEN"])
+        test_output = self.warm_plot_cache(workers=1, filters=["CEN"])
+
+        self.assertEqual(
+            test_output["plots"],
+            [
+                {
+                    "filters": ["CEN (user1)", "CEN (user2)"],
+                    "status": "already_cached",
+                }
+            ],
+        )
+
+    @override_settings(PLOT_CACHE_MAX_PAYLOAD_SIZE=1)
+    def test_warm_plot_cache_not_cached(self):
+        """ Test that the plots too big to be cached are reported """
+
+        self.assertEqual(
+            self.get_statuses(workers=1, filters=["CEN"]),
+            {("CEN (user1)", "CEN (user2)"): "not_cached"},
+        )
+        self.assertFalse(get_plot_cache().has_key(get_cache_key(self.form)))
+
+    def test_warm_plot_cache_no_data(self):
+        """ Test that the filters without runs are reported """
+
+        Filter.objects.create(
+            name="Unknown assay",
+            user="user1",
+            content=json.dumps({**self.form, "assay_select": ["Unknown"]}),
+        )
+
+        self.assertEqual(
+            self.get_statuses(workers=1, filters=["Unknown assay"]),
+            {("Unknown assay (user1)",): "no_data"},
+        )
+
+    def test_warm_plot_cache_error(self):
+        """ Test that the plots failing to be built are reported without
+        stopping the warm-up
+        """
+
+        for name, mock_args in [
+            (
+                "Error payload",
+                {"return_value": {"status": "error", "error": "Error"}},
+            ),
+            ("Exception", {"side_effect": ValueError("Error")}),
+        ]:
+            with self.subTest(name), patch(
+                "trend_monitoring.management.commands.warm_plot_cache."
+                "get_plot_payload",
+                **mock_args,
+            ):
+                self.assertEqual(
+                    self.get_statuses(workers=2),
+                    {
+                        ("CEN (user1)", "CEN (user2)"): "error",
+                        ("Old filter (user1)",): "invalid",
+                    },
+                )
+
+
+class TestWarmPlotInThread(TestCase):
+    @patch("trend_monitoring.management.commands.warm_plot_cache.connection")
+    @patch("trend_monitoring.management.commands.warm_plot_cache.warm_plot")
+    def test_warm_plot_in_thread(self, mock_warm_plot, mock_connection):
+        """ Test that the connection of the thread is closed after the plot,
+        including when building the plot fails
+
+        Args:
+            mock_warm_plot (Mock): Mock for warm_plot
+            mock_connection (Mock): Mock for the database connection
+        """
+
+        with self.subTest("Plot built"):
+            mock_warm_plot.return_value = {"status": "cached"}
+            self.assertEqual(
+                warm_plot_in_thread("key", {}, ["CEN (user1)"]),
+                {"status": "cached"},
+            )
+            self.assertEqual(mock_connection.close.call_count, 1)
+
+        with self.subTest("Plot failed"):
+            mock_warm_plot.side_effect = ValueError("Error")
+
+            with self.assertRaises(ValueError):
+                warm_plot_in_thread("key", {}, ["CEN (user1)"])
+
+            self.assertEqual(mock_connection.close.call_count, 2)
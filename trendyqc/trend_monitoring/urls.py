@@ -6,6 +6,24 @@ from . import views
 urlpatterns = [
     path("", views.Dashboard.as_view(), name="Dashboard"),
     path("plot/", views.Plot.as_view(), name="Plot"),
+    path("api/plot/", views.PlotData.as_view(), name="Plot_data"),
+    path(
+        "api/plot/detail/", views.PlotDetail.as_view(), name="Plot_detail"
+    ),
+    path(
+        "api/plot/samples/",
+        views.PlotSamples.as_view(),
+        name="Plot_samples",
+    ),
+    path(
+        "api/export/<str:export_format>/",
+        views.Export.as_view(),
+        name="Export",
+    ),
+    path(
+        "api/timings/", views.RequestTimings.as_view(), name="Request_timings"
+    ),
+    path("metrics", views.Metrics.as_view(), name="Metrics"),
     path("logs/", include("log_viewer.urls")),
     path("login/", views.Login.as_view(), name="Login"),
     path("logout/", views.Logout.as_view(), name="Logout"),
@@ -1,45 +1,72 @@
+import datetime
+import hashlib
 from itertools import count
 import json
 import logging
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate
 from django.contrib.auth import login as auth_login
 from django.contrib.auth import logout as auth_logout
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic.base import TemplateView
 from django.views.generic.edit import FormView
 
 from django_tables2 import MultiTableMixin
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from django_tables2.config import RequestConfig
 
-from trendyqc.settings import DISPLAY_DATA_JSON, VERSION
+from trendyqc.settings import VERSION
 from trend_monitoring.forms import FilterForm
-from trend_monitoring.models.metadata import Report, Report_Sample
+from trend_monitoring.models.metadata import Report
 from trend_monitoring.models.filters import Filter
-from trend_monitoring.models import bam_qc, fastq_qc, vcf_qc
 
 from .tables import ReportTable, FilterTable
 from .forms import FilterForm, LoginForm
+from .backend_utils.cache import get_plot_etag
+from .backend_utils.export import (
+    EXPORT_FORMATS,
+    get_export_metrics,
+    is_export_format_available,
+    stream_export,
+)
+from .backend_utils.facets import get_dashboard_facets, get_plotable_metrics
+from .backend_utils.links import get_plot_form, get_plot_url
+from .backend_utils.payload import dump_plot_payload, get_plot_payload
 from .backend_utils.plot import (
+    BUCKET_FREQUENCIES,
+    get_bucket_range,
+    get_detail_form,
+    get_drill_down_form,
     get_subset_queryset,
-    get_data_for_plotting,
-    format_data_for_plotly_js,
+    get_subset_runs,
 )
 from .backend_utils.filtering import import_filter
+from .backend_utils.monitoring import get_metrics_registry
+from .backend_utils.samples import get_run_sample_data, is_valid_metric
+from .backend_utils.timing import get_request_aggregates
 
 logger = logging.getLogger("basic")
 
 
 class Dashboard(MultiTableMixin, TemplateView):
     template_name = "dashboard.html"
-    report_sample_data = Report_Sample.objects.all()
-    tables = [ReportTable(Report.objects.all())]
     model = Report
 
     table_pagination = {"per_page": 10}
 
+    def get_tables(self):
+        # tables are configured with the request they are rendered for, a
+        # table created in the class attributes would be shared between the
+        # requests handled concurrently by the threads of the server
+        return [ReportTable(Report.objects.all())]
+
     def _get_context_data(self):
         """Get the basic data that needs to be displayed in the dashboard page
 
@@ -68,82 +95,18 @@ class Dashboard(MultiTableMixin, TemplateView):
 
         context["tables"].append(filter_table)
 
-        # get all the assays and sort them
-        assays = sorted(
-            {
-                assay
-                for assay in self.report_sample_data.values_list(
-                    "assay", flat=True
-                )
-            }
-        )
-        sequencer_ids = sorted(
-            {
-                sequencer_id
-                for sequencer_id in self.model.objects.all().values_list(
-                    "sequencer_id", flat=True
-                )
-            }
-        )
-        project_names = sorted(
-            project_name
-            for project_name in self.model.objects.all().values_list(
-                "project_name", flat=True
-            )
-        )
+        # distinct values for the dropdowns, cached until the next import
+        facets = get_dashboard_facets()
 
-        context["project_names"] = project_names
-        context["assays"] = assays
-        context["sequencer_ids"] = sequencer_ids
-        plotable_metrics = {
-            **self._get_plotable_metrics(bam_qc),
-            **self._get_plotable_metrics(fastq_qc),
-            **self._get_plotable_metrics(vcf_qc),
-        }
-        context["metrics"] = dict(sorted(plotable_metrics.items()))
+        context["project_names"] = facets["project_names"]
+        context["assays"] = facets["assays"]
+        context["sequencer_ids"] = facets["sequencer_ids"]
+        context["metrics"] = get_plotable_metrics()
+        context["bucket_run_threshold"] = settings.BUCKET_PLOT_RUN_THRESHOLD
+        context["scatter_max_points"] = settings.SCATTER_PLOT_MAX_POINTS
         context["version"] = VERSION
         return context
 
-    def _get_plotable_metrics(self, module) -> dict:
-        """Gather all the plotable metrics by model in a dict
-
-        Args:
-            module (module): Module containing the definition of models
-
-        Returns:
-            dict: Dict with the name of the model as key and the name of the
-            field as value
-        """
-
-        plotable_metrics = {}
-
-        # loop through the modules' classes and get their name and object into
-        # a dict
-        module_dict = dict(
-            [
-                (name, cls)
-                for name, cls in module.__dict__.items()
-                if isinstance(cls, type)
-            ]
-        )
-
-        for model_name, model in module_dict.items():
-            if model_name in DISPLAY_DATA_JSON:
-                display_name = DISPLAY_DATA_JSON[model_name]
-                plotable_metrics.setdefault(display_name, [])
-
-                for field in model._meta.fields:
-                    # get the type of the field
-                    field_type = field.get_internal_type()
-
-                    # only get fields with those type for plotability
-                    if field_type in ["FloatField", "IntegerField"]:
-                        plotable_metrics[display_name].append(field.name)
-
-                plotable_metrics[display_name].sort()
-
-        return plotable_metrics
-
     def get(self, request):
         """Handle GET request
 
@@ -155,7 +118,6 @@ class Dashboard(MultiTableMixin, TemplateView):
         """
 
         context = self._get_context_data()
-        request.session.pop("form", None)
         return render(request, self.template_name, context)
 
     def post(self, request):
@@ -170,7 +132,6 @@ class Dashboard(MultiTableMixin, TemplateView):
 
         context = self._get_context_data()
         form = FilterForm(request.POST)
-        request.session.pop("form", None)
 
         # Use filter button in the filter table has been clicked
         if "filter_use" in request.POST:
@@ -179,8 +140,7 @@ class Dashboard(MultiTableMixin, TemplateView):
             # get the filter obj in the database
             filter_obj = Filter.objects.get(id=filter_id)
             # deserialize the filter content for use in the Plot page
-            request.session["form"] = json.loads(filter_obj.content)
-            return redirect("Plot")
+            return redirect(get_plot_url(json.loads(filter_obj.content)))
 
         # Delete filter button in the filter table has been clicked
         if "delete_filter" in request.POST:
@@ -213,10 +173,9 @@ class Dashboard(MultiTableMixin, TemplateView):
         # call the clean function and see if the form data is valid
         if form.is_valid():
             if "plot" in request.POST:
-                # save the cleaned data in the session so that it gets passed
-                # to the Plot view
-                request.session["form"] = form.cleaned_data
-                return redirect("Plot")
+                # the cleaned data is passed to the Plot view in the signed
+                # token of the plot URL
+                return redirect(get_plot_url(form.cleaned_data))
 
             elif "save_filter" in request.POST:
                 filter_name = request.POST["save_filter"]
@@ -250,12 +209,41 @@ class Dashboard(MultiTableMixin, TemplateView):
         return render(request, self.template_name, context)
 
 
+def get_plot_page_etag(request):
+    """Get the entity tag of the plot page. The page depends on the plot
+    data, on the user logged in (username and save filter button), on the
+    CSRF secret of the forms and on the version of the app. Pages with
+    messages to display are not tagged.
+
+    Args:
+        request (?): HTML request
+
+    Returns:
+        str: Entity tag, None if the plot token is missing or invalid
+    """
+
+    form = get_plot_form(request.GET.get("f"))
+
+    if not form or len(messages.get_messages(request)):
+        return None
+
+    etag_data = (
+        f"{get_plot_etag(form)}:{request.user.is_authenticated}:"
+        f"{request.user.username}:"
+        f"{request.COOKIES.get(settings.CSRF_COOKIE_NAME)}:{VERSION}"
+    )
+    return hashlib.sha256(etag_data.encode()).hexdigest()
+
+
 class Plot(View):
     template_name = "plot.html"
 
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=get_plot_page_etag))
     def get(self, request):
-        """Handle GET request. This should only happen after the form has been
-        submitted.
+        """Handle GET request. The form data of the plot is in the signed
+        token of the "f" query parameter i.e. the plot URLs can be shared
+        and revalidated using their ETag.
 
         Args:
             request (?): HTML request
@@ -264,32 +252,69 @@ class Plot(View):
             ?: Render Django thingy
         """
 
-        form = request.session.get("form")
+        token = request.GET.get("f")
+        form = get_plot_form(token)
 
-        # check if we have the form data in the session request
+        if token and not form:
+            messages.error(request, "Invalid plot link")
+
+        # check if we have the form data in the plot token
         if form:
-            # get queryset of report_sample filtered using the "subset" options
-            # selected by the user and passed through the form
-            subset_queryset = get_subset_queryset(form)
+            payload = get_plot_payload(form)
 
-            if not subset_queryset:
+            if payload["status"] == "no_data":
                 msg = f"No data found for {form}"
                 messages.error(request, msg)
                 return render(request, self.template_name)
 
-            (data_dfs, projects_no_metric, samples_no_metric) = (
-                get_data_for_plotting(subset_queryset, form["metrics_y"])
-            )
+            if payload["status"] == "error":
+                msg = (
+                    "An issue has occurred. Please contact the bioinformatics "
+                    "team."
+                )
+                messages.add_message(request, messages.ERROR, msg)
+                logger.error(payload["error"])
+                return render(request, self.template_name)
 
-            if len(data_dfs) != 1:
+            if payload["warning"]:
                 msg = (
                     "An issue has occurred. Please contact the bioinformatics "
                     "team."
                 )
                 messages.warning(request, msg)
-                logger.debug(
-                    "An error occurred using the following filtering data: "
-                    f"{form}"
+                logger.debug(payload["warning"])
+
+            if payload["nb_summary_runs"]:
+                messages.info(
+                    request,
+                    (
+                        f"{payload['nb_summary_runs']} runs selected, the "
+                        "boxes are built from the run summaries and outliers "
+                        "are not displayed"
+                    ),
+                )
+
+            if payload.get("bucket_size"):
+                messages.info(
+                    request,
+                    (
+                        "The samples are aggregated by "
+                        f"{payload['bucket_size']}, click on a box to display "
+                        f"the runs of that {payload['bucket_size']}"
+                    ),
+                )
+
+            if payload.get("nb_points") and (
+                payload["nb_displayed_points"] < payload["nb_points"]
+            ):
+                messages.info(
+                    request,
+                    (
+                        f"{payload['nb_points']} samples selected, "
+                        f"{payload['nb_displayed_points']} points are "
+                        "displayed using a downsampling preserving the "
+                        "density of the plot and its outliers"
+                    ),
                 )
 
             formatted_form_data = {
@@ -297,19 +322,6 @@ class Plot(View):
                 for k, v in form.items()
             }
 
-            data = format_data_for_plotly_js(data_dfs[0])
-
-            if len(data) == 2:
-                json_plot_data, is_grouped = data
-            else:
-                msg = (
-                    "An issue has occurred. Please contact the bioinformatics "
-                    "team."
-                )
-                messages.add_message(request, messages.ERROR, msg)
-                logger.error(data)
-                return render(request, self.template_name)
-
             cleaned_form_data = FilterForm.clean_form_for_user(
                 dict(sorted(formatted_form_data.items()))
             )
@@ -317,10 +329,24 @@ class Plot(View):
             context = {
                 "form": cleaned_form_data,
                 "y_axis": " | ".join(form["metrics_y"]),
-                "skipped_projects": projects_no_metric,
-                "skipped_samples": samples_no_metric,
-                "is_grouped": is_grouped,
-                "plot": json_plot_data,
+                "x_axis": " | ".join(form.get("metrics_x", [])),
+                "is_scatter": payload.get("is_scatter", False),
+                "control_limits": payload.get("control_limits", []),
+                "spc_violations": payload.get("spc_violations", {}),
+                "skipped_projects": payload["skipped_projects"],
+                "skipped_samples": payload["skipped_samples"],
+                "is_grouped": payload["is_grouped"],
+                "plot": payload["plot"],
+                "bucket_size": payload.get("bucket_size"),
+                "is_summary": bool(payload["nb_summary_runs"]),
+                "metric": form["metrics_y"][0],
+                "plot_token": token,
+                "detail_max_runs": settings.PLOT_DETAIL_MAX_RUNS,
+                "export_formats": [
+                    export_format
+                    for export_format in EXPORT_FORMATS
+                    if is_export_format_available(export_format)
+                ],
                 "version": VERSION,
             }
 
@@ -331,24 +357,323 @@ class Plot(View):
     def post(self, request):
         # back to dashboard button is clicked
         if "dashboard" in request.POST:
-            # clear the session of the form info
-            request.session.pop("form", None)
             return redirect("Dashboard")
 
+        # the forms of the plot page post the token of the plot displayed
+        form = get_plot_form(request.POST.get("f"))
+        plot_url = get_plot_url(form) if form else "Plot"
+
+        # a box of a bucketed plot is clicked, display the runs of the bucket
+        if "drill_down" in request.POST:
+            bucket_size = request.POST.get("bucket_size")
+
+            if form and bucket_size in BUCKET_FREQUENCIES:
+                try:
+                    plot_url = get_plot_url(
+                        get_drill_down_form(
+                            form, request.POST["drill_down"], bucket_size
+                        )
+                    )
+                except ValueError:
+                    messages.error(
+                        request,
+                        f"Unknown {bucket_size}: {request.POST['drill_down']}",
+                    )
+
+            return redirect(plot_url)
+
         # same save filter logic as in the dashboard view
         elif "save_filter" in request.POST:
             filter_name = request.POST["save_filter"]
 
-            if filter_name != "Save filter":
+            if not form:
+                messages.error(request, "Invalid plot link")
+            elif filter_name != "Save filter":
                 msg, msg_status = import_filter(
                     filter_name,
                     request.user.username,
-                    request.session.get("form"),
+                    form,
                 )
                 messages.add_message(request, msg_status, f"Filter: {msg}")
                 logger.info(msg)
 
-            return redirect("Plot")
+            return redirect(plot_url)
+
+
+def get_plot_data_etag(request):
+    """Get the entity tag of the plot data requested using the API
+
+    Args:
+        request (?): HTML request
+
+    Returns:
+        str: Entity tag, None if the filter is invalid
+    """
+
+    form = FilterForm(request.GET)
+
+    if not form.is_valid():
+        return None
+
+    return get_plot_etag(form.cleaned_data)
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+@method_decorator(condition(etag_func=get_plot_data_etag), name="get")
+class PlotData(View):
+    def get(self, request):
+        """Handle GET request for the plot data. The query parameters are the
+        same as the ones of the dashboard form. Repeated requests with a
+        matching If-None-Match header get a 304 response.
+
+        Args:
+            request (?): HTML request
+
+        Returns:
+            HttpResponse: JSON response containing the plot data
+        """
+
+        form = FilterForm(request.GET)
+
+        if not form.is_valid():
+            return JsonResponse(
+                {"errors": form.errors.get_json_data()}, status=400
+            )
+
+        return get_payload_response(get_plot_payload(form.cleaned_data))
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+class PlotDetail(View):
+    def get(self, request):
+        """Handle GET request for the values of every sample of the part of
+        the plot displayed in the plot page. The plot is the one of the "f"
+        plot token, restricted using either the "run_select" parameters
+        (summary plots) or the "bucket_start", "bucket_end" and "bucket_size"
+        parameters (bucketed plots).
+
+        Args:
+            request (?): HTML request
+
+        Returns:
+            HttpResponse: JSON response containing the plot data
+        """
+
+        form = get_plot_form(request.GET.get("f"))
+
+        if not form:
+            return JsonResponse({"error": "No plot displayed"}, status=400)
+
+        runs = request.GET.getlist("run_select")
+        bucket_size = request.GET.get("bucket_size")
+        bucket_start = request.GET.get("bucket_start")
+        bucket_end = request.GET.get("bucket_end")
+
+        if runs:
+            detail_form = get_detail_form(form, runs=runs)
+
+        elif bucket_size in BUCKET_FREQUENCIES and bucket_start and bucket_end:
+            try:
+                date_start = get_bucket_range(bucket_start, bucket_size)[0]
+                date_end = get_bucket_range(bucket_end, bucket_size)[1]
+            except ValueError:
+                return JsonResponse(
+                    {"error": f"Unknown {bucket_size}"}, status=400
+                )
+
+            detail_form = get_detail_form(
+                form, date_range=(date_start, date_end)
+            )
+
+        else:
+            return JsonResponse(
+                {"error": "No runs or buckets selected"}, status=400
+            )
+
+        nb_runs = len(get_subset_runs(get_subset_queryset(detail_form)))
+
+        if nb_runs > settings.PLOT_DETAIL_MAX_RUNS:
+            return JsonResponse(
+                {
+                    "error": (
+                        f"{nb_runs} runs displayed, zoom in to at most "
+                        f"{settings.PLOT_DETAIL_MAX_RUNS} runs to display "
+                        "every sample"
+                    )
+                },
+                status=400,
+            )
+
+        return get_payload_response(get_plot_payload(detail_form))
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+class PlotSamples(View):
+    def get(self, request):
+        """Handle GET request for the samples of one box of the plot i.e. the
+        "project_name", "metric" and optional "lane" parameters. The sample
+        ids are not sent with the plot data and are fetched when a point is
+        clicked.
+
+        Args:
+            request (?): HTML request
+
+        Returns:
+            JsonResponse: JSON response containing the samples sorted by value
+        """
+
+        project_name = request.GET.get("project_name")
+        metric = request.GET.get("metric", "")
+
+        if not project_name or not is_valid_metric(metric):
+            return JsonResponse(
+                {"error": "A run and a plotable metric are needed"},
+                status=400,
+            )
+
+        sample_data = get_run_sample_data(
+            project_name, metric, request.GET.get("lane") or None
+        )
+
+        if not sample_data["samples"]:
+            return JsonResponse({"error": "No data found"}, status=404)
+
+        return JsonResponse(sample_data)
+
+
+@method_decorator(cache_control(private=True, no_cache=True), name="get")
+class Export(View):
+    def get(self, request, export_format):
+        """Handle GET request for the export of the values of every sample of
+        a plot, given by the "f" plot token or by the same query parameters
+        as the ones of the dashboard form. The rows are streamed from a
+        server side cursor i.e. the memory used doesn't depend on the size of
+        the export.
+
+        Args:
+            request (?): HTML request
+            export_format (str): Format of the export, see EXPORT_FORMATS
+
+        Returns:
+            StreamingHttpResponse: Response with the export as attachment
+        """
+
+        if not is_export_format_available(export_format):
+            return JsonResponse(
+                {"error": f"Unavailable export format: {export_format}"},
+                status=400,
+            )
+
+        if "f" in request.GET:
+            form_data = get_plot_form(request.GET["f"])
+
+            if not form_data:
+                return JsonResponse({"error": "Invalid plot link"}, status=400)
+        else:
+            form = FilterForm(request.GET)
+
+            if not form.is_valid():
+                return JsonResponse(
+                    {"errors": form.errors.get_json_data()}, status=400
+                )
+
+            form_data = form.cleaned_data
+
+        metrics = get_export_metrics(form_data)
+        invalid_metrics = [
+            metric for metric in metrics if not is_valid_metric(metric)
+        ]
+
+        # the errors can't be reported once the response is streamed
+        if not metrics or invalid_metrics:
+            return JsonResponse(
+                {"error": f"Invalid metrics: {', '.join(invalid_metrics)}"},
+                status=400,
+            )
+
+        filename = (
+            f"trendyqc_export_{datetime.date.today():%y%m%d}.{export_format}"
+        )
+
+        return StreamingHttpResponse(
+            stream_export(
+                get_subset_queryset(form_data), metrics, export_format
+            ),
+            content_type=EXPORT_FORMATS[export_format],
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            },
+        )
+
+
+@method_decorator(cache_control(no_cache=True), name="get")
+class RequestTimings(View):
+    def get(self, request):
+        """Handle GET request for the timings of the requests handled by this
+        process, aggregated by view and action (see
+        trend_monitoring.middleware)
+
+        Args:
+            request (?): HTML request
+
+        Returns:
+            JsonResponse: JSON response with the number of requests, the wall
+            time, the number of SQL queries and the time spent in SQL, pandas
+            and trace building per view
+        """
+
+        return JsonResponse(get_request_aggregates())
+
+
+class Metrics(View):
+    def get(self, request):
+        """Handle GET request for the metrics of the app in the Prometheus
+        text format
+
+        Args:
+            request (?): HTML request
+
+        Returns:
+            HttpResponse: Response containing the metrics
+        """
+
+        return HttpResponse(
+            generate_latest(get_metrics_registry()),
+            content_type=CONTENT_TYPE_LATEST,
+        )
+
+
+def get_payload_response(payload: dict) -> HttpResponse:
+    """Get the JSON response of the plot data API for the given payload
+
+    Args:
+        payload (dict): Plot payload, see build_plot_payload
+
+    Returns:
+        HttpResponse: JSON response containing the plot data or the error
+    """
+
+    if payload["status"] == "no_data":
+        return JsonResponse({"error": "No data found"}, status=404)
+
+    if payload["status"] == "error":
+        logger.error(payload["error"])
+        return JsonResponse(
+            {
+                "error": (
+                    "An issue has occurred. Please contact the "
+                    "bioinformatics team."
+                )
+            },
+            status=500,
+        )
+
+    if payload["warning"]:
+        logger.debug(payload["warning"])
+
+    return HttpResponse(
+        dump_plot_payload(payload), content_type="application/json"
+    )
 
 
 class Login(FormView):
@@ -126,6 +126,8 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "trend_monitoring.middleware.RequestTimingMiddleware",
+    "trend_monitoring.middleware.RequestProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "trendyqc.urls"
@@ -349,3 +351,108 @@ PLOTTING_COLORS = {
         "#2b4141",  # dark green
     ],
 }
+
+# number of runs above which the plots are built using the run summaries
+SUMMARY_PLOT_RUN_THRESHOLD = int(
+    os.environ.get("SUMMARY_PLOT_RUN_THRESHOLD", 150)
+)
+
+# number of runs above which the samples are aggregated in time buckets when
+# the bucket size is chosen automatically, the smallest bucket size (week,
+# month or quarter) giving at most BUCKET_PLOT_MAX_BOXES buckets is used. It
+# needs to be above SUMMARY_PLOT_RUN_THRESHOLD for the run summaries to be
+# used between the 2 thresholds
+BUCKET_PLOT_RUN_THRESHOLD = int(
+    os.environ.get("BUCKET_PLOT_RUN_THRESHOLD", 500)
+)
+BUCKET_PLOT_MAX_BOXES = int(os.environ.get("BUCKET_PLOT_MAX_BOXES", 60))
+
+# maximum number of runs for which the plot page loads the values of every
+# sample when zooming in on a bucketed or summary plot
+PLOT_DETAIL_MAX_RUNS = int(os.environ.get("PLOT_DETAIL_MAX_RUNS", 50))
+
+# encoding of the plot traces: "compact" sends each run once and the values
+# as typed arrays, expanded by the plot page, "full" sends Plotly ready traces
+PLOT_ENCODING = os.environ.get("PLOT_ENCODING", "compact")
+
+# maximum number of points of the metric vs metric scatter plots, the points
+# of bigger plots are downsampled while preserving the density of the plot
+SCATTER_PLOT_MAX_POINTS = int(
+    os.environ.get("SCATTER_PLOT_MAX_POINTS", 50_000)
+)
+
+# number of rows fetched per round trip by the server side cursor of the
+# exports, also the number of rows of the row groups of the Parquet exports
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 5000))
+
+# statistical process control of the box plots: the baseline of a run is
+# computed from the SPC_BASELINE_RUNS previous runs (0 for every previous run)
+# of the same assay and sequencer using the mean and standard deviation
+# ("mean_sd") or the median and median absolute deviation ("median_mad") of
+# the run values. The Westgard rules are only evaluated for the runs with at
+# least SPC_MIN_BASELINE_RUNS previous runs
+SPC_BASELINE_METHOD = os.environ.get("SPC_BASELINE_METHOD", "mean_sd")
+SPC_BASELINE_RUNS = int(os.environ.get("SPC_BASELINE_RUNS", 20))
+SPC_MIN_BASELINE_RUNS = int(os.environ.get("SPC_MIN_BASELINE_RUNS", 5))
+
+# metrics of the runs imported by add_projects compared to the baselines of
+# their assay and sequencer, the runs and samples further than QC_CHECK_NB_SD
+# standard deviations from the baseline mean are reported in the Slack summary
+QC_CHECK_METRICS = os.environ.get(
+    "QC_CHECK_METRICS",
+    (
+        "hs_metrics|fold_enrichment,hs_metrics|pct_target_bases_20x,"
+        "insert_size_metrics|median_insert_size,verifybamid_data|freemix,"
+        "read_data|total_sequences"
+    ),
+).split(",")
+QC_CHECK_NB_SD = float(os.environ.get("QC_CHECK_NB_SD", 3))
+
+# source of the sample values of the plots: "models" queries the tables of
+# the tools, "metric_value" queries the long format metric value table (see
+# the build_metric_values command for reports imported before the table)
+PLOTTING_BACKEND = os.environ.get("PLOTTING_BACKEND", "models")
+
+# requests taking more than this number of seconds are logged with their
+# timings and filter, see trend_monitoring.middleware
+SLOW_REQUEST_THRESHOLD = float(os.environ.get("SLOW_REQUEST_THRESHOLD", 2))
+
+# number of functions and of slowest SQL queries stored with the profiles of
+# the requests profiled by staff users, see trend_monitoring.middleware
+PROFILE_STATS_LINES = int(os.environ.get("PROFILE_STATS_LINES", 60))
+PROFILE_MAX_QUERIES = int(os.environ.get("PROFILE_MAX_QUERIES", 100))
+
+# the plot cache stores the payloads of the plots already computed, a file
+# based cache is used by default for the entries to be shared between the
+# gunicorn workers
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "plot": {
+        "BACKEND": os.environ.get(
+            "PLOT_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.environ.get(
+            "PLOT_CACHE_LOCATION", str(BASE_DIR / "cache" / "plots")
+        ),
+        "TIMEOUT": int(os.environ.get("PLOT_CACHE_TIMEOUT", 60 * 60 * 24)),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.environ.get("PLOT_CACHE_MAX_ENTRIES", 500)),
+            # a quarter of the entries are evicted when the cap is reached
+            "CULL_FREQUENCY": 4,
+        },
+    },
+}
+
+# plot payloads bigger than this number of characters are not cached
+PLOT_CACHE_MAX_PAYLOAD_SIZE = int(
+    os.environ.get("PLOT_CACHE_MAX_PAYLOAD_SIZE", 20_000_000)
+)
+
+# number of plots of the saved filters built in parallel by the
+# warm_plot_cache command run after the nightly import
+PLOT_CACHE_WARMUP_WORKERS = int(
+    os.environ.get("PLOT_CACHE_WARMUP_WORKERS", 4)
+)